@@ -1 +1,2 @@
-from .project import Project
+from .project import (Project, register_template)
+from .cache import ProjectCache
@@ -0,0 +1,80 @@
+"""
+Support for running project operations from asyncio event loops.
+
+Opening and writing large projects takes seconds of pure Python work,
+which would stall every other task of an event loop. The asynchronous
+methods of Project run that work on an executor instead and return an
+awaitable; this module holds their shared machinery. Asynchronous
+operations require Python 3.
+
+Cancelling the awaiting task stops the operation at its next progress
+report, i.e. after the current block of input or output, so the executor
+thread is released promptly rather than finishing work nobody will use.
+"""
+
+from .errors import OperationCancelled
+import functools
+import threading
+
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
+
+
+def _get_loop():
+    # get_running_loop() is unavailable before Python 3.7, and fails when
+    # called outside a coroutine, e.g. to pass an operation's future to
+    # run_until_complete().
+    try:
+        return asyncio.get_running_loop()
+    except (AttributeError, RuntimeError):
+        return asyncio.get_event_loop()
+
+
+def run_cancellable(executor, function, progress=None):
+    """Runs a blocking operation on an executor without blocking the loop.
+
+    :param executor: concurrent.futures executor running the operation;
+                     None selects the event loop's default executor. The
+                     result is returned by reference, so the executor must
+                     run in the calling process, i.e. use threads.
+    :param function: Operation to run. It is called with a single
+                     *progress* keyword argument, a callable it must
+                     invoke regularly.
+    :param progress: Optional callable receiving the operation's progress
+                     reports. It is invoked from the executor's thread.
+    :returns: An asyncio future of the operation's result.
+    """
+    if asyncio is None:
+        raise RuntimeError('Asynchronous operations require Python 3.')
+    cancelled = threading.Event()
+
+    def report(position):
+        if progress is not None:
+            progress(position)
+        if cancelled.is_set():
+            raise OperationCancelled()
+
+    future = _get_loop().run_in_executor(
+        executor, functools.partial(function, progress=report))
+
+    def done(future):
+        if future.cancelled():
+            cancelled.set()
+
+    future.add_done_callback(done)
+    return future
+
+
+def run(executor, function):
+    """Runs a blocking callable on an executor without blocking the loop.
+
+    Unlike :func:`run_cancellable`, a cancelled call runs to completion
+    in the background.
+
+    :returns: An asyncio future of the call's result.
+    """
+    if asyncio is None:
+        raise RuntimeError('Asynchronous operations require Python 3.')
+    return _get_loop().run_in_executor(executor, function)
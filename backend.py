@@ -0,0 +1,935 @@
+"""
+XML tree backends for the DOM accessor layer.
+
+The accessor objects in dom.py and the modules built on them never call
+XML node methods directly; every read or modification of the tree goes
+through a backend implementing the interface defined by Backend. The
+backend owning a node is determined from the node's type, so accessors
+work identically regardless of how their project was opened.
+
+Two backends are provided:
+
+minidom
+    The standard library's xml.dom.minidom. This is the default, and
+    exposes minidom nodes through each accessor's element attribute.
+
+etree
+    A compact tree of ElementTree elements, using the C accelerated
+    implementation where available. The tree is built directly from
+    expat events so CDATA sections, e.g. descriptions and rung text,
+    are preserved exactly and written back as CDATA.
+"""
+
+from .errors import InvalidFile
+from .compression import open_source
+import xml.dom
+import xml.dom.expatbuilder
+import xml.dom.minidom
+import xml.dom.NodeFilter
+import xml.dom.xmlbuilder
+import xml.etree.ElementTree as ElementTree
+import xml.parsers.expat
+import weakref
+
+try:
+    _text_type = unicode
+except NameError:
+    _text_type = str
+
+
+# Name of the backend used when none is specified.
+DEFAULT_BACKEND = 'minidom'
+
+# Number of bytes handed to expat per call when parsing from a file.
+CHUNK_SIZE = 1 << 16
+
+# Result of child lookups for tag names without any children.
+_NO_CHILDREN = ()
+
+# Kinds of modification reported to change trackers; see track_changes().
+ATTRIBUTES = 'attributes'
+CONTENT = 'content'
+
+# Change trackers keyed by the document whose modifications they record.
+_trackers = weakref.WeakKeyDictionary()
+
+
+class Backend(object):
+    """Interface to a particular XML tree implementation.
+
+    Backends are stateless; a single instance serves every document
+    using that tree implementation. Methods accept and return the
+    implementation's native nodes.
+
+    :var name: Name used to select the backend.
+    :var node_types: Native node classes owned by this backend.
+    """
+    name = None
+    node_types = ()
+
+    def parse(self, source, skip=(), progress=None):
+        """Parses a file name or file object, returning the root element.
+
+        Compressed content is decompressed while parsing; see
+        :mod:`.compression`.
+
+        Raises InvalidFile if the content is not well-formed XML.
+
+        :param skip: Names of Controller child elements, e.g. Trends, whose
+                     content is discarded while parsing. The elements
+                     themselves are kept, but will be empty.
+        :param progress: Optional callable invoked with the number of bytes
+                         read from the source so far; see
+                         :func:`.compression.open_source`.
+        """
+        raise NotImplementedError()
+
+    def parse_string(self, text):
+        """Parses XML from a string, returning the root element."""
+        raise NotImplementedError()
+
+    def tag_name(self, element):
+        """Returns an element's tag name."""
+        raise NotImplementedError()
+
+    def parent(self, node):
+        """Returns a node's parent, or None for the top-level document."""
+        raise NotImplementedError()
+
+    def document(self, node):
+        """Returns the document a node belongs to.
+
+        Elements belong to the document they were created for, whether or
+        not they are attached to it; a document belongs to itself.
+        """
+        raise NotImplementedError()
+
+    def children(self, element):
+        """Returns a list of an element's child elements."""
+        raise NotImplementedError()
+
+    def child_element(self, element, name):
+        """Returns an element's first child element with a given tag name.
+
+        None is returned if no such child exists. Lookups are answered from
+        an index of the element's children by tag name, built on first use
+        and discarded whenever this backend adds or removes children of the
+        element. Trees modified by other means must not be indexed.
+        """
+        children = self.children_named(element, name)
+        if children:
+            return children[0]
+        return None
+
+    def children_named(self, element, name):
+        """Returns a sequence of an element's child elements with a given tag name.
+
+        The sequence is shared with the element's child index; see
+        :meth:`child_element`. It must not be modified.
+        """
+        raise NotImplementedError()
+
+    def _build_child_index(self, element):
+        """Maps each tag name among an element's children to those children."""
+        index = {}
+        tag_name = self.tag_name
+        for child in self.children(element):
+            name = tag_name(child)
+            try:
+                index[name].append(child)
+            except KeyError:
+                index[name] = [child]
+        return index
+
+    def attributes(self, element):
+        """Returns a list of an element's (name, value) attribute pairs."""
+        raise NotImplementedError()
+
+    def has_attribute(self, element, name):
+        raise NotImplementedError()
+
+    def get_attribute(self, element, name):
+        """Returns an attribute value; an empty string if not present."""
+        raise NotImplementedError()
+
+    def set_attribute(self, element, name, value):
+        raise NotImplementedError()
+
+    def remove_attribute(self, element, name):
+        """Removes an attribute, ignoring attributes which do not exist."""
+        raise NotImplementedError()
+
+    def create_element(self, doc, name, attributes={}):
+        """Creates a new, unattached element for a given document."""
+        raise NotImplementedError()
+
+    def append_child(self, parent, child):
+        raise NotImplementedError()
+
+    def append_children(self, parent, children):
+        """Appends a sequence of unattached children in one operation.
+
+        The modification is reported, and the parent's child index
+        discarded, once for all children rather than once per child as
+        by append_child().
+        """
+        raise NotImplementedError()
+
+    def prepend_child(self, parent, child):
+        """Inserts a child before any existing children."""
+        raise NotImplementedError()
+
+    def insert_before(self, parent, new, ref):
+        """Inserts a child before an existing child; appends if ref is None."""
+        raise NotImplementedError()
+
+    def insert_after(self, parent, new, ref):
+        """Inserts a child immediately after an existing child."""
+        raise NotImplementedError()
+
+    def remove_child(self, parent, child):
+        """Detaches a child from its parent and releases it."""
+        raise NotImplementedError()
+
+    def get_cdata(self, element):
+        """Returns the content of an element's CDATA section.
+
+        None is returned if the element has no CDATA section.
+        """
+        raise NotImplementedError()
+
+    def set_cdata(self, element, text):
+        """Sets an element's CDATA content, creating a section if needed."""
+        raise NotImplementedError()
+
+    def get_text(self, element):
+        """Returns an element's text outside of CDATA sections.
+
+        None is returned if the element has no such text other than
+        whitespace.
+        """
+        raise NotImplementedError()
+
+    def set_text(self, element, text):
+        """Replaces an element's text outside of CDATA sections."""
+        raise NotImplementedError()
+
+    def write(self, doc, f):
+        """Serializes an entire document to a text file object."""
+        raise NotImplementedError()
+
+    def snapshot(self, root):
+        """Returns a compact copy of a document for persistent storage.
+
+        The snapshot consists only of tuples and strings, so it can be
+        serialized with marshal. Each element is represented by a
+        (name, attributes, children) tuple, where attributes is a flat
+        tuple of alternating names and values, and children contains
+        element tuples, text strings, and 1-tuples holding CDATA content.
+        """
+        raise NotImplementedError()
+
+    def restore(self, snapshot):
+        """Rebuilds a document from snapshot(), returning the root element."""
+        raise NotImplementedError()
+
+    def changed(self, element, kind):
+        """Reports a modification to the tracker of the element's document.
+
+        Called by every method altering a tree. Modifications of elements
+        not attached to a tracked document are ignored.
+
+        :param kind: ATTRIBUTES if the element's attributes were altered,
+                     or CONTENT if its children or text were.
+        """
+        if not _trackers:
+            return
+        doc = self.document(element)
+        tracker = _trackers.get(doc)
+        if tracker is None:
+            return
+        path = []
+        node = element
+        while node is not None:
+            path.append(node)
+            node = self.parent(node)
+        if path[-1] is doc:
+            tracker.changed(element, kind, path)
+
+
+class MinidomBackend(Backend):
+    """Backend for xml.dom.minidom trees."""
+    name = 'minidom'
+    node_types = (xml.dom.minidom.Element, xml.dom.minidom.Document)
+
+    def parse(self, source, skip=(), progress=None):
+        try:
+            with open_source(source, progress) as f:
+                if skip:
+                    doc = self._parse_skip(f, skip)
+                else:
+                    doc = xml.dom.minidom.parse(f)
+        except xml.parsers.expat.ExpatError as e:
+            raise _parse_error(e)
+        return doc.documentElement
+
+    def _parse_skip(self, f, skip):
+        options = xml.dom.xmlbuilder.Options()
+        options.filter = _SectionFilter(skip)
+
+        # The namespace aware builder used by minidom.parse() never
+        # consults the filter's startContainer(); L5X content does not
+        # use namespaces, so the plain builder is equivalent.
+        builder = xml.dom.expatbuilder.ExpatBuilder(options)
+        return builder.parseFile(f)
+
+    def parse_string(self, text):
+        try:
+            doc = xml.dom.minidom.parseString(text)
+        except xml.parsers.expat.ExpatError as e:
+            raise _parse_error(e)
+        return doc.documentElement
+
+    def tag_name(self, element):
+        return element.tagName
+
+    def parent(self, node):
+        return node.parentNode
+
+    def document(self, node):
+        doc = node.ownerDocument
+        if doc is None:
+            return node
+        return doc
+
+    def children(self, element):
+        return [n for n in element.childNodes
+                if n.nodeType == n.ELEMENT_NODE]
+
+    def children_named(self, element, name):
+        # The index is kept in the element's instance dictionary.
+        try:
+            index = element._child_index
+        except AttributeError:
+            index = element._child_index = self._build_child_index(element)
+        return index.get(name, _NO_CHILDREN)
+
+    def _children_changed(self, parent, child):
+        """Discards the child indices affected by inserting a child."""
+        parent.__dict__.pop('_child_index', None)
+
+        # minidom detaches an inserted node from any previous parent.
+        previous = child.parentNode
+        if previous is not None:
+            previous.__dict__.pop('_child_index', None)
+
+    def attributes(self, element):
+        return list(element.attributes.items())
+
+    def has_attribute(self, element, name):
+        return element.hasAttribute(name)
+
+    def get_attribute(self, element, name):
+        return element.getAttribute(name)
+
+    def set_attribute(self, element, name, value):
+        element.setAttribute(name, value)
+        self.changed(element, ATTRIBUTES)
+
+    def remove_attribute(self, element, name):
+        try:
+            element.removeAttribute(name)
+        except xml.dom.NotFoundErr:
+            return
+        self.changed(element, ATTRIBUTES)
+
+    def create_element(self, doc, name, attributes={}):
+        # The element has no attributes yet, so they are added without
+        # the checks of setAttribute() for replacing an existing one.
+        new = doc.createElement(name)
+        for attr in attributes.keys():
+            _add_attribute(doc, new, attr, attributes[attr])
+        return new
+
+    def append_child(self, parent, child):
+        self._children_changed(parent, child)
+        parent.appendChild(child)
+        self.changed(parent, CONTENT)
+
+    def append_children(self, parent, children):
+        # Not built with a document fragment, as minidom removes each
+        # child from the front of the fragment's list as it is moved.
+        parent.__dict__.pop('_child_index', None)
+        for child in children:
+            parent.appendChild(child)
+        self.changed(parent, CONTENT)
+
+    def prepend_child(self, parent, child):
+        self._children_changed(parent, child)
+        parent.insertBefore(child, parent.firstChild)
+        self.changed(parent, CONTENT)
+
+    def insert_before(self, parent, new, ref):
+        self._children_changed(parent, new)
+        parent.insertBefore(new, ref)
+        self.changed(parent, CONTENT)
+
+    def insert_after(self, parent, new, ref):
+        self._children_changed(parent, new)
+        parent.insertBefore(new, ref.nextSibling)
+        self.changed(parent, CONTENT)
+
+    def remove_child(self, parent, child):
+        parent.__dict__.pop('_child_index', None)
+        parent.removeChild(child)
+        child.unlink()
+        child.__dict__.pop('_child_index', None)
+        self.changed(parent, CONTENT)
+
+    def get_cdata(self, element):
+        node = self._get_cdata_node(element)
+        if node is None:
+            return None
+        return node.data
+
+    def set_cdata(self, element, text):
+        node = self._get_cdata_node(element)
+        if node is None:
+            node = element.ownerDocument.createCDATASection(text)
+            element.appendChild(node)
+        else:
+            node.data = text
+        self.changed(element, CONTENT)
+
+    def get_text(self, element):
+        text = ''.join([n.data for n in element.childNodes
+                        if n.nodeType == n.TEXT_NODE])
+        if not text.strip():
+            return None
+        return text
+
+    def set_text(self, element, text):
+        for child in list(element.childNodes):
+            if child.nodeType == child.TEXT_NODE:
+                element.removeChild(child)
+        element.appendChild(element.ownerDocument.createTextNode(text))
+        self.changed(element, CONTENT)
+
+    def _get_cdata_node(self, element):
+        """Locates the last CDATA section node within an element."""
+        cdata = None
+        for child in element.childNodes:
+            if child.nodeType == child.CDATA_SECTION_NODE:
+                cdata = child
+        return cdata
+
+    def write(self, doc, f):
+        doc.writexml(f, addindent="", newl="\n", encoding='UTF-8')
+
+    def snapshot(self, root):
+        return self._snapshot(root, {})
+
+    def _snapshot(self, element, names):
+        attributes = []
+        for name, value in element.attributes.items():
+            attributes.append(names.setdefault(name, name))
+            attributes.append(value)
+
+        children = []
+        for child in element.childNodes:
+            if child.nodeType == child.ELEMENT_NODE:
+                children.append(self._snapshot(child, names))
+            elif child.nodeType == child.TEXT_NODE:
+                # Whitespace between elements repeats throughout a
+                # document; sharing a single string object allows
+                # marshal to store it once.
+                data = child.data
+                if not data.strip():
+                    data = names.setdefault(data, data)
+                children.append(data)
+            elif child.nodeType == child.CDATA_SECTION_NODE:
+                children.append((child.data,))
+
+        tag = element.tagName
+        return (names.setdefault(tag, tag), tuple(attributes), tuple(children))
+
+    def restore(self, snapshot):
+        doc = xml.dom.minidom.Document()
+        doc.appendChild(self._restore(doc, snapshot))
+        return doc.documentElement
+
+    def _restore(self, doc, snapshot):
+        # Nodes are linked with minidom's internal helpers, as its own
+        # parser does; the public methods validate every insertion,
+        # which makes up most of the cost of a restore.
+        name, attributes, children = snapshot
+        element = doc.createElement(name)
+        for i in range(0, len(attributes), 2):
+            _add_attribute(doc, element, attributes[i], attributes[i + 1])
+
+        for child in children:
+            if not isinstance(child, tuple):
+                node = doc.createTextNode(child)
+            elif len(child) == 1:
+                node = doc.createCDATASection(child[0])
+            else:
+                node = self._restore(doc, child)
+            xml.dom.minidom._append_child(element, node)
+        return element
+
+
+def _add_attribute(doc, element, name, value):
+    """Adds an attribute to a minidom element not already holding it."""
+    # Supplying the local name spares minidom from deriving it, through a
+    # caught AttributeError, when the node is stored.
+    attr = xml.dom.minidom.Attr(name, None, name.split(':', 1)[-1])
+    attr.ownerDocument = doc
+    attr.value = value
+    xml.dom.minidom._set_attribute_node(element, attr)
+
+
+class _SectionFilter(xml.dom.xmlbuilder.DOMBuilderFilter):
+    """minidom builder filter rejecting the content of skipped sections."""
+    whatToShow = xml.dom.NodeFilter.NodeFilter.SHOW_ELEMENT
+
+    def __init__(self, skip):
+        self.skip = frozenset(skip)
+
+    def acceptNode(self, node):
+        return self.FILTER_ACCEPT
+
+    def startContainer(self, node):
+        section = node.parentNode
+        if ((section.nodeType == section.ELEMENT_NODE)
+            and (section.tagName in self.skip)
+            and (section.parentNode.nodeType == section.ELEMENT_NODE)
+            and (section.parentNode.tagName == 'Controller')):
+            return self.FILTER_REJECT
+        return self.FILTER_ACCEPT
+
+
+class CData(_text_type):
+    """String type marking ElementTree element text held in a CDATA section."""
+    __slots__ = ()
+
+
+class ETreeDocument(object):
+    """Top-level container for an ElementTree backend tree.
+
+    Serves as the parent of the root element, as a minidom Document does,
+    so every node of a tree can locate the same document object.
+    """
+    __slots__ = ('root', 'parent', '__weakref__')
+
+    def __init__(self):
+        self.root = None
+        self.parent = None
+
+
+class ETreeElement(ElementTree.Element):
+    """ElementTree element carrying a reference to its parent.
+
+    The document slot refers to the ETreeDocument the element was created
+    for. The child_index slot holds the index of children by tag name built
+    by :meth:`ETreeBackend.children_named`; it is unset until first needed.
+    """
+    __slots__ = ('parent', 'document', 'child_index')
+
+
+class _ETreeBuilder(object):
+    """Expat handler set which builds an ElementTree backend tree.
+
+    Character data is kept only for elements without children, which
+    in L5X content are the only elements holding text; whitespace used
+    to lay out element children is discarded. Text inside a CDATA
+    section is stored as CData so it can be written back as such.
+
+    :param skip: Names of Controller child elements whose content is
+                 discarded.
+    """
+    def __init__(self, skip=()):
+        self.doc = ETreeDocument()
+        self.stack = [self.doc]
+        self.text = []
+        self.cdata = None
+        self.in_cdata = False
+        self.skip = frozenset(skip)
+
+        # Depth of the current element below a skipped section; zero
+        # when not within a skipped section.
+        self.skip_depth = 0
+
+    def start_element(self, name, attributes):
+        if self.skip_depth:
+            self.skip_depth += 1
+            return
+
+        element = ETreeElement(name, attributes)
+        parent = self.stack[-1]
+        element.parent = parent
+        element.document = self.doc
+        if parent is self.doc:
+            self.doc.root = element
+        else:
+            parent.append(element)
+        self.stack.append(element)
+        self.text = []
+        self.cdata = None
+
+        if ((name in self.skip) and (parent is not self.doc)
+            and (parent.tag == 'Controller')):
+            self.skip_depth = 1
+
+    def end_element(self, name):
+        if self.skip_depth > 1:
+            self.skip_depth -= 1
+            return
+        self.skip_depth = 0
+
+        element = self.stack.pop()
+        if self.cdata is not None:
+            element.text = CData(''.join(self.cdata))
+        elif self.text and not len(element):
+            text = ''.join(self.text)
+            if text.strip():
+                element.text = text
+        self.text = []
+        self.cdata = None
+
+    def character_data(self, data):
+        if self.skip_depth:
+            return
+        if self.in_cdata:
+            self.cdata.append(data)
+        else:
+            self.text.append(data)
+
+    def start_cdata(self):
+        if self.skip_depth:
+            return
+        if self.cdata is None:
+            self.cdata = []
+        self.in_cdata = True
+
+    def end_cdata(self):
+        self.in_cdata = False
+
+    def create_parser(self):
+        parser = xml.parsers.expat.ParserCreate()
+        parser.buffer_text = True
+        parser.StartElementHandler = self.start_element
+        parser.EndElementHandler = self.end_element
+        parser.CharacterDataHandler = self.character_data
+        parser.StartCdataSectionHandler = self.start_cdata
+        parser.EndCdataSectionHandler = self.end_cdata
+        return parser
+
+
+class ETreeBackend(Backend):
+    """Backend for compact ElementTree trees."""
+    name = 'etree'
+    node_types = (ETreeElement, ETreeDocument)
+
+    def parse(self, source, skip=(), progress=None):
+        with open_source(source, progress) as f:
+            return self._parse_file(f, skip)
+
+    def _parse_file(self, f, skip):
+        builder = _ETreeBuilder(skip)
+        parser = builder.create_parser()
+        try:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                parser.Parse(chunk, not chunk)
+                if not chunk:
+                    break
+        except xml.parsers.expat.ExpatError as e:
+            raise _parse_error(e)
+        return builder.doc.root
+
+    def parse_string(self, text):
+        if isinstance(text, _text_type):
+            text = text.encode('utf-8')
+        builder = _ETreeBuilder()
+        parser = builder.create_parser()
+        try:
+            parser.Parse(text, True)
+        except xml.parsers.expat.ExpatError as e:
+            raise _parse_error(e)
+        return builder.doc.root
+
+    def tag_name(self, element):
+        return element.tag
+
+    def parent(self, node):
+        return node.parent
+
+    def document(self, node):
+        if isinstance(node, ETreeDocument):
+            return node
+        return node.document
+
+    def children(self, element):
+        return list(element)
+
+    def children_named(self, element, name):
+        try:
+            index = element.child_index
+        except AttributeError:
+            index = element.child_index = self._build_child_index(element)
+        return index.get(name, _NO_CHILDREN)
+
+    def _children_changed(self, parent):
+        """Discards the child index of an element whose children changed."""
+        try:
+            del parent.child_index
+        except AttributeError:
+            pass
+
+    def attributes(self, element):
+        return list(element.items())
+
+    def has_attribute(self, element, name):
+        return element.get(name) is not None
+
+    def get_attribute(self, element, name):
+        return element.get(name, '')
+
+    def set_attribute(self, element, name, value):
+        element.set(name, value)
+        self.changed(element, ATTRIBUTES)
+
+    def remove_attribute(self, element, name):
+        if element.attrib.pop(name, None) is not None:
+            self.changed(element, ATTRIBUTES)
+
+    def create_element(self, doc, name, attributes={}):
+        new = ETreeElement(name, attributes)
+        new.parent = None
+        new.document = doc
+        return new
+
+    def _detach(self, child):
+        """Removes an element from its current parent, if any, as
+        minidom does before inserting a node elsewhere."""
+        old = getattr(child, 'parent', None)
+        if old is not None:
+            self.remove_child(old, child)
+
+    def append_child(self, parent, child):
+        self._detach(child)
+        self._children_changed(parent)
+        parent.append(child)
+        child.parent = parent
+        self.changed(parent, CONTENT)
+
+    def append_children(self, parent, children):
+        children = list(children)
+        for child in children:
+            self._detach(child)
+        self._children_changed(parent)
+        parent.extend(children)
+        for child in children:
+            child.parent = parent
+        self.changed(parent, CONTENT)
+
+    def prepend_child(self, parent, child):
+        self._detach(child)
+        self._children_changed(parent)
+        parent.insert(0, child)
+        child.parent = parent
+        self.changed(parent, CONTENT)
+
+    def insert_before(self, parent, new, ref):
+        if ref is None:
+            self.append_child(parent, new)
+        else:
+            self._detach(new)
+            self._children_changed(parent)
+            parent.insert(self._index(parent, ref), new)
+            new.parent = parent
+            self.changed(parent, CONTENT)
+
+    def insert_after(self, parent, new, ref):
+        self._detach(new)
+        self._children_changed(parent)
+        parent.insert(self._index(parent, ref) + 1, new)
+        new.parent = parent
+        self.changed(parent, CONTENT)
+
+    def _index(self, parent, child):
+        """Finds the position of a child by identity."""
+        for i, e in enumerate(parent):
+            if e is child:
+                return i
+        raise ValueError('Element is not a child of the given parent')
+
+    def remove_child(self, parent, child):
+        self._children_changed(parent)
+        parent.remove(child)
+        child.parent = None
+        self.changed(parent, CONTENT)
+
+    def get_cdata(self, element):
+        text = element.text
+        if isinstance(text, CData):
+            return text
+        return None
+
+    def set_cdata(self, element, text):
+        element.text = CData(text)
+        self.changed(element, CONTENT)
+
+    def get_text(self, element):
+        text = element.text
+        if (text is None) or isinstance(text, CData):
+            return None
+        return text
+
+    def set_text(self, element, text):
+        element.text = text
+        self.changed(element, CONTENT)
+
+    def write(self, doc, f):
+        f.write('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n')
+        self._write_element(f.write, doc.root)
+
+    def snapshot(self, root):
+        return self._snapshot(root, {})
+
+    def _snapshot(self, element, names):
+        attributes = []
+        for name, value in element.items():
+            attributes.append(names.setdefault(name, name))
+            attributes.append(value)
+
+        text = element.text
+        if len(element):
+            children = tuple([self._snapshot(e, names) for e in element])
+        elif text is None:
+            children = ()
+        elif isinstance(text, CData):
+            children = ((_text_type(text),),)
+        else:
+            children = (text,)
+
+        tag = element.tag
+        return (names.setdefault(tag, tag), tuple(attributes), children)
+
+    def restore(self, snapshot):
+        doc = ETreeDocument()
+        doc.root = self._restore(doc, doc, snapshot)
+        return doc.root
+
+    def _restore(self, doc, parent, snapshot):
+        name, attributes, children = snapshot
+        element = ETreeElement(name, dict(zip(attributes[::2],
+                                              attributes[1::2])))
+        element.parent = parent
+        element.document = doc
+        for child in children:
+            if not isinstance(child, tuple):
+                element.text = child
+            elif len(child) == 1:
+                element.text = CData(child[0])
+            else:
+                element.append(self._restore(doc, element, child))
+        return element
+
+    def _write_element(self, write, element):
+        """Writes an element using the layout of RSLogix exports.
+
+        Each element starts on a new line, CDATA sections occupy
+        their own line, and plain text is written inline.
+        """
+        tag = element.tag
+        write('<' + tag)
+        for name, value in element.items():
+            write(' ' + name + '="' + _escape_attribute(value) + '"')
+
+        text = element.text
+        if len(element):
+            write('>\n')
+            for child in element:
+                self._write_element(write, child)
+            write('</' + tag + '>\n')
+        elif text is None:
+            write('/>\n')
+        elif isinstance(text, CData):
+            write('>\n<![CDATA[' + text.replace(']]>', ']]]]><![CDATA[>')
+                  + ']]>\n</' + tag + '>\n')
+        else:
+            write('>' + _escape_text(text) + '</' + tag + '>\n')
+
+
+def _escape_text(s):
+    return s.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _escape_attribute(s):
+    s = _escape_text(s).replace('"', '&quot;')
+    return s.replace('\n', '&#10;').replace('\r', '&#13;').replace('\t', '&#9;')
+
+
+def _parse_error(e):
+    """Converts an expat exception into an InvalidFile exception."""
+    msg = xml.parsers.expat.ErrorString(e.code)
+    return InvalidFile("XML parsing error: {0}".format(msg))
+
+
+_backends = {}
+_node_types = {}
+
+
+def register_backend(backend):
+    """Makes a backend available for selection by name."""
+    _backends[backend.name] = backend
+    for node_type in backend.node_types:
+        _node_types[node_type] = backend
+
+
+def get_backend(name=None):
+    """Looks up a backend by name.
+
+    :param name: Backend name, a Backend instance which is returned as-is,
+                 or None to select the default backend.
+    """
+    if isinstance(name, Backend):
+        return name
+    if name is None:
+        name = DEFAULT_BACKEND
+    try:
+        return _backends[name]
+    except KeyError:
+        raise ValueError("Unknown XML backend {0}".format(name))
+
+
+def track_changes(doc, tracker):
+    """Reports all subsequent modifications of a document to a tracker.
+
+    The tracker's changed(element, kind, path) method is called for each
+    modification, where path lists the modified element and each of its
+    ancestors up to and including the document; see Backend.changed().
+    """
+    _trackers[doc] = tracker
+
+
+def node_backend(node):
+    """Returns the backend which owns a given XML node."""
+    try:
+        return _node_types[type(node)]
+    except KeyError:
+        pass
+
+    # Fall back to an isinstance() search for subclasses of registered
+    # node types, caching the result for subsequent lookups.
+    for node_type, backend in list(_node_types.items()):
+        if isinstance(node, node_type):
+            _node_types[type(node)] = backend
+            return backend
+    raise TypeError("Unsupported XML node type {0}".format(
+        type(node).__name__))
+
+
+register_backend(MinidomBackend())
+register_backend(ETreeBackend())
@@ -0,0 +1,290 @@
+"""
+Batch processing of many projects across a process pool.
+
+Applying the same edit to hundreds of exports one Project at a time
+leaves all but one core idle, and because parsing is pure Python, threads
+do not help. run_batch() distributes the load, transform and write steps
+of each export to a pool of worker processes:
+
+    def set_owner(prj):
+        prj.owner = 'Plant 3'
+
+    results = l5x.batch.run_batch(filenames, set_owner, output_dir='out')
+
+The transform must be picklable, i.e. a function defined at module level,
+as it is sent to every worker. Each export is processed independently; a
+failure is recorded in that export's result and does not stop the batch.
+
+The same is available from the command line, with the transform given
+as *module:function*:
+
+    python -m l5x.batch edits:set_owner --output-dir out *.L5X
+"""
+
+from .project import Project
+import argparse
+import gc
+import importlib
+import multiprocessing
+import os
+import pickle
+import sys
+import time
+import traceback
+
+
+class BatchResult(object):
+    """Outcome of processing one export.
+
+    :var filename: Path of the input file.
+    :var output: Path of the written file; None if nothing was written.
+    :var value: Return value of the transform; None if it could not be
+                returned from a worker process, in which case error
+                describes why.
+    :var load_time: Seconds spent opening the project.
+    :var transform_time: Seconds spent in the transform.
+    :var write_time: Seconds spent writing the project.
+    :var error: Formatted traceback of the exception raised while processing
+                the file; None if processing succeeded.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.output = None
+        self.value = None
+        self.load_time = 0.0
+        self.transform_time = 0.0
+        self.write_time = 0.0
+        self.error = None
+
+    @property
+    def ok(self):
+        """True if the file was processed without error."""
+        return self.error is None
+
+    @property
+    def elapsed(self):
+        """Total seconds spent processing the file."""
+        return self.load_time + self.transform_time + self.write_time
+
+    def __repr__(self):
+        return 'BatchResult({0!r}, ok={1}, elapsed={2:.3f})'.format(
+            self.filename, self.ok, self.elapsed)
+
+
+class _Job(object):
+    """Picklable description of the work applied to every export."""
+    def __init__(self, transform, output_dir, write, project_options,
+                 pickle_results=False):
+        self.transform = transform
+        self.output_dir = output_dir
+        self.write = write
+        self.project_options = project_options
+        self.pickle_results = pickle_results
+
+    def output_path(self, filename):
+        if self.output_dir is None:
+            return filename
+        return os.path.join(self.output_dir, os.path.basename(filename))
+
+    def __call__(self, task):
+        index, filename = task
+        result = BatchResult(filename)
+        prj = None
+        try:
+            start = time.time()
+            prj = Project(filename, **self.project_options)
+            result.load_time = time.time() - start
+
+            start = time.time()
+            result.value = self.transform(prj)
+            result.transform_time = time.time() - start
+
+            if self.write:
+                start = time.time()
+                output = self.output_path(filename)
+                prj.write(output)
+                result.write_time = time.time() - start
+                result.output = output
+        except Exception:
+            result.error = traceback.format_exc()
+
+        # Release the project before the next export is loaded; DOM trees
+        # are full of reference cycles that would otherwise linger until
+        # the collector's next full pass.
+        prj = None
+        gc.collect()
+        if self.pickle_results:
+            return index, self.pickle_result(result)
+        return index, result
+
+    def pickle_result(self, result):
+        """Pickles a result to be returned from a worker process.
+
+        The pool would otherwise pickle the result itself, where an
+        unpicklable transform value aborts the entire batch; instead it
+        is recorded as this file's error.
+        """
+        try:
+            return pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            result.value = None
+            result.error = traceback.format_exc()
+            return pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+
+
+def _unpickle_result(data, filename):
+    """Restores a result pickled by a worker process."""
+    try:
+        return pickle.loads(data)
+    except Exception:
+        result = BatchResult(filename)
+        result.error = traceback.format_exc()
+        return result
+
+
+def _check_outputs(filenames, job):
+    """Rejects inputs which would be written to the same output file."""
+    outputs = {}
+    for filename in filenames:
+        output = os.path.normcase(os.path.abspath(job.output_path(filename)))
+        other = outputs.setdefault(output, filename)
+        if other != filename:
+            raise ValueError('{0} and {1} would both be written to {2}'.format(
+                other, filename, job.output_path(filename)))
+
+
+def run_batch(filenames, transform, output_dir=None, processes=None,
+              max_tasks_per_child=None, write=True, progress=None,
+              **project_options):
+    """Loads, transforms and writes a list of exports in parallel.
+
+    :param filenames: Paths of the exports to process.
+    :param transform: Picklable callable accepting a :class:`.project.Project`.
+                      Its return value, which must also be picklable, is
+                      stored in the result.
+    :param output_dir: Directory receiving the output files, which keep the
+                       names of the inputs; inputs sharing a name are
+                       rejected with a ValueError before any is processed.
+                       Inputs are overwritten if omitted.
+    :param processes: Number of worker processes; defaults to the number of
+                      CPUs. Files are processed in the calling process if 1.
+    :param max_tasks_per_child: Number of exports each worker processes
+                                before being replaced by a fresh process,
+                                bounding the memory a worker can accumulate.
+                                Workers are never replaced if omitted.
+    :param write: If False, projects are transformed but not written.
+    :param progress: Optional callable invoked with each
+                     :class:`BatchResult` as files are completed.
+    :param project_options: Keyword arguments passed to
+                            :class:`.project.Project`, e.g. *backend* or
+                            *track_changes*.
+    :returns: List of :class:`BatchResult`, in the order of *filenames*.
+    """
+    # Report an unpicklable transform here rather than as a failure of
+    # every task.
+    pickle.dumps(transform)
+
+    filenames = list(filenames)
+    job = _Job(transform, output_dir, write, project_options,
+               pickle_results=(processes != 1))
+    if write:
+        _check_outputs(filenames, job)
+    if (output_dir is not None) and not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+    tasks = list(enumerate(filenames))
+    results = [None] * len(tasks)
+
+    if processes == 1:
+        completed = (job(task) for task in tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(processes,
+                                    maxtasksperchild=max_tasks_per_child)
+        completed = pool.imap_unordered(job, tasks)
+
+    try:
+        for index, result in completed:
+            if pool is not None:
+                result = _unpickle_result(result, filenames[index])
+            results[index] = result
+            if progress is not None:
+                progress(result)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return results
+
+
+def load_transform(spec):
+    """Imports a transform given as *module:function*."""
+    module_name, sep, name = spec.partition(':')
+    if not (sep and module_name and name):
+        raise ValueError('Transform must be given as module:function.')
+    module = importlib.import_module(module_name)
+    return getattr(module, name)
+
+
+def main(argv=None):
+    """Command line entry point; returns the process exit status."""
+    parser = argparse.ArgumentParser(
+        prog='python -m l5x.batch',
+        description='Apply a transform to many L5X exports in parallel.')
+    parser.add_argument('transform',
+                        help='transform function, as module:function')
+    parser.add_argument('files', nargs='+', help='L5X exports to process')
+    parser.add_argument('-o', '--output-dir',
+                        help='directory for output files; inputs are '
+                             'overwritten if omitted')
+    parser.add_argument('-j', '--processes', type=int,
+                        help='number of worker processes')
+    parser.add_argument('--max-tasks-per-child', type=int,
+                        help='exports processed by a worker before it '
+                             'is replaced')
+    parser.add_argument('--backend', help='XML backend, e.g. etree')
+    parser.add_argument('--track-changes', action='store_true',
+                        help='splice unmodified content from the inputs')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='transform without writing output')
+    args = parser.parse_args(argv)
+
+    # Make transforms in the working directory importable, as they would
+    # be when running a script from it.
+    if os.curdir not in sys.path and '' not in sys.path:
+        sys.path.insert(0, os.curdir)
+    try:
+        transform = load_transform(args.transform)
+    except (ImportError, AttributeError, ValueError) as e:
+        parser.error(str(e))
+
+    def report(result):
+        if result.ok:
+            status = 'ok'
+        else:
+            status = 'FAILED'
+        print('{0:<7}{1:8.3f}s  load {2:.3f}s  transform {3:.3f}s  '
+              'write {4:.3f}s  {5}'.format(status, result.elapsed,
+                                           result.load_time,
+                                           result.transform_time,
+                                           result.write_time,
+                                           result.filename))
+        sys.stdout.flush()
+
+    start = time.time()
+    results = run_batch(args.files, transform, output_dir=args.output_dir,
+                        processes=args.processes,
+                        max_tasks_per_child=args.max_tasks_per_child,
+                        write=not args.dry_run, progress=report,
+                        backend=args.backend,
+                        track_changes=args.track_changes)
+
+    failed = [r for r in results if not r.ok]
+    for result in failed:
+        sys.stderr.write('\n' + result.filename + ':\n' + result.error)
+    print('{0} files, {1} failed, {2:.3f}s'.format(
+        len(results), len(failed), time.time() - start))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
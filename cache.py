@@ -0,0 +1,219 @@
+"""
+Persistent cache of parsed projects.
+
+Opening a project spends nearly all of its time building the XML tree.
+When the same unchanged export is opened repeatedly, e.g. by several
+steps of a build pipeline, a ProjectCache allows the tree to be restored
+from a snapshot saved by a previous run instead:
+
+    cache = l5x.ProjectCache('/var/cache/l5x')
+    prj = l5x.Project('big.L5X', cache=cache)
+
+Snapshots are keyed by a hash of the export's content, so a modified
+file never matches a stale entry. Hashing is skipped when a file's size
+and modification time are unchanged since it was last hashed. The total
+size of stored snapshots is bounded; the least recently used entries
+are discarded to make room for new ones.
+"""
+
+from .backend import get_backend
+from .writer import replace_file
+import gc
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+
+
+# Identifies the layout of stored entries. Entries written with another
+# format, or by another Python version, are never matched.
+FORMAT_VERSION = 1
+
+# Default upper bound on the combined size of all stored snapshots.
+DEFAULT_MAX_BYTES = 1 << 30
+
+# Number of bytes read per iteration when hashing a file.
+CHUNK_SIZE = 1 << 20
+
+SNAPSHOT_SUFFIX = '.snapshot'
+STAT_SUFFIX = '.stat'
+
+
+def _hash_name(text):
+    """Returns a hex digest of a string, for use as a file name."""
+    if not isinstance(text, bytes):
+        text = text.encode('utf-8')
+    return hashlib.sha1(text).hexdigest()
+
+
+class ProjectCache(object):
+    """On-disk store of parsed project snapshots.
+
+    A single cache directory may be shared by any number of processes;
+    entries are written to temporary files and renamed into place so a
+    partially written entry is never read.
+
+    :param directory: Directory holding the cache entries; created if it does not exist.
+    :param max_bytes: Upper bound on the combined size of stored snapshots.
+    """
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def load(self, filename, backend=None, skip=()):
+        """Restores a project's XML tree from the cache.
+
+        :param filename: Path of the L5X export.
+        :param backend: Name of the XML backend used to build the tree.
+        :param skip: Names of Controller child elements skipped while parsing.
+        :returns: The root element, or None if no matching entry exists.
+        """
+        backend = get_backend(backend)
+        path = self.snapshot_path(filename, backend, skip)
+        try:
+            f = open(path, 'rb')
+        except (IOError, OSError):
+            return None
+
+        # Loading creates a great many container objects but no garbage,
+        # so the cyclic garbage collection passes the allocations would
+        # otherwise trigger are pure overhead.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            # marshal.load() reads file objects piecemeal; reading the
+            # entire entry first is considerably faster.
+            try:
+                data = f.read()
+            finally:
+                f.close()
+
+            # A damaged or otherwise unusable entry must only cost a full
+            # parse, never prevent the project from opening, so any
+            # failure to rebuild the tree discards the entry.
+            try:
+                root = backend.restore(marshal.loads(data))
+                valid = backend.tag_name(root) == 'RSLogix5000Content'
+            except Exception:
+                valid = False
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        if not valid:
+            self.discard(path)
+            return None
+
+        # Mark the entry as recently used for eviction.
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return root
+
+    def store(self, filename, root, backend=None, skip=()):
+        """Saves a snapshot of a project's XML tree.
+
+        :param filename: Path of the L5X export the tree was parsed from.
+        :param root: Root element of the tree.
+        :param backend: Name of the XML backend which built the tree.
+        :param skip: Names of Controller child elements skipped while parsing.
+        """
+        backend = get_backend(backend)
+        path = self.snapshot_path(filename, backend, skip)
+        self._write(path, marshal.dumps(backend.snapshot(root)))
+        self.evict()
+
+    def evict(self):
+        """Discards least recently used snapshots until within max_bytes."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(SNAPSHOT_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        entries.sort()
+        for mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self.discard(path)
+            total -= size
+
+    def discard(self, path):
+        """Removes a single entry, ignoring entries already removed."""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        """Removes every entry from the cache."""
+        for name in os.listdir(self.directory):
+            if name.endswith(SNAPSHOT_SUFFIX) or name.endswith(STAT_SUFFIX):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def snapshot_path(self, filename, backend, skip=()):
+        """Returns the path of the entry for a given file and parse options."""
+        key = '\n'.join([self.digest(filename),
+                         backend.name,
+                         ','.join(sorted(skip)),
+                         str(FORMAT_VERSION),
+                         sys.version])
+        name = _hash_name(key)
+        return os.path.join(self.directory, name + SNAPSHOT_SUFFIX)
+
+    def digest(self, filename):
+        """Returns a hex digest of a file's content.
+
+        The digest is recorded with the file's size and modification time,
+        and reused without reading the file while both are unchanged.
+        """
+        filename = os.path.abspath(filename)
+        st = os.stat(filename)
+        stat_key = (st.st_size, st.st_mtime)
+
+        name = _hash_name(filename)
+        stat_path = os.path.join(self.directory, name + STAT_SUFFIX)
+        try:
+            with open(stat_path, 'rb') as f:
+                size, mtime, digest = marshal.load(f)
+            if (size, mtime) == stat_key:
+                return digest
+        except (IOError, OSError, EOFError, ValueError, TypeError):
+            pass
+
+        sha = hashlib.sha1()
+        with open(filename, 'rb') as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                sha.update(chunk)
+        digest = sha.hexdigest()
+
+        self._write(stat_path, marshal.dumps(stat_key + (digest,)))
+        return digest
+
+    def _write(self, path, data):
+        """Atomically replaces the content of a cache file."""
+        fd, temp = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            replace_file(temp, path)
+        except Exception:
+            os.remove(temp)
+            raise
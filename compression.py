@@ -0,0 +1,372 @@
+"""
+Transparent compression of L5X exports.
+
+L5X content compresses very well, so archived exports are usually kept
+compressed. Sources are identified by their leading magic bytes, and
+output files by their extension, e.g. *.L5X.gz, and decompressed or
+compressed incrementally while being parsed or written, so neither the
+compressed nor the decompressed content is ever held in full or
+written to a temporary file.
+
+The gzip, bzip2 and xz formats are supported through the standard
+library; xz requires the backports.lzma package under Python 2. Zstandard
+requires the zstandard package.
+"""
+
+from .errors import InvalidFile
+import bz2
+import collections
+import contextlib
+import io
+import os
+import zlib
+
+try:
+    import lzma
+except ImportError:
+    try:
+        from backports import lzma
+    except ImportError:
+        lzma = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Number of compressed bytes read from the source at a time.
+CHUNK_SIZE = 1 << 20
+
+
+class Codec(collections.namedtuple('Codec',
+        ['name', 'extension', 'magic', 'module', 'compressor', 'decompressor',
+         'errors'])):
+    """Description of a compression format.
+
+    :var name: Name used to select the format, e.g. *gzip*.
+    :var extension: File name extension, including the leading period.
+    :var magic: Bytes at the start of every compressed stream.
+    :var module: Name of the module implementing the format.
+    :var compressor: Callable returning a new compressor object, or None if
+                     the implementing module is not installed.
+    :var decompressor: Callable returning a new decompressor object, or None
+                       if the implementing module is not installed.
+    :var errors: Tuple of exceptions raised for corrupt data.
+    """
+    pass
+
+
+def _gzip_codec():
+    # A window size offset of 16 selects the gzip container.
+    wbits = 16 + zlib.MAX_WBITS
+    return Codec('gzip', '.gz', b'\x1f\x8b', 'zlib',
+                 lambda: zlib.compressobj(6, zlib.DEFLATED, wbits),
+                 lambda: zlib.decompressobj(wbits),
+                 (zlib.error,))
+
+
+def _bzip2_codec():
+    return Codec('bzip2', '.bz2', b'BZh', 'bz2',
+                 bz2.BZ2Compressor, bz2.BZ2Decompressor,
+                 (IOError, OSError, ValueError))
+
+
+def _xz_codec():
+    if lzma is None:
+        return Codec('xz', '.xz', b'\xfd7zXZ\x00', 'lzma', None, None, ())
+    return Codec('xz', '.xz', b'\xfd7zXZ\x00', 'lzma',
+                 lambda: lzma.LZMACompressor(lzma.FORMAT_XZ),
+                 lambda: lzma.LZMADecompressor(lzma.FORMAT_XZ),
+                 (lzma.LZMAError,))
+
+
+def _zstd_codec():
+    if zstandard is None:
+        return Codec('zstd', '.zst', b'\x28\xb5\x2f\xfd', 'zstandard',
+                     None, None, ())
+    return Codec('zstd', '.zst', b'\x28\xb5\x2f\xfd', 'zstandard',
+                 lambda: zstandard.ZstdCompressor().compressobj(),
+                 lambda: zstandard.ZstdDecompressor().decompressobj(),
+                 (zstandard.ZstdError,))
+
+
+codecs = collections.OrderedDict(
+    (c.name, c) for c in [_gzip_codec(), _bzip2_codec(), _xz_codec(),
+                          _zstd_codec()])
+
+# Number of leading bytes needed to identify any format.
+_MAGIC_SIZE = max(len(c.magic) for c in codecs.values())
+
+
+def get_codec(name):
+    """Returns the :class:`Codec` with a given name.
+
+    Raises ValueError if the name is unknown or the format's module is
+    not installed.
+    """
+    try:
+        codec = codecs[name]
+    except KeyError:
+        raise ValueError('Unknown compression format: ' + repr(name)
+                         + '; available formats are '
+                         + ', '.join(sorted(codecs)) + '.')
+    _check_available(codec)
+    return codec
+
+
+def _check_available(codec):
+    if codec.decompressor is None:
+        raise ValueError(codec.name + ' compression requires the '
+                         + codec.module + ' module.')
+
+
+def codec_for_filename(filename):
+    """Returns the :class:`Codec` implied by a file name's extension.
+
+    :returns: The codec, or None for uncompressed files.
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    for codec in codecs.values():
+        if codec.extension == ext:
+            return codec
+    return None
+
+
+def detect(f):
+    """Identifies the compression format of a binary file object.
+
+    The file position is unchanged. Objects with a peek() method, e.g.
+    sys.stdin.buffer, may be non-seekable streams; all others must
+    support seek().
+
+    :returns: The :class:`Codec`, or None for uncompressed content.
+    """
+    if hasattr(f, 'peek'):
+        head = f.peek(_MAGIC_SIZE)[:_MAGIC_SIZE]
+    else:
+        position = f.tell()
+        head = f.read(_MAGIC_SIZE)
+        f.seek(position)
+
+    for codec in codecs.values():
+        if head.startswith(codec.magic):
+            return codec
+    return None
+
+
+def is_compressed(filename):
+    """Checks if a file's content is compressed."""
+    with open(filename, 'rb') as f:
+        return detect(f) is not None
+
+
+class DecompressingReader(object):
+    """Binary file-like object reading the decompressed content of a stream.
+
+    Concatenated compressed streams, as produced by parallel compressors
+    such as pigz or pbzip2, are read as one.
+
+    :param f: Binary file-like object containing compressed data.
+    :param codec: :class:`Codec` of the compressed data.
+    """
+    def __init__(self, f, codec):
+        _check_available(codec)
+        self.f = f
+        self.codec = codec
+        self.decompressor = codec.decompressor()
+        self.pending = b''
+        self.offset = 0
+        self.finished = False
+
+        # Whether any data has been fed to the current decompressor.
+        self.started = False
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if (size is None) or (size < 0):
+            blocks = [self.pending[self.offset:]]
+            self.pending = b''
+            self.offset = 0
+            while not self.finished:
+                blocks.append(self._decompress())
+            return b''.join(blocks)
+
+        while (len(self.pending) - self.offset == 0) and not self.finished:
+            self.pending = self._decompress()
+            self.offset = 0
+        block = self.pending[self.offset:self.offset + size]
+        self.offset += len(block)
+        return block
+
+    def _decompress(self):
+        """Returns the data decompressed from the next source chunk."""
+        data = self.f.read(CHUNK_SIZE)
+        try:
+            if not data:
+                self.finished = True
+                # Python 2 decompressors cannot tell if a stream is
+                # complete.
+                if self.started and not getattr(self.decompressor, 'eof',
+                                                True):
+                    raise InvalidFile('Compressed data is truncated.')
+                return b''
+
+            blocks = []
+            while data:
+                if self._stream_ended():
+                    self.decompressor = self.codec.decompressor()
+                    self.started = False
+                try:
+                    blocks.append(self.decompressor.decompress(data))
+                except EOFError:
+                    # Raised by the Python 2 bzip2 decompressor if a stream
+                    # ended exactly at the end of the previous chunk.
+                    self.decompressor = self.codec.decompressor()
+                    continue
+                self.started = True
+                data = getattr(self.decompressor, 'unused_data', b'')
+        except self.codec.errors as e:
+            raise InvalidFile('Compressed data error: ' + str(e))
+        return b''.join(blocks)
+
+    def _stream_ended(self):
+        try:
+            return self.decompressor.eof
+        except AttributeError:
+            # Python 2 decompressors lack the eof attribute, but always
+            # retain data following the end of a stream.
+            return bool(getattr(self.decompressor, 'unused_data', b''))
+
+    def close(self):
+        self.finished = True
+        self.pending = b''
+
+
+class CompressingWriter(object):
+    """Binary file-like object compressing data written to a stream.
+
+    :param f: Binary file-like object receiving compressed data.
+    :param codec: :class:`Codec` of the output.
+    """
+    def __init__(self, f, codec):
+        _check_available(codec)
+        self.f = f
+        self.compressor = codec.compressor()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        block = self.compressor.compress(data)
+        if block:
+            self.f.write(block)
+        return len(data)
+
+    def finish(self):
+        """Writes the end of the compressed stream."""
+        self.f.write(self.compressor.flush())
+
+
+class ProgressReader(object):
+    """Binary file-like object reporting the amount of data read from a stream.
+
+    :param f: Binary file-like object being read.
+    :param progress: Callable invoked with the total number of bytes read
+                     so far after every read.
+    """
+    def __init__(self, f, progress):
+        self.f = f
+        self.progress = progress
+        self.position = 0
+        if hasattr(f, 'peek'):
+            self.peek = f.peek
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        block = self.f.read(size)
+        self.position += len(block)
+        self.progress(self.position)
+        return block
+
+    def tell(self):
+        return self.f.tell()
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        result = self.f.seek(offset, whence)
+        self.position = self.f.tell()
+        return result
+
+
+@contextlib.contextmanager
+def open_source(source, progress=None):
+    """Opens an export for reading, decompressing it if needed.
+
+    :param source: Path or binary file-like object; see :func:`detect`
+                   for the requirements of file-like objects. File-like
+                   objects are not closed.
+    :param progress: Optional callable invoked with the number of bytes,
+                     before decompression, read from the source so far.
+    :returns: A context manager yielding a binary file-like object.
+    """
+    if hasattr(source, 'read'):
+        f = source
+        opened = None
+    else:
+        f = opened = open(source, 'rb')
+
+    try:
+        if progress is not None:
+            f = ProgressReader(f, progress)
+        codec = detect(f)
+        if codec is None:
+            yield f
+        else:
+            yield DecompressingReader(f, codec)
+    finally:
+        if opened is not None:
+            opened.close()
+
+
+@contextlib.contextmanager
+def open_target(target, compression=None, buffering=CHUNK_SIZE):
+    """Opens an output file or stream for writing, compressing if needed.
+
+    :param target: Path or binary file-like object. File-like objects are
+                   not closed.
+    :param compression: Name of the output compression format. Defaults to
+                        the format implied by the extension of a path, and
+                        no compression for file-like objects.
+    :param buffering: Buffer size of files opened by path.
+    :returns: A context manager yielding a binary file-like object.
+    """
+    if compression is not None:
+        codec = get_codec(compression)
+    elif hasattr(target, 'write'):
+        codec = None
+    else:
+        codec = codec_for_filename(target)
+        if codec is not None:
+            _check_available(codec)
+
+    if hasattr(target, 'write'):
+        f = target
+        close = False
+    else:
+        f = io.open(target, 'wb', buffering=buffering)
+        close = True
+
+    try:
+        if codec is None:
+            yield f
+        else:
+            writer = CompressingWriter(f, codec)
+            yield writer
+            writer.finish()
+    finally:
+        if close:
+            f.close()
@@ -1,5 +1,6 @@
 from .dom import (ElementAccess, ElementDict, AttributeDescriptor,
                   ElementDescription, CDATAElement)
+from . import rawdata
 
 class DataType(ElementAccess):
     """Base Data Type container 
@@ -16,6 +17,28 @@ class DataType(ElementAccess):
         _members = self.get_child_element('Members')
         self.members = ElementDict(_members, types=DataTypeMember)
 
+    def get_layout(self):
+        """Returns the controller memory layout of the data type.
+
+        Layouts are computed once and shared by the entire project; see
+        :mod:`.rawdata`.
+
+        :returns: :class:`.rawdata.StructureLayout` with the offset of each member.
+        """
+        name = self.backend.get_attribute(self.element, 'Name')
+        return rawdata.get_layouts(self.backend, self.element).get_layout(name)
+
+    def get_codec(self, dims=()):
+        """Returns a compiled converter between values of the data type
+        and images of controller memory.
+
+        :param dims: Dimensions, most-significant first, for an array of the data type.
+        :returns: :class:`.rawdata.Codec`
+        """
+        name = self.backend.get_attribute(self.element, 'Name')
+        layouts = rawdata.get_layouts(self.backend, self.element)
+        return layouts.get_codec(name, list(dims))
+
 class DataTypeMember(ElementAccess):
     """Data type members
 
@@ -26,6 +49,7 @@ class DataTypeMember(ElementAccess):
     :var radix: :class:`.dom.AttributeDescriptor` Radix
     :var hidden: :class:`.dom.AttributeDescriptor` Hidden member (used mostly for Bit members) (see  1756-RM084V-EN-P Chapter 3)
     :var target: :class:`.dom.AttributeDescriptor` Target member for bit members (see  1756-RM084V-EN-P Chapter 3)
+    :var bit_number: :class:`.dom.AttributeDescriptor` Bit within the target member for bit members
     :var external_access: :class:`.dom.AttributeDescriptor` ExternalAccess
     """
 
@@ -35,6 +59,7 @@ class DataTypeMember(ElementAccess):
     radix = AttributeDescriptor('Radix')
     hidden = AttributeDescriptor('Hidden')
     target = AttributeDescriptor('Target')
+    bit_number = AttributeDescriptor('BitNumber')
     external_access = AttributeDescriptor('ExternalAccess')
 
     def __init__(self, element):
@@ -2,54 +2,59 @@
 Internal XML DOM helper inteface objects.
 """
 
-import xml.dom
+from .backend import node_backend
+import weakref
+
+try:
+    from collections.abc import (ItemsView, KeysView, ValuesView)
+except ImportError:
+    from collections import (ItemsView, KeysView, ValuesView)
 
 
 class ChildElements(object):
     """Descriptor class to acquire a list of child elements."""
     def __get__(self, accessor, owner=None):
-        nodes = accessor.element.childNodes
-        return [n for n in nodes if n.nodeType == n.ELEMENT_NODE]
+        return accessor.backend.children(accessor.element)
 
         
 class ElementAccess(object):
-    """Generic base interface for accessing an XML element."""
+    """Generic base interface for accessing an XML element.
+
+    Attributes are held in slots so the numerous data accessors deriving
+    from this class can omit an instance dictionary; other subclasses
+    still get one.
+    """
+    __slots__ = ('element', 'backend', 'doc', '__weakref__')
     child_elements = ChildElements()
 
     def __init__(self, element):
         self.element = element
+        self.backend = node_backend(element)
         self.get_doc()
 
     def get_doc(self):
         """Extracts a reference to the top-level XML document."""
-        node = self.element
-        while node.parentNode != None:            
-            node = node.parentNode
-        self.doc = node
+        self.doc = self.backend.document(self.element)
 
     def get_child_element(self, name):
         """Finds a child element with a specific tag name."""
-        for e in self.child_elements:
-            if (e.tagName == name):
-                return e
-
-        raise KeyError()
+        element = self.backend.child_element(self.element, name)
+        if element is None:
+            raise KeyError()
+        return element
 
     def create_element(self, name, attributes={}):
         """Wrapper to create a new element with a set of attributes."""
-        new = self.doc.createElement(name)
-        for attr in attributes.keys():
-            new.setAttribute(attr, attributes[attr])
-        return new
+        return self.backend.create_element(self.doc, name, attributes)
 
     def _create_append_element(self, parent, name, attributes={}):  
         new = self.create_element(name, attributes) 
-        parent.appendChild(new)        
+        self.backend.append_child(parent, new)
         return new
 
     def append_child(self, node):
         """Appends a node to the element's set of children."""
-        self.element.appendChild(node)
+        self.backend.append_child(self.element, node)
 
 
 class CDATAElement(ElementAccess):
@@ -73,28 +78,20 @@ class CDATAElement(ElementAccess):
             ElementAccess.__init__(self, element)
 
             # Add the child CDATA section.
-            self.node = parent.doc.createCDATASection('')
-            self.append_child(self.node)
+            self.set('')
 
     def get_existing(self):
-        """Locates a CDATA node within an existing element."""
-        for child in self.element.childNodes:
-            if child.nodeType == child.CDATA_SECTION_NODE:
-                self.node = child
-
-        # Verify a CDATA node was found.
-        try:
-            s = str(self)
-        except AttributeError:
+        """Verifies a CDATA node exists within an existing element."""
+        if self.backend.get_cdata(self.element) is None:
             raise AttributeError('No CDATA node found')
 
     def __str__(self):
         """Returns the current string content."""
-        return self.node.data
+        return self.backend.get_cdata(self.element)
 
     def set(self, s):
         """Sets the CDATA section content."""
-        self.node.data = s
+        self.backend.set_cdata(self.element, s)
 
 
 class ElementDescription(object):
@@ -142,40 +139,34 @@ class ElementDescription(object):
             except KeyError:
                 pass
             else:
-                instance.element.removeChild(element)
-                element.unlink()
+                instance.backend.remove_child(instance.element, element)
 
         else:
             raise TypeError('Description must be a string or None')
 
     def create(self, instance):
         """Creates a new Description element."""
-        new = CDATAElement(parent=instance, name=self.use_element)
+        backend = instance.backend
+        element = instance.create_element(self.use_element)
 
         # Search for any elements listed in the follow attribute.
         follow = None
         for e in instance.child_elements:
-            if e.tagName in self.follow:
+            if backend.tag_name(e) in self.follow:
                 follow = e
 
         # Create as first child if no elements to follow were found.
         if follow is None:
-            if new.element is not instance.element.firstChild:
-                # New element is not already the first element
-                instance.element.insertBefore(new.element,
-                                              instance.element.firstChild)
+            backend.prepend_child(instance.element, element)
 
         # If any follow elements exist, insert the new description
-        # element after the last one found. DOM node operations do not
-        # provide an append-after method so an insert-remove-insert
-        # procedure is used.
-        #Possibly is causing white space after CDATA element.
+        # element after the last one found.
         else:
-            instance.element.insertBefore(new.element, follow)
-            instance.element.removeChild(follow)
-            instance.element.insertBefore(follow, new.element)
+            backend.insert_after(instance.element, element, follow)
 
-        return new
+        # Add the child CDATA section.
+        backend.set_cdata(element, '')
+        return CDATAElement(element)
 
 
 class AttributeDescriptor(object):
@@ -196,14 +187,15 @@ class AttributeDescriptor(object):
 
     def __get__(self, instance, owner=None): 
         raw = None
+        backend = instance.backend
         #If the current element should be used to look for the attribute
         if self.use_element is None:            
-            if (instance.element.hasAttribute(self.name)):
-                raw = instance.element.getAttribute(self.name) 
+            if (backend.has_attribute(instance.element, self.name)):
+                raw = backend.get_attribute(instance.element, self.name)
         else: # If a child element named *use_elment* should be used.
             _use_element = instance.get_child_element(self.use_element)
-            if (_use_element.hasAttribute(self.name)):
-                raw = _use_element.getAttribute(self.name)  
+            if (backend.has_attribute(_use_element, self.name)):
+                raw = backend.get_attribute(_use_element, self.name)
         if raw is not None:      
             return self.from_xml(raw)
         return None               
@@ -212,24 +204,22 @@ class AttributeDescriptor(object):
         if self.read_only is True:
             raise AttributeError('Attribute is read-only')
         new_value = self.to_xml(value)
+        backend = instance.backend
         if new_value is not None:            
             if self.use_element is None:  # is the current element should be used              
-                instance.element.setAttribute(self.name, new_value)   
+                backend.set_attribute(instance.element, self.name, new_value)
             else: #If a child element should be used
                 _use_element = instance.get_child_element(self.use_element)
-                _use_element.setAttribute(self.name, new_value)
+                backend.set_attribute(_use_element, self.name, new_value)
  
         # Delete the attribute if value is None, ignoring the case if the
         # attribute didn't exist to begin with.
         else:
-            try:
-                if self.use_element is None:
-                    instance.element.removeAttribute(self.name)
-                else:
-                    _use_element = instance.get_child_element(self.use_element)
-                    _use_element.removeAttribute(self.name)
-            except xml.dom.NotFoundErr:
-                pass
+            if self.use_element is None:
+                backend.remove_attribute(instance.element, self.name)
+            else:
+                _use_element = instance.get_child_element(self.use_element)
+                backend.remove_attribute(_use_element, self.name)
 
 
     def from_xml(self, value):
@@ -260,6 +250,28 @@ class ElementDictNames(object):
         raise AttributeError('Read-only attribute.')
 
 
+class ElementDictIndex(object):
+    """Descriptor class which builds part of an ElementDict's index on first
+    access.
+
+    The value is returned by the instance's build_<attr> method, and stored
+    in the instance under the same attribute name, which takes precedence
+    over this descriptor for all subsequent access.
+
+    :param attr: Name of the attribute this descriptor is assigned to.
+    """
+    def __init__(self, attr):
+        self.attr = attr
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+
+        value = getattr(instance, 'build_' + self.attr)()
+        instance.__dict__[self.attr] = value
+        return value
+
+
 class ElementDict(ElementAccess):
     """Container which provides access to a group of XML elements.
 
@@ -267,7 +279,9 @@ class ElementDict(ElementAccess):
     by index notation to find the child with the matching key attribute.
     Instead of returning the actual XML element, a member class is
     instantiated and returned which is used to handle access to the child's
-    data.
+    data. The same instance is returned for a member as long as it remains
+    referenced. Member keys are read only when first needed, so a
+    dictionary can be created, and its length found, without indexing.
     
     :param parent: Parent element that is associated with the dictionary
     :param key_attr: Attribute to be used as the dictionary key. If this is None then sequential numbers will be used.
@@ -280,8 +294,12 @@ class ElementDict(ElementAccess):
     :param tag_filter: Select only the child elements which have this XML element name.
     :param use_tagname: Use the element name to determine the type of object to return instead of *key_attr*
     :param attr_filter: select only the child elements that have this attribute
+    :param ignore_case: Match string keys regardless of case, as Logix does for names. Keys with the exact case are still found first.
     """
     names = ElementDictNames()
+    member_elements = ElementDictIndex('member_elements')
+    members = ElementDictIndex('members')
+    folded = ElementDictIndex('folded')
 
     def __init__(self, parent, \
                  key_attr=None, \
@@ -292,84 +310,245 @@ class ElementDict(ElementAccess):
                  member_args=[], \
                  tag_filter=None, \
                  use_tagname=False, \
-                 attr_filter=None):
+                 attr_filter=None, \
+                 ignore_case=False):
         ElementAccess.__init__(self, parent)
+        self.key_attr = key_attr
         self.types = types
         self.type_attr = type_attr
         self.dfl_type = dfl_type
+        self.key_type = key_type
         self.member_args = member_args
+        self.tag_filter = tag_filter
         self.use_tagname = use_tagname
-       
-        #Used to select elements based on their name
-        m_elements = self.child_elements
-        
-        #When no optional arguments are used all child elements of current element
-        if tag_filter is None and attr_filter is None:
-            member_elements = m_elements
-        
+        self.attr_filter = attr_filter
+        self.ignore_case = ignore_case
+
+        # Member classes are resolved per member only if given a mapping;
+        # a single class is used directly.
+        if callable(types):
+            self.member_type = types
+        else:
+            self.member_type = None
+
+        # Weak references to accessors previously returned, keyed by
+        # element, so a member is not rebuilt while its accessor remains
+        # referenced elsewhere. Dead references are simply replaced rather
+        # than removed by callback, as there is at most one per member.
+        self.accessors = {}
+
+    def build_member_elements(self):
+        """Selects the child elements which are members of the dictionary."""
+        backend = self.backend
+
+        #Selects all child elements that have the attribute *key_attr*
+        if self.attr_filter is not None:
+            return [e for e in self.child_elements
+                    if backend.has_attribute(e, self.key_attr)]
+
         #Selects all child elements with tag = *tag_filter* are selected
-        if tag_filter is not None:
-            member_elements = []
-            for e in m_elements:
-                if e.nodeName == tag_filter:
-                        member_elements += [e]
-                        
-        #Selects all child elements that have the attribute *key_attr*            
-        if attr_filter is not None:
-            member_elements = []
-            for e in m_elements:                
-                if e.hasAttribute(key_attr):
-                    member_elements += [e]                            
+        if self.tag_filter is not None:
+            return list(backend.children_named(self.element, self.tag_filter))
+
+        #When no optional arguments are used all child elements of current element
+        return self.child_elements
+
+    def build_members(self):
+        """Indexes the member elements by key."""
+        member_elements = self.member_elements
         
         #Generate sequential keys if no attribute key is available
-        if key_attr is None:
+        if self.key_attr is None:
             keys = tuple(str(y) for y in range(0,len(member_elements)))
         else: # 
-            keys = [key_type(e.getAttribute(key_attr)) for e in member_elements]
-        self.members = dict(zip(keys, member_elements))
+            backend = self.backend
+            key_type = self.key_type
+            keys = [key_type(backend.get_attribute(e, self.key_attr))
+                    for e in member_elements]
+        return dict(zip(keys, member_elements))
+
+    def build_folded(self):
+        """Maps case-folded keys to member keys."""
+        folded = {}
+        for key in self.members:
+            folded.setdefault(key.lower(), key)
+        return folded
+
+    def find_key(self, key):
+        """Finds the member key matching a given key.
+
+        Keys with a different case match only if *ignore_case* was enabled.
+        Raises a KeyError if no member matches.
+        """
+        if key in self.members:
+            return key
+        if self.ignore_case and hasattr(key, 'lower'):
+            try:
+                return self.folded[key.lower()]
+            except KeyError:
+                pass
+        raise KeyError("{0} not found".format(key))
+
+    def duplicates(self):
+        """Finds members whose keys differ only by case, or not at all.
+
+        Logix rejects such names, but they may appear in hand-edited
+        exports, where all but one of them are otherwise inaccessible.
+
+        :returns: A list of lists of keys, in document order, each holding
+                  the keys of a group of conflicting members.
+        """
+        if self.key_attr is None:
+            return []
+
+        backend = self.backend
+        groups = {}
+        order = []
+        for element in self.member_elements:
+            key = backend.get_attribute(element, self.key_attr)
+            group = groups.get(key.lower())
+            if group is None:
+                group = groups[key.lower()] = []
+                order.append(group)
+            group.append(key)
+        return [group for group in order if len(group) > 1]
 
     def __getitem__(self, key):
         """Return a member class suitable for accessing a child element."""
         try:
             element = self.members[key]
         except KeyError:
-            raise KeyError("{0} not found".format(key))
-
-        args = [element]
-        args.extend(self.member_args)
-        
-        try:            
-            return self.types(*args)
-        except TypeError:
-            if self.type_attr is not None:
-                type_name = element.getAttribute(self.type_attr)
-            elif self.use_tagname:                
-                type_name = element.nodeName
-            else:
-                type_name = key            
-            return self.types.get(type_name, self.dfl_type)(*args)
+            element = self.members[self.find_key(key)]
+
+        ref = self.accessors.get(element)
+        if ref is not None:
+            accessor = ref()
+            if accessor is not None:
+                return accessor
+
+        member_type = self.member_type
+        if member_type is None:
+            member_type = self.get_member_type(key, element)
+        accessor = member_type(element, *self.member_args)
+        self.accessors[element] = weakref.ref(accessor)
+        return accessor
+
+    def get_member_type(self, key, element):
+        """Looks up the class used to access a member in the types mapping."""
+        if self.type_attr is not None:
+            type_name = self.backend.get_attribute(element, self.type_attr)
+        elif self.use_tagname:
+            type_name = self.backend.tag_name(element)
+        else:
+            type_name = key
+        return self.types.get(type_name, self.dfl_type)
 
     def __delitem__(self, key):
         """Delete a child element by key"""
-        try:
-            element = self.members[key]
-        except KeyError:
-            raise KeyError("{0} not found".format(key))
+        key = self.find_key(key)
+        element = self.members[key]
         
-        old_child = self.element.removeChild(element)
-        old_child.unlink()
+        self.backend.remove_child(self.element, element)
         
         #Delete item from internal dictionary
         del self.members[key]
+        self.accessors.pop(element, None)
+
+        # Another member may differ from the deleted key only by case, so
+        # the folded index is rebuilt when next needed.
+        self.__dict__.pop('folded', None)
+        self.__dict__.pop('member_elements', None)
 
     def __len__(self):
-        count = 0
-        for member in self.members:
-            count += 1
-        return count
+        # Counting members does not require them to be indexed; once they
+        # are, the index also reflects appended and deleted members.
+        try:
+            members = self.__dict__['members']
+        except KeyError:
+            return len(self.member_elements)
+        return len(members)
+
+    def __contains__(self, key):
+        try:
+            self.find_key(key)
+        except KeyError:
+            return False
+        return True
     
     def append(self, key, value):
+        """Adds a member element, replacing any member with the same key."""
+        replaced = self.members.get(key)
+        if replaced is not None:
+            self.accessors.pop(replaced, None)
         self.members[key] = value
+        self.__dict__.pop('member_elements', None)
+
+        folded = self.__dict__.get('folded')
+        if folded is not None:
+            folded.setdefault(key.lower(), key)
+
+    def extend(self, items):
+        """Adds member elements from a sequence of (key, element) pairs.
+
+        Equivalent to calling append() for each pair, with the index
+        updated once for all of them.
+        """
+        items = list(items)
+        members = self.members
+        for key, value in items:
+            replaced = members.get(key)
+            if replaced is not None:
+                self.accessors.pop(replaced, None)
+        members.update(items)
+        self.__dict__.pop('member_elements', None)
+
+        folded = self.__dict__.get('folded')
+        if folded is not None:
+            for key, value in items:
+                folded.setdefault(key.lower(), key)
         
     def __iter__(self):        
         return iter(self.members)
+
+    def keys(self):
+        """Returns a view of the member keys."""
+        return KeysView(self)
+
+    def values(self):
+        """Returns a view creating an accessor for each member as iterated."""
+        return ValuesView(self)
+
+    def items(self):
+        """Returns a view of (key, accessor) pairs, creating accessors as
+        iterated."""
+        return ItemsView(self)
+
+
+class LazyElementDict(object):
+    """Descriptor class which creates an ElementDict on first access.
+
+    The element containing the dictionary's members is located and indexed
+    only when the attribute is first read. The resulting ElementDict is then
+    stored in the instance under the same attribute name, which takes
+    precedence over this descriptor for all subsequent access.
+
+    :param attr: Name of the attribute this descriptor is assigned to.
+    :param path: Sequence of element names leading from the instance's element to the element containing the members.
+    :param kwargs: Additional parameters passed to :class:`ElementDict`.
+    """
+    def __init__(self, attr, path, **kwargs):
+        self.attr = attr
+        self.path = path
+        self.kwargs = kwargs
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+
+        element = instance.element
+        for name in self.path:
+            element = ElementAccess(element).get_child_element(name)
+
+        members = ElementDict(element, **self.kwargs)
+        instance.__dict__[self.attr] = members
+        return members
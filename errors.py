@@ -15,3 +15,11 @@ class RungNumberOutOfRangeError(Exception):
 class SheetNumberOutOfRangeError(Exception):
     """Raised if the given sheet number is out of range"""
     pass
+
+class PartialProjectError(Exception):
+    """Raised when writing a project opened with skipped sections"""
+    pass
+
+class OperationCancelled(Exception):
+    """Raised within an asynchronous operation that was cancelled"""
+    pass
@@ -81,13 +81,14 @@ class Module(ElementAccess):
                                             'Type' : 'ICP',
                                             'Upstream' : 'false'}) 
         bus = prj._create_append_element(prj.element, 'Bus', {'Size' : '10'})
-        port.appendChild(bus)
-        ports.appendChild(port)
-        element.appendChild(ekey)
-        element.appendChild(ports)
+        prj.backend.append_child(port, bus)
+        prj.backend.append_child(ports, port)
+        prj.backend.append_child(element, ekey)
+        prj.backend.append_child(element, ports)
         
         #append module to the xml structure
-        prj.controller.element.getElementsByTagName("Modules")[0].appendChild(element)
+        modules = prj.controller.get_child_element('Modules')
+        prj.backend.append_child(modules, element)
         #Add Module to modules dictionary
         prj.modules.append('Local', element)  
         
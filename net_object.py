@@ -81,9 +81,8 @@ class FBD_TextBox(FBD_Object):
                                                     'Y' : str(y)})
         
         """Create Text Element and add CDATA rung data to it"""
-        cdataText = parent.doc.createCDATASection(text)
         text_element = parent._create_append_element(new.element, 'Text') 
-        text_element.appendChild(cdataText)
+        parent.backend.set_cdata(text_element, text)
         return new
         
 class FBD_Default(FBD_Object):
@@ -0,0 +1,357 @@
+"""
+Flat tables of tag operands and values.
+
+Listing every value within a scope through the accessor classes means
+building an accessor for each structure member and array element and
+searching the tag's comments for each one. The functions in this module
+instead walk the decorated data of each tag directly, yielding one
+record per atomic value, with the tag's comments indexed once, so a
+scope is listed in time linear in the size of its data.
+
+    for record in prj.controller.operands():
+        print(record.operand, record.value)
+
+    prj.programs['MainProgram'].write_operands('main.csv')
+
+Individual operands are located with :func:`resolve`, which follows a
+path through the data accessors compiled once per data type and operand
+shape, i.e. the operand with its subscripts and bit numbers omitted.
+
+    prj.controller.resolve('Conveyor[4].Drive.Status.12').value = 1
+"""
+
+import collections
+import csv
+import io
+import re
+import sys
+import weakref
+
+
+class OperandRecord(collections.namedtuple('OperandRecord',
+        ['operand', 'data_type', 'radix', 'value', 'description'])):
+    """A single atomic value within a tag.
+
+    :var operand: Full operand, e.g. *Motor[3].Speed* or *Status.5*.
+    :var value: Value converted as by the data accessors, i.e. an int or
+                float for atomic types; the raw string for other types and
+                ASCII radix values.
+    :var description: Comment of the operand, or the tag's description for
+                      atomic tags; None if not documented.
+    """
+    __slots__ = ()
+
+
+# Value conversions of atomic data types.
+_CONVERSIONS = {'SINT':int, 'INT':int, 'DINT':int, 'BOOL':int, 'REAL':float}
+
+# Widths of integer types whose bits are listed individually.
+_BITS = {'SINT':8, 'INT':16, 'DINT':32}
+
+# Data element names that hold a single value.
+_VALUE_ELEMENTS = frozenset(['DataValue', 'DataValueMember'])
+
+
+def iter_operands(tags, bits=False):
+    """Yields an :class:`OperandRecord` for every atomic value of a set of tags.
+
+    Values are listed in document order; tags without decorated data, such
+    as aliases, are omitted.
+
+    :param tags: :class:`.dom.ElementDict` of tags, e.g. the tags of a Scope or Program.
+    :param bits: If True, every bit of SINT, INT and DINT values is also listed as a BOOL operand following the integer.
+    """
+    backend = tags.backend
+    get_attribute = backend.get_attribute
+    for tag in backend.children_named(tags.element, 'Tag'):
+        data = None
+        for e in backend.children_named(tag, 'Data'):
+            if get_attribute(e, 'Format') == 'Decorated':
+                data = backend.children(e)
+                break
+        if not data:
+            continue
+
+        name = get_attribute(tag, 'Name')
+        comments = _get_comments(backend, tag)
+        description = backend.child_element(tag, 'Description')
+        if description is not None:
+            comments[''] = backend.get_cdata(description)
+
+        # Elements are visited depth first, in document order, along with
+        # the operand suffix, data type and radix applicable to each.
+        stack = [(data[0], '', None, None)]
+        while stack:
+            element, suffix, data_type, radix = stack.pop()
+            element_name = backend.tag_name(element)
+
+            if (element_name in _VALUE_ELEMENTS) or (
+                    (element_name == 'Element')
+                    and backend.has_attribute(element, 'Value')):
+                if element_name != 'Element':
+                    data_type = get_attribute(element, 'DataType')
+                    radix = get_attribute(element, 'Radix') or None
+                for record in _records(backend, element, name, suffix,
+                                       data_type, radix, comments, bits):
+                    yield record
+                continue
+
+            if element_name in ('Array', 'ArrayMember'):
+                data_type = get_attribute(element, 'DataType')
+                radix = get_attribute(element, 'Radix') or None
+
+            # Members are named, array elements are indexed, and the
+            # Structure element within an array element is neither.
+            children = backend.children(element)
+            for child in reversed(children):
+                member = get_attribute(child, 'Name')
+                if member:
+                    child_suffix = suffix + '.' + member
+                else:
+                    child_suffix = suffix + get_attribute(child, 'Index')
+                stack.append((child, child_suffix, data_type, radix))
+
+
+def _get_comments(backend, tag):
+    """Indexes the comments of a tag by upper-case operand suffix."""
+    comments = {}
+    element = backend.child_element(tag, 'Comments')
+    if element is not None:
+        for comment in backend.children(element):
+            operand = backend.get_attribute(comment, 'Operand')
+            comments[operand.upper()] = backend.get_cdata(comment)
+    return comments
+
+
+def _records(backend, element, name, suffix, data_type, radix, comments,
+             bits):
+    """Builds the records of a single value element."""
+    if backend.has_attribute(element, 'Value'):
+        raw = backend.get_attribute(element, 'Value')
+    else:
+        # String data is held as character data instead of an attribute.
+        raw = backend.get_cdata(element)
+        if raw is None:
+            raw = backend.get_text(element)
+
+    convert = _CONVERSIONS.get(data_type)
+    converted = (convert is not None) and (radix != 'ASCII')
+    if converted:
+        value = convert(raw)
+    else:
+        value = raw
+
+    key = suffix.upper()
+    records = [OperandRecord(name + suffix, data_type, radix, value,
+                             comments.get(key))]
+
+    if bits and converted and (data_type in _BITS):
+        for bit in range(_BITS[data_type]):
+            bit_suffix = '.' + str(bit)
+            records.append(OperandRecord(name + suffix + bit_suffix, 'BOOL',
+                                         None, (value >> bit) & 1,
+                                         comments.get(key + bit_suffix)))
+    return records
+
+
+def write_csv(records, target):
+    """Writes operand records as CSV, preceded by a header row.
+
+    :param records: Iterable of :class:`OperandRecord`.
+    :param target: Path of the output file, or a text file object opened with newline='' under Python 3, or a binary file object under Python 2.
+    """
+    if hasattr(target, 'write'):
+        _write_csv(records, target)
+        return
+
+    if sys.version_info[0] < 3:
+        f = open(target, 'wb')
+    else:
+        f = io.open(target, 'w', newline='', encoding='utf-8')
+    with f:
+        _write_csv(records, f)
+
+
+def _write_csv(records, f):
+    writer = csv.writer(f)
+    writer.writerow(OperandRecord._fields)
+    if sys.version_info[0] < 3:
+        # The Python 2 csv module only writes byte strings.
+        for record in records:
+            writer.writerow([_encode(field) for field in record])
+    else:
+        writer.writerows(records)
+
+
+def _encode(field):
+    if isinstance(field, type(u'')):
+        return field.encode('utf-8')
+    return field
+
+
+# An operand is split into its tag name and the remainder, whose numbers
+# are the parameters of the operand; the remainder with the numbers
+# replaced is the template of the operand's shape.
+_OPERAND = re.compile(r'\s*([A-Za-z_]\w*)(.*?)\s*$', re.S)
+_NUMBER = re.compile(r'(?<!\w)\d+')
+
+# Components of a template: a member, a bit number, or an array subscript.
+_COMPONENT = re.compile(r'\.([A-Za-z_]\w*)|\.(#)|\[\s*(#(?:\s*,\s*#)*)\s*\]')
+
+# Shapes of the templates parsed so far.
+_shapes = {}
+
+# Compiled operand paths, keyed by document and then by data type,
+# tag dimensions and operand shape.
+_paths = weakref.WeakKeyDictionary()
+
+
+def parse_operand(operand):
+    """Splits an operand into its tag name, shape and parameters.
+
+    The shape lists the components of the operand following the tag
+    name: member names as strings, the number of indices of each array
+    subscript as integers, and None for bit numbers. The parameters are
+    the subscript indices and bit numbers, in order.
+
+    :returns: (tag name, shape tuple, parameter list)
+    """
+    match = _OPERAND.match(operand)
+    if (match is None) or ('#' in operand):
+        raise ValueError('Invalid operand: {0}'.format(operand))
+    name, rest = match.groups()
+    template = _NUMBER.sub('#', rest)
+    try:
+        shape = _shapes[template]
+    except KeyError:
+        shape = _parse_template(template, operand)
+        _shapes[template] = shape
+    return name, shape, [int(n) for n in _NUMBER.findall(rest)]
+
+
+def _parse_template(template, operand):
+    """Converts the template of an operand into its shape."""
+    shape = []
+    pos = 0
+    while pos < len(template):
+        match = _COMPONENT.match(template, pos)
+        if match is None:
+            raise ValueError('Invalid operand: {0}'.format(operand))
+        member, bit, index = match.groups()
+        if member is not None:
+            shape.append(member)
+        elif bit is not None:
+            shape.append(None)
+        else:
+            shape.append(index.count('#'))
+        pos = match.end()
+    return tuple(shape)
+
+
+def resolve(tags, operand):
+    """Locates the data accessor of an operand.
+
+    Member names are matched regardless of case.
+
+    :param tags: :class:`.dom.ElementDict` of tags, e.g. the tags of a Scope or Program.
+    :param operand: Operand, e.g. *Conveyor[4].Drive.Status.12*.
+    :returns: Data accessor of the operand; its value is available through the value attribute.
+    """
+    name, shape, params = parse_operand(operand)
+    tag = tags[name]
+    data = tag.data
+    if data is None:
+        raise ValueError('Tag {0} has no data'.format(name))
+    if not shape:
+        return data
+
+    try:
+        paths = _paths[tags.doc]
+    except KeyError:
+        paths = _paths[tags.doc] = {}
+    get_attribute = tags.backend.get_attribute
+    key = (get_attribute(tag.element, 'DataType').upper(),
+           get_attribute(tag.element, 'Dimensions'), shape)
+    try:
+        steps = paths[key]
+    except KeyError:
+        steps = _compile(data, shape, params)
+        paths[key] = steps
+
+    for step in steps:
+        data = step(data, params)
+    return data
+
+
+def _compile(data, shape, params):
+    """Builds the steps of an operand path by following it once.
+
+    Each step is a callable returning the next accessor given the
+    current accessor and the operand's parameters.
+    """
+    steps = []
+    pos = 0
+    for component in shape:
+        if component is None:
+            step = _bit_step(data, pos)
+            pos += 1
+        elif isinstance(component, int):
+            step = _index_step(data, component, pos)
+            pos += component
+        else:
+            step = _member_step(data, component)
+        data = step(data, params)
+        steps.append(step)
+    return steps
+
+
+def _member_step(data, name):
+    try:
+        names = data.names
+    except AttributeError:
+        raise TypeError('Members of {0} cannot be accessed'.format(
+            type(data).__name__))
+
+    # Member names are fixed by the data type, so the case of the name is
+    # resolved once when the path is compiled.
+    folded = name.upper()
+    for member in names:
+        if member.upper() == folded:
+            break
+    else:
+        raise KeyError('{0} not found'.format(name))
+
+    def step(data, params):
+        return data.members[member]
+    return step
+
+
+def _index_step(data, count, pos):
+    dims = getattr(data, 'dims', None)
+    if (dims is None) or data.address:
+        raise TypeError('{0} is not an array'.format(type(data).__name__))
+    if count != len(dims):
+        raise IndexError('Expected {0} indices, got {1}'.format(
+            len(dims), count))
+
+    # Subscripts are given most-significant first, as are element keys.
+    dims = tuple(reversed(dims))
+    end = pos + count
+
+    def step(data, params):
+        index = params[pos:end]
+        for i, d in zip(index, dims):
+            if i >= d:
+                raise IndexError('Array index out of range')
+        return data.members['[' + ','.join([str(i) for i in index]) + ']']
+    return step
+
+
+def _bit_step(data, pos):
+    if hasattr(data, 'dims') or not hasattr(data, 'validate_bit_number'):
+        raise TypeError('Bits of {0} cannot be accessed'.format(
+            type(data).__name__))
+
+    def step(data, params):
+        return data[params[pos]]
+    return step
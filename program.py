@@ -3,14 +3,22 @@ Objects implementing program access.
 """
 
 from .dom import (ElementAccess, ElementDict, AttributeDescriptor,
-                  ElementDescription, CDATAElement, ChildElements, ElementDictNames)
-from .tag import Tag
+                  ElementDescription, CDATAElement, ChildElements, ElementDictNames,
+                  LazyElementDict)
+from .tag import (Tag, create_tags)
+from .operands import (iter_operands, write_csv, resolve)
 from .net_object import *
 from .errors import *
 import ctypes
 import string
 import xml.dom
 
+
+# Routine accessor classes keyed by the Type attribute of Routine elements.
+# Populated at the end of this module once the routine classes are defined.
+routine_types = {}
+
+
 class Program(ElementAccess):
     """Top level container to hold a program in.
 
@@ -21,31 +29,21 @@ class Program(ElementAccess):
     :var test_edits: :class:`.dom.AttributeDescriptor` Indication of whether or not any edits or test sections of logic are in place
     :var main_routine_name: :class:`.dom.AttributeDescriptor` Name  of the main routine.This routine is the only routine that is implicitly called within the program.
     :var disabled: :class:`.dom.AttributeDescriptor` Indication of whether or not the program has been disabled.
-    :var tags: :class:`.dom.ElementDict` Dictionary for storing program scoped tags
-    :var routines: :class:`.dom.ElementDict` Dictionary for routines"""
+    :var tags: :class:`.dom.ElementDict` Dictionary for storing program scoped tags; located and indexed on first access.
+    :var routines: :class:`.dom.ElementDict` Dictionary for routines; located and indexed on first access."""
     description = ElementDescription()
     test_edits = AttributeDescriptor('TestEdits', False)
     main_routine_name = AttributeDescriptor('MainRoutineName', False)
     disabled = AttributeDescriptor('Disabled', False)
+    tags = LazyElementDict('tags', ['Tags'], key_attr='Name', types=Tag,
+                           ignore_case=True)
+    routines = LazyElementDict('routines', ['Routines'], key_attr='Name',
+                               types=routine_types, type_attr='Type',
+                               ignore_case=True)
 
-    def __init__(self, element):
-        ElementAccess.__init__(self, element)
-
-        tag_element = self.get_child_element('Tags')
-        self.tags = ElementDict(tag_element, key_attr='Name', types=Tag)
-
-        routine_element = self.get_child_element('Routines')
-        self.routines = ElementDict(routine_element, \
-                                    key_attr='Name', \
-                                    types={'RLL' : RLLRoutine, \
-                                    'FBD' : FBDRoutine, \
-                                    'SFC' : SFCRoutine, \
-                                    'ST' :  STRoutine,} \
-                                    ,\
-                                    type_attr="Type")
     @classmethod
     def create(cls, prj, name):
-        programs = prj.controller.element.getElementsByTagName('Programs')[0]
+        programs = prj.controller.get_child_element('Programs')
         element = prj._create_append_element(programs, \
                                              'Program', \
                                              {'Disabled' : 'false',
@@ -61,6 +59,38 @@ class Program(ElementAccess):
 
         return program
 
+    def operands(self, bits=False):
+        """Lists every atomic value of the program's tags.
+
+        :param bits: If True, the bits of integer values are also listed.
+        :returns: Iterator of :class:`.operands.OperandRecord`; see :func:`.operands.iter_operands`.
+        """
+        return iter_operands(self.tags, bits)
+
+    def write_operands(self, target, bits=False):
+        """Writes every atomic value of the program's tags as CSV.
+
+        :param target: Path or file object; see :func:`.operands.write_csv`.
+        :param bits: If True, the bits of integer values are also listed.
+        """
+        write_csv(self.operands(bits), target)
+
+    def resolve(self, operand):
+        """Locates the data accessor of an operand among the program's tags.
+
+        :param operand: Operand, e.g. *Conveyor[4].Drive.Status.12*.
+        :returns: Data accessor of the operand; see :func:`.operands.resolve`.
+        """
+        return resolve(self.tags, operand)
+
+    def create_tags(self, rows, project=None):
+        """Creates any number of tags within the program at once.
+
+        :param rows: Iterable of mappings of :meth:`.tag.Tag.create` keyword arguments; see :func:`.tag.create_tags`.
+        :param project: Project defining the structure data types; only required for structure tags given a value.
+        """
+        create_tags(self.tags, rows, project)
+
 
 
 class SheetSize(AttributeDescriptor):
@@ -146,7 +176,7 @@ class RLLRoutine(Routine):
 
     @classmethod
     def create(cls, program, name):
-        routines = program.element.getElementsByTagName('Routines')[0]
+        routines = program.get_child_element('Routines')
 
         element = program._create_append_element(routines, \
                                              'Routine', {'Name' : name,
@@ -178,7 +208,7 @@ class FBDRoutine(Routine):
 
     @classmethod
     def create(cls, program, name):
-        routines = program.element.getElementsByTagName('Routines')[0]
+        routines = program.get_child_element('Routines')
         element = program._create_append_element(routines, \
                                              'Routine', {'Name' : name,
                                                   'Type' : 'FBD'})
@@ -208,7 +238,7 @@ class SFCRoutine(Routine):
 
     @classmethod
     def create(cls, program, name):
-        routines = program.element.getElementsByTagName('Routines')[0]
+        routines = program.get_child_element('Routines')
         element = program._create_append_element(routines, \
                                              'Routine', {'Name' : name,
                                                   'Type' : 'SFC'})
@@ -234,7 +264,7 @@ class STRoutine(Routine):
 
     @classmethod
     def create(cls, program, name):
-        routines = program.element.getElementsByTagName('Routines')[0]
+        routines = program.get_child_element('Routines')
         element = program._create_append_element(routines, \
                                              'Routine', {'Name' : name,
                                                   'Type' : 'ST'})
@@ -306,10 +336,8 @@ class Rung(ElementAccess):
             CDATAElement(self.get_child_element('Comment')).set(value)
         except KeyError:
             element = self.create_element('Comment', {})
-            self.element.insertBefore(element, self.element.firstChild)
-            node = self.doc.createCDATASection('')
-            element.appendChild(node)
-            CDATAElement(self.get_child_element('Comment')).set(value)
+            self.backend.prepend_child(self.element, element)
+            self.backend.set_cdata(element, value)
 
     @classmethod
     def create(cls, routine, text, number=None):
@@ -323,14 +351,13 @@ class Rung(ElementAccess):
         if not text.endswith(";"):
             raise ValueError("Ladder Logic rungs must end with a semicolon")
         """Selects the RLLContent element to add the rung to"""
-        rllcontent = routine.element.getElementsByTagName('RLLContent')[0]
+        rllcontent = routine.get_child_element('RLLContent')
         element = routine._create_append_element(rllcontent, \
                                              'Rung', {'Number' : str(number),
                                                   'Type' : 'N'})
         """Create Text Element and add CDATA rung data to it"""
-        cdataText =routine.doc.createCDATASection(text)
         text_element = routine._create_append_element(element, 'Text')
-        text_element.appendChild(cdataText)
+        routine.backend.set_cdata(text_element, text)
 
         rung = Rung(element)
         routine.rungs.append(str(number), rung.element)
@@ -390,9 +417,15 @@ class Sheet(ElementAccess):
             if not (number >= 0 and number < len(routine.sheets)):
                 raise SheetNumberOutOfRangeError()
         """Selects the FBDContent element to add the sheet to"""
-        content = routine.element.getElementsByTagName('FBDContent')[0]
+        content = routine.get_child_element('FBDContent')
         element = routine._create_append_element(content, \
                                              'Sheet', {'Number' : str(number)})
         sheet = Sheet(element)
         routine.sheets.append(str(number), sheet.element)
         return sheet
+
+
+routine_types.update({'RLL' : RLLRoutine,
+                      'FBD' : FBDRoutine,
+                      'SFC' : SFCRoutine,
+                      'ST' : STRoutine})
@@ -10,21 +10,93 @@ __get__() method. In this way the application can process L5X projects
 without worrying about low-level XML handling.
 """
 
-from .dom import (ElementAccess, ElementDict, AttributeDescriptor, ElementDescription, ChildElements)
+from .dom import (ElementAccess, AttributeDescriptor, ElementDescription, ChildElements,
+                  LazyElementDict)
 from .module import (Module, SafetyNetworkNumber)
-from .tag import Scope
+from .tag import (Scope, update_raw_data)
 from .program import Program
-from .errors import InvalidFile
+from .errors import (InvalidFile, PartialProjectError)
 from .datatypes import DataType
 from .addoninstructions import AddOns
-import xml.dom.minidom
-import xml.parsers.expat
-import codecs
+from .backend import get_backend
+from .writer import write_document
+from .compression import is_compressed
+from . import aio
+from . import splice
+import functools
+import io
+import os
+
+# Snapshots of the content new projects are copied from, keyed by template
+# name and backend name; see register_template(). The default template is
+# added when the first new project is created.
+_templates = {}
+
+DEFAULT_TEMPLATE = 'default'
+
+
+def register_template(name, source, backend=None):
+    """Registers the content of a project as a template for new projects.
+
+    Projects created with ``Project(template=name)`` start as a copy of the
+    template as it was when registered; later changes to *source* do not
+    affect them. Registering the name *default* replaces the content of
+    projects created without a template name. A template can be used with
+    any backend, not only the one it was registered through.
+
+    :param name: Name identifying the template.
+    :param source: :class:`Project`, or path or file object of an export.
+    :param backend: Name of the backend used to parse a *source* export.
+    """
+    if not isinstance(source, Project):
+        source = Project(source, backend=backend)
+    _discard_template(name)
+    _templates[(name, source.backend.name)] = source.backend.snapshot(
+        source.element)
+
+
+def _discard_template(name):
+    """Removes the snapshots of a template for every backend."""
+    for key in [k for k in _templates if k[0] == name]:
+        del _templates[key]
+
+
+def _get_template(name, backend):
+    """Returns the snapshot of a template for a backend, or None if the
+    template is not registered.
+
+    Backends differ in the text nodes they keep, so a snapshot taken
+    through one backend is written out and parsed again by another the
+    first time that backend uses it.
+    """
+    snapshot = _templates.get((name, backend.name))
+    if snapshot is not None:
+        return snapshot
+
+    for (other_name, other_backend), other in list(_templates.items()):
+        if other_name == name:
+            source = get_backend(other_backend)
+            root = source.restore(other)
+            buf = io.BytesIO()
+            write_document(source, source.document(root), buf)
+            buf.seek(0)
+            snapshot = backend.snapshot(backend.parse(buf))
+            _templates[(name, backend.name)] = snapshot
+            return snapshot
+    return None
+
 
 class Project(ElementAccess):
     """Top-level container for an entire Logix project.
         
-    :param filename: File to be parsed in the l5x structure 
+    :param filename: File to be parsed in the l5x structure; either a path or a binary file-like object. Content compressed with gzip, bzip2, xz or zstd is decompressed while parsing; see :mod:`.compression`.
+    :param backend: Name of the XML backend used to hold the document, e.g. *minidom* or *etree*; see :mod:`.backend`. Defaults to *minidom*.
+    :param lazy: If True, the datatypes, addons, programs and modules dictionaries are located and indexed on first access instead of when the project is opened.
+    :param skip_sections: Names of Controller child elements, e.g. *Trends* or *Modules*, whose content is discarded while parsing. The corresponding dictionaries will be empty, and the project cannot be written.
+    :param cache: :class:`.cache.ProjectCache` used to restore the parsed document when the same unchanged file was opened before. Ignored if *filename* is a file object.
+    :param track_changes: If True, modifications are recorded so :meth:`write` can copy unmodified elements verbatim from the original file; see :mod:`.splice`. Requires *filename* to be the path of an uncompressed file, and cannot be combined with *skip_sections*.
+    :param template: Name of the template a new project is copied from if no *filename* is given; see :func:`register_template`. Defaults to an empty controller with a MainProgram.
+    :param progress: Optional callable invoked with the number of bytes read from *filename* so far as the file is parsed.
     :var schema_revision: :class:`.dom.AttributeDescriptor` The L5X schema revision that was used to write the file.
     :var target_name: :class:`.dom.AttributeDescriptor` The name of the controller from which the L5x was created, if *target_type* = *Controller*.
     :var target_type: :class:`.dom.AttributeDescriptor` The type of export this file is. *Controller*
@@ -33,77 +105,229 @@ class Project(ElementAccess):
     :var export_options: :class:`.dom.AttributeDescriptor` Options for what to include in the export. Options available are:- Decorated Data, ForceProtectedEncoding, AllProjDocTrans
     :var programs: :class:`.dom.ElementDict` Dictionary for all programs and their routines
     :var controller: :class:`Controller` Container for PLC specific information such as type, serial number, etc..
-    :var modules: :class:`.dom.ElementDict` Dictionary for Hardware modules and layout"""
+    :var modules: :class:`.dom.ElementDict` Dictionary for Hardware modules and layout
+    :var skipped_sections: frozenset of the Controller child element names whose content was skipped.
+    :var changes: :class:`.splice.ChangeTracker` recording modified elements if opened with *track_changes*; None otherwise."""
     schema_revision = AttributeDescriptor('SchemaRevision')
     target_type = AttributeDescriptor('TargetType')
     contains_context = AttributeDescriptor('ContainsContext')
     owner = AttributeDescriptor('Owner')
     export_options = AttributeDescriptor('ExportOptions')  
+    datatypes = LazyElementDict('datatypes', ['Controller', 'DataTypes'], key_attr='Name', types=DataType, ignore_case=True)
+    addons = LazyElementDict('addons', ['Controller', 'AddOnInstructionDefinitions'], key_attr='Name', types=AddOns, ignore_case=True)
+    programs = LazyElementDict('programs', ['Controller', 'Programs'], key_attr='Name', types=Program, ignore_case=True)
+    modules = LazyElementDict('modules', ['Controller', 'Modules'], key_attr='Name', types=Module, ignore_case=True)
    
-    def __init__(self, filename=None):
+    def __init__(self, filename=None, backend=None, lazy=False, skip_sections=(),
+                 cache=None, track_changes=False, template=None,
+                 progress=None):
+        _backend = get_backend(backend)
+        self.skipped_sections = frozenset(skip_sections)
+        if track_changes and self.skipped_sections:
+            raise ValueError('Change tracking cannot be used with skipped sections.')
+        self.source = None
+        self.changes = None
         if filename is not None:
-            try:
-                _doc = xml.dom.minidom.parse(filename)
-            except xml.parsers.expat.ExpatError as e:
-                _msg = xml.parsers.expat.ErrorString(e.code)
-                raise InvalidFile("XML parsing error: {0}".format(_msg))
+            # Caching applies only to exports identified by a path.
+            if hasattr(filename, 'read'):
+                cache = None
+
+            _root = None
+            if cache is not None:
+                _root = cache.load(filename, _backend, self.skipped_sections)
+            _cached = _root is not None
+            if not _cached:
+                _root = _backend.parse(filename, self.skipped_sections,
+                                       progress)
         
-            if _doc.documentElement.tagName != 'RSLogix5000Content':
+            if _backend.tag_name(_root) != 'RSLogix5000Content':
                 raise InvalidFile('Not an L5X file.')            
+
+            if (cache is not None) and not _cached:
+                cache.store(filename, _root, _backend, self.skipped_sections)
+
+            if track_changes:
+                if hasattr(filename, 'read'):
+                    raise ValueError('Change tracking requires a file name.')
+                self.source, self.changes = splice.track(filename, _root,
+                                                         _backend)
             
-            ElementAccess.__init__(self, _doc.documentElement)
+            ElementAccess.__init__(self, _root)
             
             _controller = self.get_child_element('Controller')        
             self.controller = Controller(_controller)
         else:
-            _doc = xml.dom.minidom.parseString('<RSLogix5000Content \
-                          SchemaRevision="1.0" \
-                          SoftwareRevision = "" \
-                          TargetName = "" \
-                          TargetType = "Controller" \
-                          ContainsContext = "false" \
-                          Owner = "Default" \
-                          ExportDate = "Mon Nov 02 04:15:51 2015" \
-                          ExportOptions = "DecoratedData ForceProtectedEncoding AllProjDocTrans"></RSLogix5000Content>')
-            ElementAccess.__init__(self, _doc.documentElement)
-
-            Controller.create(self)
-            
-        _datatypes = self.controller.get_child_element('DataTypes')
-        self.datatypes = ElementDict(_datatypes, key_attr='Name', types=DataType) 
-        
-        _addoninstructions = self.controller.get_child_element('AddOnInstructionDefinitions')
-        self.addons = ElementDict(_addoninstructions, key_attr='Name', types=AddOns) 
-        
-        _programs = self.controller.get_child_element('Programs')
-        self.programs = ElementDict(_programs, key_attr='Name', types=Program) 
-      
-        _modules = self.controller.get_child_element('Modules')
-        self.modules = ElementDict(_modules, key_attr='Name', types=Module)
-            
-        if filename is None:
-            Module.createController(self)
-            program = Program.create(self, 'MainProgram')
-            self.programs.append('MainProgram', program.element)
+            if template is None:
+                template = DEFAULT_TEMPLATE
+            _snapshot = _get_template(template, _backend)
+            if _snapshot is not None:
+                ElementAccess.__init__(self, _backend.restore(_snapshot))
+                _controller = self.get_child_element('Controller')
+                self.controller = Controller(_controller)
+            elif template == DEFAULT_TEMPLATE:
+                self._build_default_template(_backend)
+            else:
+                raise ValueError('Unknown project template: ' + repr(template))
+
+        # Index every section up front unless deferred, so content
+        # problems are reported when the project is opened.
+        if not lazy:
+            for section in (self.datatypes, self.addons, self.programs,
+                            self.modules):
+                section.members
+
+    @classmethod
+    def open(cls, filename, executor=None, progress=None, **kwargs):
+        """Opens a project without blocking an asyncio event loop.
+
+        Returns an awaitable resolving to the project, which is parsed on
+        an executor::
+
+            prj = await l5x.Project.open('big.L5X', backend='etree')
+
+        Cancelling the awaiting task stops parsing after the current block
+        of the file. Requires Python 3; see :mod:`.aio`.
+
+        :param filename: File to be parsed, as for :class:`Project`.
+        :param executor: Thread based concurrent.futures executor used for
+                         parsing; defaults to the event loop's default executor.
+        :param progress: Optional progress callback, as for :class:`Project`; invoked from the executor's thread.
+        :param kwargs: Other arguments of :class:`Project`, e.g. *backend* or *cache*."""
+        return aio.run_cancellable(
+            executor, functools.partial(cls, filename, **kwargs), progress)
+
+    def write_async(self, filename, executor=None, progress=None,
+                    compression=None):
+        """Writes the project without blocking an asyncio event loop.
+
+        Returns an awaitable completing when the project has been written
+        on an executor. Cancelling the awaiting task stops writing after the
+        current block of output; a target given by path is then left
+        unchanged. The project must not be modified until writing completes.
+        Requires Python 3; see :mod:`.aio`.
+
+        :param filename: Output file, as for :meth:`write`.
+        :param executor: Thread based concurrent.futures executor used for
+                         writing; defaults to the event loop's default executor.
+        :param progress: Optional progress callback, as for :meth:`write`; invoked from the executor's thread.
+        :param compression: Optional output compression format, as for :meth:`write`."""
+        return aio.run_cancellable(
+            executor,
+            functools.partial(self.write, filename, compression=compression),
+            progress)
+
+    def run_async(self, function, executor=None):
+        """Runs a query of the project without blocking an asyncio event loop.
+
+        Returns an awaitable resolving to the value returned by
+        ``function(project)``, which is called on an executor. Queries of
+        the same project must not run concurrently with modifications or
+        :meth:`write_async`. Requires Python 3; see :mod:`.aio`.
+
+        :param function: Callable accepting the project.
+        :param executor: Thread based concurrent.futures executor running the
+                         query; defaults to the event loop's default executor."""
+        return aio.run(executor, functools.partial(function, self))
+
+    def _build_default_template(self, backend):
+        """Creates the content of a new project from scratch.
+
+        The result is registered as the default template, so later new
+        projects are cloned from it instead.
+        """
+        root = backend.parse_string('<RSLogix5000Content \
+                  SchemaRevision="1.0" \
+                  SoftwareRevision = "" \
+                  TargetName = "" \
+                  TargetType = "Controller" \
+                  ContainsContext = "false" \
+                  Owner = "Default" \
+                  ExportDate = "Mon Nov 02 04:15:51 2015" \
+                  ExportOptions = "DecoratedData ForceProtectedEncoding AllProjDocTrans"></RSLogix5000Content>')
+        ElementAccess.__init__(self, root)
+        Controller.create(self)
+        Module.createController(self)
+        program = Program.create(self, 'MainProgram')
+        self.programs.append('MainProgram', program.element)
+        _templates[(DEFAULT_TEMPLATE, backend.name)] = backend.snapshot(root)
               
-    def write(self, filename):
+    def write(self, filename, progress=None, compression=None):
         """Writes the l5x structure to a file
         
-        :param filename: path to output file"""
-        file = codecs.open(filename, 'w', 'utf-8')
-        self.doc.writexml(file, addindent="", newl="\n", encoding='UTF-8')
-        file.close()
+        Raw data of tags whose values were set is first encoded from the
+        decorated data; see :meth:`.tag.Tag.invalidate_raw_data`.
+
+        Projects opened with *track_changes* are spliced: unmodified elements
+        are copied from the original file, which may also be the output file,
+        and only modified elements are serialized. If the original file has
+        changed since the project was opened, the entire project is serialized.
+
+        :param filename: path to output file, or a binary file-like object such as a pipe or io.BytesIO, which is left open
+        :param progress: optional callable invoked with the number of bytes written so far as each block of output is written, counted before compression
+        :param compression: optional compression format of the output, e.g. *gzip*, *bzip2*, *xz* or *zstd*; see :mod:`.compression`. Defaults to the format implied by the file name's extension, e.g. *.L5X.gz*, and no compression for file-like objects"""
+        if self.skipped_sections:
+            raise PartialProjectError(
+                'Cannot write a project opened with skipped sections.')
+
+        update_raw_data(self.backend, self.doc)
 
+        if (self.source is None) or not self.source.is_current():
+            write_document(self.backend, self.doc, filename, progress,
+                           compression=compression)
+            return
+
+        splice.write_spliced(self.source, self.changes, self.element,
+                             filename, progress, compression)
+
+        # Overwriting the original file invalidates the recorded byte
+        # ranges, so tracking restarts against the new content, unless
+        # it is now compressed.
+        if ((not hasattr(filename, 'write'))
+            and (os.path.abspath(filename) == self.source.filename)):
+            if is_compressed(filename):
+                self.source = None
+            else:
+                self.source, self.changes = splice.track(
+                    filename, self.element, self.backend)
+
+    def duplicate_names(self):
+        """Finds names which conflict within the same scope.
+
+        Logix names are case-insensitive, so names differing only by case
+        conflict; such exports are rejected by Logix when imported. Data
+        types, add-on instructions, programs, modules and controller tags
+        are checked, along with the tags and routines of each program.
+
+        :returns: A list of (scope, names) tuples, where scope describes the container, e.g. *programs* or *MainProgram tags*, and names lists the conflicting names in document order."""
+        scopes = [('data types', self.datatypes),
+                  ('add-on instructions', self.addons),
+                  ('programs', self.programs),
+                  ('modules', self.modules),
+                  ('controller tags', self.controller.tags)]
+        for name in self.programs.names:
+            program = self.programs[name]
+            scopes.append((name + ' tags', program.tags))
+            scopes.append((name + ' routines', program.routines))
+
+        return [(scope, names) for scope, members in scopes
+                for names in members.duplicates()]
 
     def append_child_element(self, name, parent):
         """Creates and appends a new child XML element.
                 
         :param name: Name of element to be appended
         :param parent: Where new element should be attached"""
-        temp_doc = self.get_doc(parent)
-        new = temp_doc.createElement(name)
-        parent.appendChild(new)
-        return new
+        return self._create_append_element(parent, name)
+
+
+def get_ctl_module_element(controller):
+    """Returns the XML element of the controller's own module.
+
+    While the module's name varies, the controller module is always
+    the first child within the Modules element.
+    """
+    modules = ElementAccess(controller.get_child_element('Modules'))
+    return modules.child_elements[0]
 
 
 class ControllerSafetyNetworkNumber(SafetyNetworkNumber):
@@ -123,13 +347,8 @@ class ControllerSafetyNetworkNumber(SafetyNetworkNumber):
         super(ControllerSafetyNetworkNumber, self).__set__(mod, value)
 
     def get_ctl_module(self, instance):
-        """Generates an object to access the controller module element.
-
-        While the module's name varies, the controller module is always
-        the first child within the Modules element.
-        """
-        modules = ElementAccess(instance.get_child_element('Modules'))
-        return ElementAccess(modules.child_elements[0])
+        """Generates an object to access the controller module element."""
+        return ElementAccess(get_ctl_module_element(instance))
 
 class ProcessorType(AttributeDescriptor):
     """Descriptor class for accessing a controller's processor's type.
@@ -149,9 +368,9 @@ class ProcessorType(AttributeDescriptor):
             raise AttributeError('Attribute is read-only')
         new_value = self.to_xml(value)
         if new_value is not None:
-            instance.element.setAttribute(self.name, new_value)        
-            modules = instance.get_child_element('Modules')            
-            modules.getElementsByTagName('Module')[0].setAttribute('CatalogNumber', new_value)
+            instance.backend.set_attribute(instance.element, self.name, new_value)
+            module = get_ctl_module_element(instance)
+            instance.backend.set_attribute(module, 'CatalogNumber', new_value)
         else:
             raise AttributeError('Cannot remove ProcessorType attribute')  
    
@@ -171,9 +390,10 @@ class TargetName(AttributeDescriptor):
             raise AttributeError('Attribute is read-only')
         new_value = self.to_xml(value)
         if new_value is not None:
-            instance.element.setAttribute(self.name, new_value) 
+            backend = instance.backend
+            backend.set_attribute(instance.element, self.name, new_value)
             #Write the major revision to the controller specified in the hardware list   
-            instance.element.parentNode.setAttribute('TargetName', new_value)
+            backend.set_attribute(backend.parent(instance.element), 'TargetName', new_value)
         else:
             raise AttributeError('Cannot remove TargetName attribute')      
 
@@ -196,13 +416,15 @@ class MajorRev(AttributeDescriptor):
             raise AttributeError('Attribute is read-only')
         new_value = self.to_xml(value)
         if new_value is not None:
-            instance.element.setAttribute(self.name, new_value) 
+            backend = instance.backend
+            backend.set_attribute(instance.element, self.name, new_value)
             #Write the major revision to the controller specified in the hardware list       
-            modules = instance.get_child_element('Modules')            
-            modules.getElementsByTagName('Module')[0].setAttribute('Major', new_value)
+            module = get_ctl_module_element(instance)
+            backend.set_attribute(module, 'Major', new_value)
             #Write the major revision to the RSLogix5000 element.
-            _rslogix = instance.element.parentNode.getAttribute("SoftwareRevision")
-            instance.element.parentNode.setAttribute("SoftwareRevision", value + "." + _rslogix[3:])
+            _root = backend.parent(instance.element)
+            _rslogix = backend.get_attribute(_root, "SoftwareRevision")
+            backend.set_attribute(_root, "SoftwareRevision", value + "." + _rslogix[3:])
         else:
             raise AttributeError('Cannot remove MajorRev attribute')      
 
@@ -224,13 +446,15 @@ class MinorRev(AttributeDescriptor):
             raise AttributeError('Attribute is read-only')
         new_value = self.to_xml(value)
         if new_value is not None:
-            instance.element.setAttribute(self.name, new_value)
+            backend = instance.backend
+            backend.set_attribute(instance.element, self.name, new_value)
             #Write the minor revision to the controller specified in the hardware list           
-            modules = instance.get_child_element('Modules')            
-            modules.getElementsByTagName('Module')[0].setAttribute('Minor', new_value)
+            module = get_ctl_module_element(instance)
+            backend.set_attribute(module, 'Minor', new_value)
             #Write the minor revision to the RSLogix5000 element.
-            _rslogix = instance.element.parentNode.getAttribute("SoftwareRevision")
-            instance.element.parentNode.setAttribute("SoftwareRevision", _rslogix[:2] + "." + value)
+            _root = backend.parent(instance.element)
+            _rslogix = backend.get_attribute(_root, "SoftwareRevision")
+            backend.set_attribute(_root, "SoftwareRevision", _rslogix[:2] + "." + value)
         else:
             raise AttributeError('Cannot remove MinorRev attribute')   
         
@@ -247,11 +471,9 @@ class Slot(AttributeDescriptor):
   
     def __get__(self, instance, value):   
         raw = None                
-        modules = instance.get_child_element('Modules')            
-        module = modules.getElementsByTagName('Module')[0]
-        ports = module.getElementsByTagName('Ports')[0]
-        if (ports.getElementsByTagName('Port')[0].hasAttribute(self.name)):
-                raw = ports.getElementsByTagName('Port')[0].getAttribute('Address') 
+        port = self.get_port_element(instance)
+        if (instance.backend.has_attribute(port, self.name)):
+                raw = instance.backend.get_attribute(port, 'Address')
         if raw is not None:      
             return self.from_xml(raw)
         return None 
@@ -262,13 +484,17 @@ class Slot(AttributeDescriptor):
         new_value = self.to_xml(value)
         if new_value is not None:
             #Write the slot number to the controller specified in the hardware list           
-            modules = instance.get_child_element('Modules')            
-            module = modules.getElementsByTagName('Module')[0]
-            ports = module.getElementsByTagName('Ports')[0]
-            ports.getElementsByTagName('Port')[0].setAttribute('Address', new_value)
+            port = self.get_port_element(instance)
+            instance.backend.set_attribute(port, 'Address', new_value)
         else:
             raise AttributeError('Cannot remove MinorRev attribute')  
 
+    def get_port_element(self, instance):
+        """Finds the first port of the controller module."""
+        module = ElementAccess(get_ctl_module_element(instance))
+        ports = ElementAccess(module.get_child_element('Ports'))
+        return ports.get_child_element('Port')
+
 class Controller(Scope):
     """Container class to store controller specific settings
     
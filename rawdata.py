@@ -0,0 +1,532 @@
+"""
+Decoding of raw tag data.
+
+Along with, or instead of, the decorated data, an export may hold a
+tag's value as raw data: a Data element without a Format attribute
+containing the bytes of the tag in controller memory as space-separated
+hexadecimal. This module computes the byte layout of a data type from
+its definition within the project, compiles the layout into a single
+struct format, and rebuilds the unpacked fields into values of the same
+form as the data accessors' value attribute: integers and floats for
+atomic types, lists for arrays, and dictionaries for structures. Tags
+can therefore be read even if exported without decorated data.
+
+    value = prj.controller.tags['Motor'].raw_value
+
+The same layouts encode values back into raw data; modified tags have
+their raw data regenerated from the decorated values when the project
+is written, see :meth:`.tag.Tag.update_raw_data`. Layouts of data types
+and images of structure and array values are also available directly:
+
+    layout = prj.datatypes['Motor'].get_layout()
+    image = prj.controller.tags['Motor'].data.pack()
+
+Layouts follow the controller's memory allocation rules:
+
+* Data is little-endian.
+* Atomic members are aligned to their own size; a BOOL tag occupies a
+  single byte.
+* Array and structure members are aligned to four bytes, or eight if
+  they contain 64-bit values, and structures are padded to a multiple of
+  their alignment.
+* BOOL arrays are packed into 32-bit words.
+* Single BOOL members of user-defined types are bits of hidden SINT
+  members, identified by their Target and BitNumber attributes.
+
+Add-on instruction and module-defined data types are not supported.
+"""
+
+import collections
+import re
+import struct
+import weakref
+
+from .errors import InvalidFile
+
+
+class AtomicLayout(object):
+    """Layout of an atomic data type.
+
+    :var format: struct format code of the value.
+    :var size: Size in bytes.
+    :var alignment: Byte boundary the value is aligned to within a structure.
+    """
+    def __init__(self, code):
+        self.format = code
+        self.size = struct.calcsize('<' + code)
+        self.alignment = self.size
+
+    def build(self, values, i):
+        """Returns the value of the unpacked fields starting at index *i*,
+        along with the index of the following field."""
+        return values[i], i + 1
+
+    def flatten(self, value, fields):
+        """Appends the fields to be packed for a value; None yields zeros."""
+        fields.append(value or 0)
+
+    def wrap(self, value):
+        """Converts an unsigned bit pattern into the value's range."""
+        bits = self.size * 8
+        value &= (1 << bits) - 1
+        if self.format.islower() and (value >> (bits - 1)):
+            value -= 1 << bits
+        return value
+
+
+class BoolLayout(AtomicLayout):
+    """Layout of a BOOL outside of a structure, which occupies a byte."""
+    def __init__(self):
+        AtomicLayout.__init__(self, 'B')
+
+    def build(self, values, i):
+        return int(values[i] != 0), i + 1
+
+    def flatten(self, value, fields):
+        fields.append(1 if value else 0)
+
+
+class ArrayLayout(object):
+    """Layout of an array.
+
+    :var element: Layout of a single element.
+    :var dims: Dimensions, most-significant first.
+    :var stride: Distance between consecutive elements in bytes.
+    """
+    def __init__(self, element, dims):
+        self.element = element
+        self.dims = dims
+        self.count = _product(dims)
+        self.stride = element.size
+        self.size = self.stride * self.count
+        self.alignment = max(4, element.alignment)
+
+        # Arrays of numeric values are unpacked in a single slice.
+        self.bulk = isinstance(element, AtomicLayout) and (
+            not isinstance(element, BoolLayout))
+        if self.bulk:
+            self.format = str(self.count) + element.format
+        else:
+            self.format = element.format * self.count
+
+    def build(self, values, i):
+        if self.bulk:
+            flat = list(values[i:i + self.count])
+            i += self.count
+        else:
+            flat = []
+            for n in range(self.count):
+                value, i = self.element.build(values, i)
+                flat.append(value)
+        return _nest(flat, self.dims), i
+
+    def flatten(self, value, fields):
+        if value is None:
+            flat = [None] * self.count
+        else:
+            flat = _unnest(value, self.dims)
+        if self.bulk:
+            fields.extend([v or 0 for v in flat])
+        else:
+            for v in flat:
+                self.element.flatten(v, fields)
+
+
+class BoolArrayLayout(object):
+    """Layout of a BOOL array, packed into 32-bit words.
+
+    :var dims: Dimensions, most-significant first.
+    """
+    def __init__(self, dims):
+        self.dims = dims
+        self.count = _product(dims)
+        self.words = (self.count + 31) // 32
+        self.size = self.words * 4
+        self.alignment = 4
+        self.format = str(self.words) + 'I'
+
+    def build(self, values, i):
+        flat = [(values[i + (n >> 5)] >> (n & 31)) & 1
+                for n in range(self.count)]
+        return _nest(flat, self.dims), i + self.words
+
+    def flatten(self, value, fields):
+        words = [0] * self.words
+        if value is not None:
+            for n, bit in enumerate(_unnest(value, self.dims)):
+                if bit:
+                    words[n >> 5] |= 1 << (n & 31)
+        fields.extend(words)
+
+
+class MemberLayout(collections.namedtuple('MemberLayout',
+        ['name', 'offset', 'layout', 'bit', 'hidden'])):
+    """Location of a structure member.
+
+    :var offset: Byte offset within the structure; for bit members, the offset of the host member.
+    :var layout: Layout of the member's value; None for bit members.
+    :var bit: Bit number within the host member for bit members; None otherwise.
+    """
+    __slots__ = ()
+
+
+class StructureLayout(object):
+    """Layout of a structured data type.
+
+    :param members: List of (name, layout, hidden) tuples in definition order.
+    :param bits: List of (name, host name, bit number, hidden) tuples for
+                 members stored as bits of another member.
+    :var members: List of :class:`MemberLayout`, in definition order.
+    """
+    def __init__(self, members, bits=()):
+        self.fields = [(name, layout) for name, layout, hidden in members]
+        self.bits = [(name, host, bit) for name, host, bit, hidden in bits]
+        self.hidden = ([name for name, layout, hidden in members if hidden]
+                       + [name for name, host, bit, hidden in bits if hidden])
+        self.hosts = {}
+        for name, host, bit in self.bits:
+            self.hosts.setdefault(host, []).append((name, bit))
+
+        self.alignment = 4
+        offset = 0
+        offsets = {}
+        fmt = []
+        for name, layout in self.fields:
+            self.alignment = max(self.alignment, layout.alignment)
+            pad = -offset % layout.alignment
+            if pad:
+                fmt.append(str(pad) + 'x')
+            fmt.append(layout.format)
+            offsets[name] = offset + pad
+            offset += pad + layout.size
+        pad = -offset % self.alignment
+        if pad:
+            fmt.append(str(pad) + 'x')
+        self.size = offset + pad
+        self.format = ''.join(fmt)
+
+        self.members = (
+            [MemberLayout(name, offsets[name], layout, None, hidden)
+             for name, layout, hidden in members]
+            + [MemberLayout(name, offsets[host], None, bit, hidden)
+               for name, host, bit, hidden in bits])
+
+    def build(self, values, i):
+        value = {}
+        for name, layout in self.fields:
+            value[name], i = layout.build(values, i)
+        for name, host, bit in self.bits:
+            value[name] = (value[host] >> bit) & 1
+        for name in self.hidden:
+            del value[name]
+        return value, i
+
+    def flatten(self, value, fields):
+        if value is None:
+            value = {}
+        for name, layout in self.fields:
+            v = value.get(name)
+            if name in self.hosts:
+                v = v or 0
+                for bit_name, bit in self.hosts[name]:
+                    if value.get(bit_name):
+                        v |= 1 << bit
+                    else:
+                        v &= ~(1 << bit)
+                v = layout.wrap(v)
+            layout.flatten(v, fields)
+
+
+def _product(dims):
+    count = 1
+    for d in dims:
+        count *= d
+    return count
+
+
+def _nest(flat, dims):
+    """Splits a flat list of values into nested lists, one per dimension."""
+    for d in reversed(dims[1:]):
+        flat = [flat[n:n + d] for n in range(0, len(flat), d)]
+    return flat
+
+
+def _unnest(value, dims):
+    """Flattens nested lists of values, one per dimension."""
+    for d in dims[1:]:
+        value = [v for inner in value for v in inner]
+    if len(value) != _product(dims):
+        raise ValueError('Expected {0} values, got {1}'.format(
+            _product(dims), len(value)))
+    return value
+
+
+def _parse_dims(dims):
+    """Converts a dimensions attribute into a list of integers, omitting
+    a zero dimension as used by scalar data type members."""
+    return [int(d) for d in re.split('[ ,]+', dims.strip())
+            if d and (int(d) != 0)]
+
+
+# Layouts of atomic types, keyed by data type name.
+_ATOMIC_CODES = {'SINT':'b', 'INT':'h', 'DINT':'i', 'LINT':'q',
+                 'USINT':'B', 'UINT':'H', 'UDINT':'I', 'ULINT':'Q',
+                 'REAL':'f', 'LREAL':'d'}
+
+
+def _control_word(bits, members):
+    """Builds the layout of a built-in type with a leading DINT holding
+    status bits; the word itself is not a visible member."""
+    dint = AtomicLayout('i')
+    return StructureLayout([('', dint, True)]
+                           + [(m, dint, False) for m in members],
+                           [(name, '', bit, False) for name, bit in bits])
+
+
+# Layouts of built-in structured types, which have no definition within
+# the project.
+_BUILTIN_LAYOUTS = {
+    'TIMER': lambda: _control_word([('EN', 31), ('TT', 30), ('DN', 29)],
+                                   ['PRE', 'ACC']),
+    'COUNTER': lambda: _control_word([('CU', 31), ('CD', 30), ('DN', 29),
+                                      ('OV', 28), ('UN', 27)],
+                                     ['PRE', 'ACC']),
+    'CONTROL': lambda: _control_word([('EN', 31), ('EU', 30), ('DN', 29),
+                                      ('EM', 28), ('ER', 27), ('UL', 26),
+                                      ('IN', 25), ('FD', 24)],
+                                     ['LEN', 'POS']),
+    'STRING': lambda: StructureLayout(
+        [('LEN', AtomicLayout('i'), False),
+         ('DATA', ArrayLayout(AtomicLayout('b'), [82]), False)]),
+    }
+
+
+class Layouts(object):
+    """Computes and caches the layouts of the data types of a project.
+
+    Definitions are indexed when created; data types added later are found
+    by indexing them again when a name is not known. Changes to the
+    members of a data type already laid out are not detected.
+
+    :param backend: XML backend of the project.
+    :param datatypes: The project's DataTypes XML element; None if the project defines no data types.
+    """
+    def __init__(self, backend, datatypes):
+        self.backend = backend
+        self.datatypes = datatypes
+        self.definitions = {}
+        self.layouts = {}
+        self.codecs = {}
+        self.index_definitions()
+
+    def index_definitions(self):
+        """Indexes the DataType elements by upper-case name."""
+        if self.datatypes is None:
+            return
+        backend = self.backend
+        for e in backend.children_named(self.datatypes, 'DataType'):
+            name = backend.get_attribute(e, 'Name')
+            self.definitions[name.upper()] = e
+
+    def get_layout(self, data_type):
+        """Returns the layout of a single value of a data type."""
+        key = data_type.upper()
+        try:
+            return self.layouts[key]
+        except KeyError:
+            pass
+
+        if key == 'BOOL':
+            layout = BoolLayout()
+        elif key in _ATOMIC_CODES:
+            layout = AtomicLayout(_ATOMIC_CODES[key])
+        elif key in _BUILTIN_LAYOUTS:
+            layout = _BUILTIN_LAYOUTS[key]()
+        else:
+            if key not in self.definitions:
+                self.index_definitions()
+            if key not in self.definitions:
+                raise ValueError('Raw data of data type {0} cannot be '
+                                 'decoded'.format(data_type))
+            layout = self.build_structure(self.definitions[key])
+        self.layouts[key] = layout
+        return layout
+
+    def get_member_layout(self, data_type, dims):
+        """Returns the layout of a structure member or tag, which may be
+        an array."""
+        if not dims:
+            return self.get_layout(data_type)
+        if data_type.upper() == 'BOOL':
+            return BoolArrayLayout(dims)
+        return ArrayLayout(self.get_layout(data_type), dims)
+
+    def get_codec(self, data_type, dims):
+        """Returns a :class:`Codec` for a tag of the given data type and
+        dimensions, compiled once for all tags of the same shape."""
+        key = (data_type.upper(), tuple(dims))
+        try:
+            return self.codecs[key]
+        except KeyError:
+            codec = Codec(self.get_member_layout(data_type, dims))
+            self.codecs[key] = codec
+            return codec
+
+    def build_structure(self, definition):
+        """Computes the layout of a user-defined data type."""
+        backend = self.backend
+        get_attribute = backend.get_attribute
+        members = []
+        bits = []
+        element = backend.child_element(definition, 'Members')
+        if element is None:
+            raise InvalidFile('Data type {0} has no members'.format(
+                get_attribute(definition, 'Name')))
+        for member in backend.children_named(element, 'Member'):
+            name = get_attribute(member, 'Name')
+            data_type = get_attribute(member, 'DataType')
+            hidden = get_attribute(member, 'Hidden') == 'true'
+            if data_type == 'BIT':
+                bits.append((name, get_attribute(member, 'Target'),
+                             int(get_attribute(member, 'BitNumber')),
+                             hidden))
+            else:
+                dims = _parse_dims(get_attribute(member, 'Dimension') or '0')
+                layout = self.get_member_layout(data_type, dims)
+                members.append((name, layout, hidden))
+        return StructureLayout(members, bits)
+
+
+class Codec(object):
+    """Converts raw data of a given layout with a precompiled struct format.
+
+    :var layout: Layout of the data.
+    :var size: Size of the data in bytes.
+    """
+    def __init__(self, layout):
+        self.layout = layout
+        self.struct = struct.Struct('<' + layout.format)
+        self.size = self.struct.size
+
+    def decode(self, data, offset=0):
+        """Converts raw data into a value.
+
+        :param data: bytes, bytearray or memoryview holding the data.
+        :param offset: Position of the data within *data*.
+        """
+        if len(data) - offset < self.size:
+            raise ValueError('Expected {0} bytes of data, got {1}'.format(
+                self.size, len(data) - offset))
+        return self.layout.build(self.struct.unpack_from(data, offset), 0)[0]
+
+    def encode(self, value):
+        """Converts a value into raw data bytes.
+
+        Members missing from structure values are encoded as zero.
+        """
+        fields = []
+        self.layout.flatten(value, fields)
+        try:
+            return bytearray(self.struct.pack(*fields))
+        except struct.error as e:
+            raise ValueError(str(e))
+
+
+def get_raw_element(backend, tag):
+    """Returns the raw Data element of a tag element; None if absent."""
+    for e in backend.children_named(tag, 'Data'):
+        if not backend.has_attribute(e, 'Format'):
+            return e
+    return None
+
+
+def get_raw_data(backend, tag):
+    """Returns the raw data of a tag element as a bytearray; None if the
+    tag has no raw data."""
+    element = get_raw_element(backend, tag)
+    if element is None:
+        return None
+    text = backend.get_text(element) or ''
+    return bytearray.fromhex(''.join(text.split()))
+
+
+def format_raw_data(data):
+    """Converts raw data bytes into the text of a raw Data element."""
+    return ' '.join(['{0:02X}'.format(b) for b in bytearray(data)])
+
+
+# Layouts shared by all tags of a project, keyed by DataTypes element.
+_layouts = weakref.WeakKeyDictionary()
+
+
+def get_layouts(backend, element):
+    """Returns the :class:`Layouts` of the project enclosing an element."""
+    datatypes = get_datatypes(backend, element)
+    if datatypes is None:
+        return Layouts(backend, None)
+    try:
+        return _layouts[datatypes]
+    except KeyError:
+        layouts = Layouts(backend, datatypes)
+        _layouts[datatypes] = layouts
+        return layouts
+
+
+def get_datatypes(backend, element):
+    """Locates the DataTypes element of the controller enclosing an
+    element; None if not found."""
+    while (element is not None) and (
+            backend.tag_name(element) != 'Controller'):
+        element = backend.parent(element)
+    if element is None:
+        return None
+    return backend.child_element(element, 'DataTypes')
+
+
+def decode(backend, tag, layouts=None):
+    """Decodes the raw data of a tag element.
+
+    :param backend: XML backend of the tag.
+    :param tag: Tag XML element.
+    :param layouts: :class:`Layouts` of the tag's project; shared by all tags of the enclosing controller if omitted.
+    :returns: The tag's value, or None if the tag has no raw data.
+    """
+    data = get_raw_data(backend, tag)
+    if data is None:
+        return None
+    codec = get_tag_codec(backend, tag, layouts)
+    if len(data) < codec.size:
+        raise InvalidFile(
+            'Raw data of {0} bytes is shorter than its data type, '
+            'which requires {1} bytes'.format(len(data), codec.size))
+    return codec.decode(data)
+
+
+def encode(backend, tag, value, layouts=None):
+    """Encodes a value as raw data of a tag element.
+
+    Bytes of the tag's current raw data beyond the size of its data type
+    are retained.
+
+    :param backend: XML backend of the tag.
+    :param tag: Tag XML element.
+    :param value: Value in the form of the data accessors' value attribute.
+    :param layouts: :class:`Layouts` of the tag's project; shared by all tags of the enclosing controller if omitted.
+    :returns: Raw data as a bytearray.
+    """
+    codec = get_tag_codec(backend, tag, layouts)
+    data = codec.encode(value)
+    current = get_raw_data(backend, tag)
+    if current is not None:
+        data += current[len(data):]
+    return data
+
+
+def get_tag_codec(backend, tag, layouts=None):
+    """Returns the :class:`Codec` for the data type and dimensions of a tag
+    element."""
+    if layouts is None:
+        layouts = get_layouts(backend, tag)
+    dims = _parse_dims(backend.get_attribute(tag, 'Dimensions') or '0')
+    data_type = backend.get_attribute(tag, 'DataType')
+    return layouts.get_codec(data_type, dims)
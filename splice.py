@@ -0,0 +1,313 @@
+"""
+Splice writing of modified projects.
+
+A typical job alters a handful of tags or descriptions in a large export,
+yet a full write re-serializes every element, changing the layout of the
+whole file in the process. When a project is opened with change tracking,
+the byte range each element occupies in the original file is recorded,
+and every modification made through the backend marks the affected
+element. Writing then copies the original bytes of all unmodified
+elements verbatim and serializes only the modified ones, so the time
+taken is dominated by copying, and the output differs from the original
+only where the project changed.
+"""
+
+from .backend import (ATTRIBUTES, track_changes,
+                      _escape_attribute, _escape_text)
+from .writer import (CHUNK_SIZE, atomic_output)
+from .compression import (codec_for_filename, is_compressed, open_target)
+import mmap
+import os
+import re
+import xml.parsers.expat
+
+
+# Matches a complete start tag, or empty element tag, within the source.
+_START_TAG = re.compile(br'<[^\s/>]+(?:\s+[^\s=]+\s*=\s*(?:"[^"]*"|\'[^\']*\'))*\s*/?>')
+
+
+class ChangeTracker(object):
+    """Record of the elements modified within a document.
+
+    :var attributes: Set of elements whose attributes were modified.
+    :var contents: Set of elements whose children or text were modified.
+    :var paths: Set of modified elements and all of their ancestors.
+    """
+    def __init__(self):
+        self.attributes = set()
+        self.contents = set()
+        self.paths = set()
+
+    def changed(self, element, kind, path):
+        if kind == ATTRIBUTES:
+            self.attributes.add(element)
+        else:
+            self.contents.add(element)
+        self.paths.update(path)
+
+
+class _SpanScanner(object):
+    """Expat handler set recording the byte range of every element.
+
+    Spans are recorded in document order as lists of
+    [start, end, first child start, last child end]; the child offsets
+    are None for elements without child elements.
+    """
+    def __init__(self, parser, data):
+        self.parser = parser
+        self.data = data
+        self.spans = []
+        self.stack = []
+
+        # Whether any content has been found within the current element.
+        self.content = False
+
+    def start_element(self, name, attributes):
+        span = [self.parser.CurrentByteIndex, None, None, None]
+        if self.stack and self.stack[-1][2] is None:
+            self.stack[-1][2] = span[0]
+        self.spans.append(span)
+        self.stack.append(span)
+        self.content = False
+
+    def end_element(self, name):
+        span = self.stack.pop()
+        index = self.parser.CurrentByteIndex
+
+        # Expat reports the end of an empty element tag, e.g. <Tag/>, at
+        # the offset following the tag; for other elements it reports the
+        # offset of the end tag.
+        if (not self.content) and (self.data[index - 2:index] == b'/>'):
+            span[1] = index
+        else:
+            span[1] = self.data.find(b'>', index) + 1
+
+        if self.stack:
+            self.stack[-1][3] = span[1]
+        self.content = True
+
+    def character_data(self, data):
+        self.content = True
+
+
+class SourceMap(object):
+    """Byte ranges of the elements of a document within its source file.
+
+    :param filename: Path of the file the document was parsed from.
+    :param root: Root element of the unmodified document.
+    :param backend: Backend owning the document.
+
+    Raises ValueError if the file is compressed, as the byte ranges of
+    compressed content cannot be copied.
+    """
+    def __init__(self, filename, root, backend):
+        if is_compressed(filename):
+            raise ValueError('Change tracking requires an uncompressed file.')
+        self.filename = os.path.abspath(filename)
+        self.backend = backend
+        st = os.stat(self.filename)
+        self.stat = (st.st_size, st.st_mtime)
+
+        with open(self.filename, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                spans = self._scan(data)
+                newline = b'\r\n' if data.find(b'\r\n') >= 0 else b'\n'
+            finally:
+                data.close()
+        self.newline = newline.decode('ascii')
+
+        # The scan visits elements in document order, as does a preorder
+        # traversal of the parsed tree.
+        self.spans = {}
+        elements = [root]
+        for span in spans:
+            element = elements.pop()
+            self.spans[element] = tuple(span)
+            children = backend.children(element)
+            children.reverse()
+            elements.extend(children)
+
+    def _scan(self, data):
+        parser = xml.parsers.expat.ParserCreate()
+        scanner = _SpanScanner(parser, data)
+        parser.StartElementHandler = scanner.start_element
+        parser.EndElementHandler = scanner.end_element
+        parser.CharacterDataHandler = scanner.character_data
+        for i in range(0, len(data), CHUNK_SIZE):
+            parser.Parse(data[i:i + CHUNK_SIZE], False)
+        parser.Parse(b'', True)
+        return scanner.spans
+
+    def is_current(self):
+        """Checks the source file is unchanged since it was scanned."""
+        try:
+            st = os.stat(self.filename)
+        except OSError:
+            return False
+        return (st.st_size, st.st_mtime) == self.stat
+
+
+def track(filename, root, backend):
+    """Starts recording modifications of a document parsed from a file.
+
+    :returns: A (SourceMap, ChangeTracker) tuple.
+    """
+    source = SourceMap(filename, root, backend)
+    tracker = ChangeTracker()
+    track_changes(backend.document(root), tracker)
+    return source, tracker
+
+
+class _SpliceWriter(object):
+    """Writes a document by combining source bytes and serialized elements."""
+    def __init__(self, source, tracker, data, f, progress):
+        self.source = source
+        self.spans = source.spans
+        self.backend = source.backend
+        self.tracker = tracker
+        self.data = data
+        self.f = f
+        self.progress = progress
+        self.written = 0
+        self.reported = 0
+
+    def write(self, block):
+        self.f.write(block)
+        self.written += len(block)
+        if (self.progress is not None
+            and self.written - self.reported >= CHUNK_SIZE):
+            self.reported = self.written
+            self.progress(self.written)
+
+    def copy(self, start, end):
+        """Writes a range of the source file."""
+        for i in range(start, end, CHUNK_SIZE):
+            self.write(self.data[i:min(end, i + CHUNK_SIZE)])
+
+    def write_document(self, root):
+        start, end = self.spans[root][:2]
+        self.copy(0, start)
+        self.write_element(root)
+        self.copy(end, len(self.data))
+        if self.progress is not None:
+            self.progress(self.written)
+
+    def write_element(self, element):
+        span = self.spans.get(element)
+        if span is None:
+            self.serialize(element)
+            return
+
+        start, end, first_start, last_end = span
+        if element not in self.tracker.paths:
+            self.copy(start, end)
+            return
+
+        children = self.backend.children(element)
+        if (first_start is None) or not children:
+            self.serialize(element)
+            return
+
+        tag_end = _START_TAG.match(self.data, start).end()
+        if element in self.tracker.attributes:
+            self.write_text(self.start_tag(element))
+        else:
+            self.copy(start, tag_end)
+
+        if element in self.tracker.contents:
+            # Children were added or removed, so the original spacing
+            # between them no longer applies; every child is laid out
+            # as the first original child was.
+            separator = self.data[tag_end:first_start]
+            for child in children:
+                self.write(separator)
+                self.write_element(child)
+        else:
+            position = tag_end
+            for child in children:
+                child_start, child_end = self.spans[child][:2]
+                self.copy(position, child_start)
+                self.write_element(child)
+                position = child_end
+        self.copy(last_end, end)
+
+    def write_text(self, text):
+        """Writes serialized markup using the source's line endings."""
+        if self.source.newline != '\n':
+            text = text.replace('\r\n', '\n').replace('\n', self.source.newline)
+        self.write(text.encode('utf-8'))
+
+    def serialize(self, element):
+        """Writes an element using the layout of RSLogix exports."""
+        parts = []
+        self._serialize(element, parts)
+        self.write_text(u''.join(parts))
+
+    def _serialize(self, element, parts):
+        backend = self.backend
+        parts.append(self.start_tag(element)[:-1])
+        tag = backend.tag_name(element)
+        children = backend.children(element)
+        cdata = backend.get_cdata(element)
+        text = backend.get_text(element)
+        if children:
+            parts.append('>\n')
+            for child in children:
+                self._serialize(child, parts)
+                parts.append('\n')
+            parts.append('</' + tag + '>')
+        elif cdata is not None:
+            parts.append('>\n<![CDATA[' + cdata.replace(']]>', ']]]]><![CDATA[>')
+                         + ']]>\n</' + tag + '>')
+        elif text is not None:
+            parts.append('>' + _escape_text(text) + '</' + tag + '>')
+        else:
+            parts.append('/>')
+
+    def start_tag(self, element):
+        backend = self.backend
+        parts = ['<', backend.tag_name(element)]
+        for name, value in backend.attributes(element):
+            parts.append(' ' + name + '="' + _escape_attribute(value) + '"')
+        parts.append('>')
+        return u''.join(parts)
+
+
+def write_spliced(source, tracker, root, target, progress=None,
+                  compression=None):
+    """Writes a tracked document, copying unmodified elements from its source.
+
+    :param source: :class:`SourceMap` of the document.
+    :param tracker: :class:`ChangeTracker` of the document.
+    :param root: Root element of the document.
+    :param target: Path of the output file or binary file-like object. The
+                   output may replace the source file itself.
+    :param progress: Optional callable invoked with the number of bytes
+                     written so far, before any compression.
+    :param compression: Optional output compression format; see
+                        :func:`.compression.open_target`.
+    """
+    if hasattr(target, 'write'):
+        with open_target(target, compression) as f:
+            _write_spliced(source, tracker, root, f, progress)
+        if hasattr(target, 'flush'):
+            target.flush()
+        return
+
+    # The source may be the target itself, so the output is only moved
+    # into place once complete, and after the source has been closed.
+    if compression is None:
+        compression = getattr(codec_for_filename(target), 'name', None)
+    with atomic_output(target) as raw:
+        with open_target(raw, compression) as f:
+            _write_spliced(source, tracker, root, f, progress)
+
+
+def _write_spliced(source, tracker, root, f, progress):
+    with open(source.filename, 'rb') as src:
+        data = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            _SpliceWriter(source, tracker, data, f, progress).write_document(root)
+        finally:
+            data.close()
@@ -0,0 +1,305 @@
+"""
+Streaming, read-only access to L5X exports.
+
+Project builds a complete DOM of an export before anything can be read,
+which for large controllers costs far more time and memory than most
+read-only jobs need. The reader in this module instead drives an expat
+parser over the file in fixed-size chunks and yields lightweight records
+in document order. No XML tree is ever built; memory use is bounded by
+the chunk size and the largest single record.
+"""
+
+from .errors import InvalidFile
+from .compression import open_source
+import collections
+import xml.parsers.expat
+
+
+# Number of bytes handed to the parser per iteration.
+CHUNK_SIZE = 1 << 16
+
+
+class DataTypeRecord(collections.namedtuple('DataTypeRecord',
+        ['name', 'family', 'data_class', 'description', 'members'])):
+    """A user-defined data type.
+
+    :var members: Tuple of :class:`MemberRecord`, in definition order.
+    """
+    __slots__ = ()
+
+
+class MemberRecord(collections.namedtuple('MemberRecord',
+        ['name', 'data_type', 'dimension', 'radix', 'hidden', 'target'])):
+    """A single member of a :class:`DataTypeRecord`."""
+    __slots__ = ()
+
+
+class ModuleRecord(collections.namedtuple('ModuleRecord',
+        ['name', 'catalog_number', 'parent_module', 'inhibited',
+         'description'])):
+    """An I/O module from the controller's module list."""
+    __slots__ = ()
+
+
+class TagRecord(collections.namedtuple('TagRecord',
+        ['program', 'name', 'tag_type', 'data_type', 'dimensions', 'radix',
+         'alias_for', 'value', 'description'])):
+    """A controller or program scoped tag.
+
+    :var program: Name of the enclosing program, or None for controller tags.
+    :var value: Raw value string of atomic, non-array base tags; None otherwise.
+    """
+    __slots__ = ()
+
+
+class RoutineRecord(collections.namedtuple('RoutineRecord',
+        ['program', 'name', 'type', 'description'])):
+    """A routine header; yielded before any of the routine's rungs."""
+    __slots__ = ()
+
+
+class RungRecord(collections.namedtuple('RungRecord',
+        ['program', 'routine', 'number', 'type', 'text', 'comment'])):
+    """A single ladder rung."""
+    __slots__ = ()
+
+
+# Element paths, matched against the tail of the current element path,
+# that start a record. Rungs are only recorded within a program routine.
+_RECORD_PATHS = {('Controller', 'DataTypes', 'DataType'): DataTypeRecord,
+                 ('Controller', 'Modules', 'Module'): ModuleRecord,
+                 ('Controller', 'Tags', 'Tag'): TagRecord,
+                 ('Program', 'Tags', 'Tag'): TagRecord,
+                 ('Program', 'Routines', 'Routine'): RoutineRecord,
+                 ('Routine', 'RLLContent', 'Rung'): RungRecord}
+
+# Child elements of a record whose CDATA content is captured, and the
+# record field each is stored in.
+_TEXT_FIELDS = {'Description':'description', 'Comment':'comment',
+                'Text':'text'}
+
+
+class _RecordBuilder(object):
+    """Expat handler set which accumulates completed records.
+
+    Records are appended to the records list as they complete; the
+    caller drains the list between chunks.
+    """
+    def __init__(self, wanted):
+        self.wanted = wanted
+        self.records = []
+        self.path = []
+        self.program = None
+        self.routine = None
+
+        # State of the record currently being assembled, if any.
+        self.record_type = None
+        self.record_depth = None
+        self.attributes = None
+        self.fields = None
+        self.members = None
+        self.data_format = None
+
+        # CDATA capture state.
+        self.text_field = None
+        self.text = None
+        self.cdata = None
+        self.in_cdata = False
+
+    def start_element(self, name, attributes):
+        if not self.path and name != 'RSLogix5000Content':
+            raise InvalidFile('Not an L5X file.')
+        self.path.append(name)
+        depth = len(self.path)
+
+        if self.record_type is None:
+            record_type = _RECORD_PATHS.get(tuple(self.path[-3:]))
+
+            # Add-on instruction routines hold rungs under the same path
+            # as program routines; only the latter are listed.
+            if (record_type is RungRecord) and (self.routine is None):
+                record_type = None
+
+            if record_type is not None:
+                self.begin(record_type, attributes)
+            elif name == 'Program' and self.path[-2] == 'Programs':
+                self.program = attributes.get('Name')
+            return
+
+        # Direct children of the record element.
+        if depth == self.record_depth + 1:
+            if name in _TEXT_FIELDS:
+                self.text_field = _TEXT_FIELDS[name]
+                self.text = []
+                self.cdata = []
+
+            # Routine headers are complete once the content element
+            # begins, so they are emitted ahead of their rungs.
+            elif self.record_type is RoutineRecord:
+                self.emit()
+
+        elif self.record_type is DataTypeRecord:
+            if name == 'Member' and self.path[-2] == 'Members':
+                self.members.append(MemberRecord(
+                    attributes.get('Name'),
+                    attributes.get('DataType'),
+                    attributes.get('Dimension'),
+                    attributes.get('Radix'),
+                    attributes.get('Hidden'),
+                    attributes.get('Target')))
+
+        elif self.record_type is TagRecord:
+            if ((name == 'DataValue')
+                and (depth == self.record_depth + 2)
+                and (self.data_format == 'Decorated')):
+                self.fields['value'] = attributes.get('Value')
+
+        # Track the format of the tag's Data element so only decorated
+        # data values are captured.
+        if (self.record_type is TagRecord) and (name == 'Data'):
+            self.data_format = attributes.get('Format')
+
+    def end_element(self, name):
+        depth = len(self.path)
+        self.path.pop()
+
+        if self.record_type is None:
+            if name == 'Program':
+                self.program = None
+            elif name == 'Routine':
+                self.routine = None
+            return
+
+        if (self.text_field is not None) and (depth == self.record_depth + 1):
+            self.end_text()
+
+        elif depth == self.record_depth:
+            self.emit()
+            if name == 'Routine':
+                self.routine = None
+
+    def character_data(self, data):
+        if self.text_field is not None:
+            if self.in_cdata:
+                self.cdata.append(data)
+            else:
+                self.text.append(data)
+
+    def start_cdata(self):
+        self.in_cdata = True
+
+    def end_cdata(self):
+        self.in_cdata = False
+
+    def begin(self, record_type, attributes):
+        """Starts assembling a new record."""
+        self.record_type = record_type
+        self.record_depth = len(self.path)
+        self.attributes = attributes
+        self.fields = {}
+        self.members = []
+        self.data_format = None
+        if record_type is RoutineRecord:
+            self.routine = attributes.get('Name')
+
+    def end_text(self):
+        """Stores the content of a completed description-like element.
+
+        Text within CDATA sections is used when present; the whitespace
+        surrounding the section is layout only. Elements without a CDATA
+        section fall back to their stripped character data.
+        """
+        if self.cdata:
+            value = ''.join(self.cdata)
+        else:
+            value = ''.join(self.text).strip()
+        self.fields[self.text_field] = value
+        self.text_field = None
+        self.text = None
+        self.cdata = None
+
+    def emit(self):
+        """Completes the current record and queues it for output."""
+        record_type = self.record_type
+        self.record_type = None
+        self.record_depth = None
+
+        if (self.wanted is not None) and (record_type not in self.wanted):
+            return
+
+        attrs = self.attributes
+        fields = self.fields
+        if record_type is TagRecord:
+            record = TagRecord(self.program,
+                               attrs.get('Name'),
+                               attrs.get('TagType'),
+                               attrs.get('DataType'),
+                               attrs.get('Dimensions'),
+                               attrs.get('Radix'),
+                               attrs.get('AliasFor'),
+                               fields.get('value'),
+                               fields.get('description'))
+        elif record_type is RungRecord:
+            record = RungRecord(self.program,
+                                self.routine,
+                                attrs.get('Number'),
+                                attrs.get('Type'),
+                                fields.get('text'),
+                                fields.get('comment'))
+        elif record_type is RoutineRecord:
+            record = RoutineRecord(self.program,
+                                   attrs.get('Name'),
+                                   attrs.get('Type'),
+                                   fields.get('description'))
+        elif record_type is DataTypeRecord:
+            record = DataTypeRecord(attrs.get('Name'),
+                                    attrs.get('Family'),
+                                    attrs.get('Class'),
+                                    fields.get('description'),
+                                    tuple(self.members))
+        else:
+            record = ModuleRecord(attrs.get('Name'),
+                                  attrs.get('CatalogNumber'),
+                                  attrs.get('ParentModule'),
+                                  attrs.get('Inhibited'),
+                                  fields.get('description'))
+        self.records.append(record)
+
+
+def iter_records(source, record_types=None):
+    """Yields records for the content of an L5X export in document order.
+
+    :param source: Path or binary file-like object containing the export,
+                   which may be compressed; see :mod:`.compression`.
+    :param record_types: Optional iterable of record classes, e.g.
+                         (:class:`TagRecord`, :class:`RungRecord`), limiting
+                         which records are produced. All record types are
+                         produced if omitted.
+    """
+    if record_types is not None:
+        record_types = frozenset(record_types)
+    builder = _RecordBuilder(record_types)
+
+    parser = xml.parsers.expat.ParserCreate()
+    parser.buffer_text = True
+    parser.StartElementHandler = builder.start_element
+    parser.EndElementHandler = builder.end_element
+    parser.CharacterDataHandler = builder.character_data
+    parser.StartCdataSectionHandler = builder.start_cdata
+    parser.EndCdataSectionHandler = builder.end_cdata
+
+    with open_source(source) as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            try:
+                parser.Parse(chunk, not chunk)
+            except xml.parsers.expat.ExpatError as e:
+                msg = xml.parsers.expat.ErrorString(e.code)
+                raise InvalidFile("XML parsing error: {0}".format(msg))
+
+            for record in builder.records:
+                yield record
+            del builder.records[:]
+
+            if not chunk:
+                break
@@ -3,16 +3,23 @@ Objects implementing tag access.
 """
 
 from .dom import (ElementAccess, ElementDict, AttributeDescriptor,
-                  ElementDescription, CDATAElement)
-import ctypes, re, struct
+                  ElementDescription, CDATAElement, LazyElementDict)
+from .backend import node_backend
+from .operands import (iter_operands, write_csv, resolve)
+from .errors import InvalidFile
+from . import rawdata
+import array, ctypes, operator, re, struct, weakref
 
 
-class Scope(ElementAccess):
-    """Container to hold a group of tags within a specific scope."""
-    def __init__(self, element):
-        ElementAccess.__init__(self, element)
-        self.tag_element = self.get_child_element('Tags')
-        self.tags = ElementDict(self.tag_element, key_attr='Name', types=Tag)
+# Elements of tags whose values were set since their raw data was last
+# encoded, keyed by document; see Tag.invalidate_raw_data().
+_modified_tags = weakref.WeakKeyDictionary()
+
+# Comment elements of each Comments element, indexed by upper-case operand;
+# see get_comment_index(). Elements are referenced weakly as they in turn
+# reference the Comments element used as the key.
+_comment_indices = weakref.WeakKeyDictionary()
+
 
 class TagDataDescriptor(object):
     """Descriptor class to dispatch attribute access to a data object.
@@ -30,6 +37,68 @@ class TagDataDescriptor(object):
         setattr(tag.data, self.attr, value)
 
 
+class TagValue(TagDataDescriptor):
+    """Descriptor class for accessing a tag's value.
+
+    Values of base tags without decorated data are decoded from the raw
+    data instead; see :mod:`.rawdata`.
+    """
+    def __init__(self):
+        TagDataDescriptor.__init__(self, 'value')
+
+    def __get__(self, tag, owner=None):
+        if (tag.data is None) and (tag.tag_type == 'Base'):
+            value = tag.raw_value
+            if value is not None:
+                return value
+        return TagDataDescriptor.__get__(self, tag, owner)
+
+
+class RawValue(object):
+    """Descriptor class for decoding a tag's raw data.
+
+    Raw data outdated by values set since it was last encoded is encoded
+    first; see :meth:`Tag.invalidate_raw_data`. Yields None if the tag has
+    no raw data; see :mod:`.rawdata`.
+    """
+    def __get__(self, tag, owner=None):
+        if not tag.tag_type == 'Base':
+            raise ValueError("Cannot get data on non-base tags")
+        modified = _modified_tags.get(tag.doc)
+        if (modified is not None) and (tag.element in modified):
+            modified.discard(tag.element)
+            tag.update_raw_data()
+        return rawdata.decode(tag.backend, tag.element)
+
+    def __set__(self, tag, value):
+        raise AttributeError('Read-only attribute.')
+
+
+class TagData(object):
+    """Descriptor class which creates a tag's data accessor on first access.
+
+    Locating the decorated data element and building its accessor is
+    deferred until the value or members are needed, so attributes of the
+    Tag element itself, e.g. the description, are read without it. The
+    accessor is then stored in the instance under the same attribute
+    name, which takes precedence over this descriptor for all subsequent
+    access. Tags other than base tags, or without decorated data, yield
+    None.
+    """
+    def __get__(self, tag, owner=None):
+        if tag is None:
+            return self
+
+        data = None
+        if tag.tag_type == 'Base':
+            data_element = tag.get_data_element()
+            if data_element is not None:
+                data_class = base_data_types.get(tag.data_type, Structure)
+                data = data_class(data_element, tag)
+        tag.__dict__['data'] = data
+        return data
+
+
 class ConsumeDescriptor(object):
     """Descriptor class for accessing consumed tag properties."""
     def __init__(self, attr):
@@ -38,7 +107,7 @@ class ConsumeDescriptor(object):
     def __get__(self, tag, owner=None):
         if self.is_consumed(tag):
             info = self.get_info(tag)
-            return str(info.getAttribute(self.attr))
+            return str(tag.backend.get_attribute(info, self.attr))
 
         else:
             raise TypeError('Not a consumed tag')
@@ -54,11 +123,11 @@ class ConsumeDescriptor(object):
             raise ValueError('Producer string cannot be empty')
 
         info = self.get_info(tag)
-        info.setAttribute(self.attr, value)
+        tag.backend.set_attribute(info, self.attr, value)
 
     def is_consumed(self, tag):
         """Checks to see if this is a consumed tag."""
-        return tag.element.getAttribute('TagType') == 'Consumed'
+        return tag.backend.get_attribute(tag.element, 'TagType') == 'Consumed'
 
     def get_info(self, tag):
         """Retrieves the ConsumeInfo XML element."""
@@ -71,25 +140,16 @@ class Tag(ElementAccess):
     tag_type = AttributeDescriptor('TagType', True)
     data_type = AttributeDescriptor('DataType', True)
     alias_for = AttributeDescriptor('AliasFor')
-    value = TagDataDescriptor('value')
+    value = TagValue()
+    raw_value = RawValue()
     shape = TagDataDescriptor('shape')
     names = TagDataDescriptor('names')
     producer = ConsumeDescriptor('Producer')
     remote_tag = ConsumeDescriptor('RemoteTag')
     external_access = AttributeDescriptor('ExternalAccess', True)
     constant = AttributeDescriptor('Constant', True)
+    data = TagData()
 
-    def __init__(self, element):
-        ElementAccess.__init__(self, element)
-        if self.tag_type == 'Base':
-            data_class = base_data_types.get(self.data_type, Structure)
-            data_element = self.get_data_element()
-            if data_element is not None:
-                self.data = data_class(self.get_data_element(), self)
-            else:
-                self.data = None
-        else:
-            self.data = None
     def get_data_element(self):
         """Returns the decorated data XML element.
 
@@ -99,10 +159,10 @@ class Tag(ElementAccess):
         """
         if not self.tag_type == 'Base':
             raise ValueError("Cannot get data element on non-base tags")
-        for e in self.child_elements:
-            if ((e.tagName == 'Data')
-                and (e.getAttribute('Format') == 'Decorated')):
-                return ElementAccess(e).child_elements[0]
+        backend = self.backend
+        for e in backend.children_named(self.element, 'Data'):
+            if backend.get_attribute(e, 'Format') == 'Decorated':
+                return backend.children(e)[0]
         return None #None if no data element
 
     def __getitem__(self, key):
@@ -125,19 +185,100 @@ class Tag(ElementAccess):
         return len(self.data)
 
     def clear_raw_data(self):
-        """Removes the unformatted data element.
-        
-        Called anytime a data value is set to avoid conflicts with
-        modified decorated data elements.
-        """
+        """Removes the unformatted data element."""
         if not self.tag_type == 'Base':
             raise ValueError("Cannot set data on non-base tags")
-        for e in self.child_elements:
-            if (e.tagName == 'Data') and (not e.hasAttribute('Format')):
-                data = self.element.removeChild(e)
-                data.unlink()
+        backend = self.backend
+        for e in backend.children_named(self.element, 'Data'):
+            if not backend.has_attribute(e, 'Format'):
+                backend.remove_child(self.element, e)
                 break
 
+    def invalidate_raw_data(self):
+        """Marks the unformatted data element as outdated.
+
+        Called anytime a data value is set. Rather than being modified
+        along with every value, the raw data is encoded once from the
+        decorated data when the project is written, or when the raw value
+        is read first; see :func:`update_raw_data`.
+        """
+        if not self.tag_type == 'Base':
+            raise ValueError("Cannot set data on non-base tags")
+        try:
+            modified = _modified_tags[self.doc]
+        except KeyError:
+            modified = _modified_tags[self.doc] = weakref.WeakSet()
+        modified.add(self.element)
+
+    def update_raw_data(self):
+        """Encodes the unformatted data element from the decorated data.
+
+        Raw data which cannot be encoded, e.g. of add-on instruction data
+        types, is removed instead to avoid conflicts with the modified
+        decorated data.
+        """
+        backend = self.backend
+        raw = rawdata.get_raw_element(backend, self.element)
+        if (raw is None) or (self.data is None):
+            return
+        try:
+            data = rawdata.encode(backend, self.element, self.data.value)
+        except (ValueError, TypeError, AttributeError, InvalidFile):
+            self.clear_raw_data()
+            return
+        text = rawdata.format_raw_data(data)
+        if backend.get_text(raw) != text:
+            backend.set_text(raw, text)
+
+    def get_comments(self):
+        """Returns the descriptions of all the tag's members.
+
+        :returns: dict mapping operands relative to the tag, e.g. *.SPEED* or *[3].NAME*, to description text.
+        """
+        backend = self.backend
+        comments = backend.child_element(self.element, 'Comments')
+        if comments is None:
+            return {}
+        return dict((backend.get_attribute(e, 'Operand'), backend.get_cdata(e))
+                    for e in backend.children_named(comments, 'Comment'))
+
+    def set_comments(self, comments):
+        """Sets the descriptions of any number of the tag's members.
+
+        Existing descriptions are located through an index of the tag's
+        comments, so thousands of descriptions can be imported at once.
+
+        :param comments: Mapping of operands relative to the tag, e.g. *.Speed* or *[3].Name*, to description text; None removes a description. Operands are matched regardless of case.
+        """
+        backend = self.backend
+        parent = backend.child_element(self.element, 'Comments')
+        if parent is None:
+            if all(text is None for text in comments.values()):
+                return
+            parent = backend.create_element(self.doc, 'Comments')
+            data = backend.child_element(self.element, 'Data')
+            if data is None:
+                backend.append_child(self.element, parent)
+            else:
+                backend.insert_before(self.element, parent, data)
+        index = get_comment_index(backend, parent)
+
+        for operand, text in comments.items():
+            key = operand.upper()
+            element = find_comment(backend, parent, key)
+            if text is None:
+                if element is not None:
+                    backend.remove_child(parent, element)
+                    del index[key]
+            elif element is None:
+                element = backend.create_element(self.doc, 'Comment',
+                                                 {'Operand':key})
+                backend.append_child(parent, element)
+                backend.set_cdata(element, text)
+                index[key] = weakref.ref(element)
+            else:
+                backend.set_cdata(element, text)
+
     @classmethod
     def create(cls, scope, project, tagtype, tagname, datatype=None, value=None, description="", radix=None, dimensions="", alias_for=""):
         """
@@ -154,8 +295,19 @@ class Tag(ElementAccess):
         :param alias_for: String of tag this tag is an alias for (Alias only)
         """
 
-        """Selects the Tags element to add the rung to"""
-        tag_element = scope.tag_element        
+        element = cls.build_element(scope, project, tagtype, tagname,
+                                    datatype, value, description, radix,
+                                    dimensions, alias_for)
+        scope.backend.append_child(scope.tag_element, element)
+        scope.tags.append(tagname, element)
+        return Tag(element)
+
+    @classmethod
+    def build_element(cls, scope, project, tagtype, tagname, datatype=None, value=None, description="", radix=None, dimensions="", alias_for="", datatypes=None):
+        """
+        Build an unattached Tag element; see :meth:`create` for the parameters.
+        :param datatypes: dict caching the members of structure data types by name, shared among tags built together (optional)
+        """
         if tagtype == "Base":
             if radix is None:
                 radix = "Decimal" #Default to decimal radix for base tags
@@ -173,7 +325,7 @@ class Tag(ElementAccess):
                 #If this is an array
                 attributes['Dimensions'] = dimensions
 
-            element = scope._create_append_element(tag_element, 'Tag', attributes)
+            element = scope.create_element('Tag', attributes)
             if value is not None: #Only make data element if value is set
                 data = scope._create_append_element(element, 'Data', {'Format' : 'Decorated'})
 
@@ -195,8 +347,8 @@ class Tag(ElementAccess):
 
                 elif not dimensions:
                     # Single structure
-                    Structure.create_element(scope, project, data, datatype, value)
-                    pass
+                    Structure.create_element(scope, project, data, datatype, value,
+                                             datatypes)
                 else:
                     # Array of Structures
                     array = scope._create_append_element(data, 'Array',
@@ -205,7 +357,8 @@ class Tag(ElementAccess):
                     for i in range(int(dimensions)):
                         index = scope._create_append_element(array, 'Element',
                                                      {'Index' : "[{}]".format(i)})
-                        Structure.create_element(scope, project, data, datatype, value[i])
+                        Structure.create_element(scope, project, index, datatype,
+                                                 value[i], datatypes)
         elif tagtype == "Alias":
             attributes = {'Name' : tagname,
                           'TagType' : tagtype,
@@ -213,14 +366,135 @@ class Tag(ElementAccess):
                           'ExternalAccess' : 'Read/Write'}
             if radix is not None:
                 attributes['Radix'] = radix
-            element = scope._create_append_element(tag_element, 'Tag', attributes)
+            element = scope.create_element('Tag', attributes)
         else:
             raise ValueError("Bad tag type {}".format(tagtype))
-        tag = Tag(element)
-        tag.description = description
-        scope.tags.append(tagname, tag.element)
-        return tag
+        if description is not None:
+            cdata = scope.create_element('Description')
+            scope.backend.set_cdata(cdata, description)
+            scope.backend.prepend_child(element, cdata)
+        return element
+
+
+def update_raw_data(backend, doc):
+    """Encodes the raw data of every tag within a document whose values
+    were set since it was last encoded."""
+    for element in list(_modified_tags.pop(doc, ())):
+        Tag(element).update_raw_data()
+
+
+def create_tags(tags, rows, project=None):
+    """Creates any number of tags at once.
+
+    The elements of all tags are built apart from the document and then
+    attached in a single operation, the tags dictionary is indexed once
+    for all of them, and the members of each structure data type are
+    looked up once. No tag is created if any row is invalid.
+
+    :param tags: :class:`.dom.ElementDict` of tags, e.g. the tags of a Scope or Program.
+    :param rows: Iterable of mappings holding the keyword arguments of :meth:`Tag.create`, e.g. {'tagname': 'Level', 'datatype': 'REAL', 'value': 0}; tagtype defaults to Base.
+    :param project: Project defining the structure data types; only required for structure tags given a value.
+    """
+    datatypes = {}
+    names = set()
+    keys = []
+    elements = []
+    for row in rows:
+        row = dict(row)
+        tagtype = row.pop('tagtype', 'Base')
+        name = row.pop('tagname')
+        if (name.lower() in names) or (name in tags):
+            raise ValueError('Tag {0} already exists'.format(name))
+        names.add(name.lower())
+        element = Tag.build_element(tags, project, tagtype, name,
+                                    datatypes=datatypes, **row)
+        keys.append(name)
+        elements.append(element)
+
+    tags.backend.append_children(tags.element, elements)
+    tags.extend(zip(keys, elements))
+
+
+def get_comment_index(backend, comments):
+    """Returns the index of the Comment elements within a Comments element.
+
+    The index maps upper-case operands to weak references of Comment
+    elements. It is built on first use and must be kept current by
+    callers adding or removing Comment elements; see
+    :func:`find_comment`.
+    """
+    try:
+        return _comment_indices[comments]
+    except KeyError:
+        pass
+    index = {}
+    for element in backend.children_named(comments, 'Comment'):
+        operand = backend.get_attribute(element, 'Operand').upper()
+        index.setdefault(operand, weakref.ref(element))
+    _comment_indices[comments] = index
+    return index
+
+
+def find_comment(backend, comments, operand):
+    """Locates the Comment element of an operand, regardless of case.
+
+    Returns None if the operand has no comment.
+    """
+    index = get_comment_index(backend, comments)
+    ref = index.get(operand.upper())
+    if ref is None:
+        return None
+    element = ref()
+    if (element is None) or (backend.parent(element) is not comments):
+        # The element was removed without updating the index.
+        del index[operand.upper()]
+        return None
+    return element
+
+
+class Scope(ElementAccess):
+    """Container to hold a group of tags within a specific scope.
+
+    :var tags: :class:`.dom.ElementDict` Dictionary of tags; located and indexed on first access.
+    """
+    tags = LazyElementDict('tags', ['Tags'], key_attr='Name', types=Tag,
+                           ignore_case=True)
+
+    def __init__(self, element):
+        ElementAccess.__init__(self, element)
+        self.tag_element = self.get_child_element('Tags')
+
+    def operands(self, bits=False):
+        """Lists every atomic value of the scope's tags.
+
+        :param bits: If True, the bits of integer values are also listed.
+        :returns: Iterator of :class:`.operands.OperandRecord`; see :func:`.operands.iter_operands`.
+        """
+        return iter_operands(self.tags, bits)
 
+    def write_operands(self, target, bits=False):
+        """Writes every atomic value of the scope's tags as CSV.
+
+        :param target: Path or file object; see :func:`.operands.write_csv`.
+        :param bits: If True, the bits of integer values are also listed.
+        """
+        write_csv(self.operands(bits), target)
+
+    def resolve(self, operand):
+        """Locates the data accessor of an operand among the scope's tags.
+
+        :param operand: Operand, e.g. *Conveyor[4].Drive.Status.12*.
+        :returns: Data accessor of the operand; see :func:`.operands.resolve`.
+        """
+        return resolve(self.tags, operand)
+
+    def create_tags(self, rows, project=None):
+        """Creates any number of tags within the scope at once.
+
+        :param rows: Iterable of mappings of :meth:`Tag.create` keyword arguments; see :func:`create_tags`.
+        :param project: Project defining the structure data types; only required for structure tags given a value.
+        """
+        create_tags(self.tags, rows, project)
     
 
 class Comment(object):
@@ -254,19 +528,24 @@ class Comment(object):
 
         # Find the matching Comment element and set the new text
         # or create a new Comment if none exists.
+        backend = comments.backend
+        index = get_comment_index(backend, comments.element)
         try:
             element = self.get_comment_element(instance, comments)
         except KeyError:
+            if value is None:
+                return
             cdata = CDATAElement(parent=comments, name='Comment',
                                  attributes={'Operand':instance.operand})
-            comments.element.appendChild(cdata.element)
+            index[instance.operand.upper()] = weakref.ref(cdata.element)
         else:
             cdata = CDATAElement(element)
 
         if value is not None:
             cdata.set(value)
         else:
-            comments.element.removeChild(cdata.element)
+            backend.remove_child(comments.element, cdata.element)
+            del index[instance.operand.upper()]
 
     def get_comments(self, instance):
         """Acquires an access object for the tag's Comments element."""
@@ -286,20 +565,26 @@ class Comment(object):
         """
         new = instance.create_element('Comments')
         data = instance.tag.get_child_element('Data')
-        instance.tag.element.insertBefore(new, data)
+        instance.backend.insert_before(instance.tag.element, new, data)
         return ElementAccess(new)
 
     def get_comment_element(self, instance, comments):
         """Acquires the Comment element of the instance's operand."""
-        for element in comments.child_elements:
-            if element.getAttribute('Operand') == instance.operand:
-                return element
-
-        raise KeyError()
+        element = find_comment(comments.backend, comments.element,
+                               instance.operand)
+        if element is None:
+            raise KeyError()
+        return element
 
 
 class Data(ElementAccess):
-    """Base class for objects providing access to tag values and comments."""
+    """Base class for objects providing access to tag values and comments.
+
+    A full traversal of a large tag creates an accessor for every member,
+    so this class and its subclasses define __slots__, omitting a
+    per-instance dictionary. Subclasses must list any attributes they add.
+    """
+    __slots__ = ('tag', 'parent', 'operand')
     description = Comment()
 
     # XML attribute names that contain the string used to build the operand.
@@ -314,11 +599,12 @@ class Data(ElementAccess):
         indicates it is an array, in which case an array access object
         is created instead for the given data type.
         """
-        if args[0].tagName.startswith('Array'):
+        tag_name = node_backend(args[0]).tag_name(args[0])
+        if tag_name.startswith('Array'):
 
             # Two array accessor types are possible depending on if the
             # the array is a structure member.
-            if args[0].tagName == ('ArrayMember'):
+            if tag_name == ('ArrayMember'):
                 array_type = ArrayMember
             else:
                 array_type = Array
@@ -357,10 +643,11 @@ class Data(ElementAccess):
         if self.parent is None:
             self.operand = ''
         else:
+            backend = self.backend
             for attr in self.operand_attributes.keys():
-                if self.element.hasAttribute(attr):
+                if backend.has_attribute(self.element, attr):
                     sep = self.operand_attributes[attr]
-                    name = self.element.getAttribute(attr).upper()
+                    name = backend.get_attribute(self.element, attr).upper()
                     break
 
             self.operand = sep.join((self.parent.operand, name))
@@ -369,15 +656,16 @@ class Data(ElementAccess):
 class IntegerValue(object):
     """Descriptor class for accessing an integer's value."""
     def __get__(self, instance, owner=None):
-        if instance.element.getAttribute('Radix') == 'ASCII':
-            value_string = instance.element.getAttribute('Value')
+        backend = instance.backend
+        if backend.get_attribute(instance.element, 'Radix') == 'ASCII':
+            value_string = backend.get_attribute(instance.element, 'Value')
             value_string = value_string.replace("&apos;","")
             def logix_string_repl(matchobj):
                 return chr(int(matchobj.group(1)))
             bytes = re.sub(r'\$(\d\d)', logix_string_repl, value_string)
             bytes = bytes.rjust(4, chr(0))
             return struct.unpack(">i", bytes)[0]
-        return int(instance.element.getAttribute('Value'))
+        return int(backend.get_attribute(instance.element, 'Value'))
 
     def __set__(self, instance, value):
         """Sets a new value."""
@@ -385,8 +673,8 @@ class IntegerValue(object):
             raise TypeError('Value must be an integer')
         if (value < instance.value_min) or (value > instance.value_max):
             raise ValueError('Value out of range')
-        instance.element.setAttribute('Value', str(value))
-        instance.tag.clear_raw_data()
+        instance.backend.set_attribute(instance.element, 'Value', str(value))
+        instance.tag.invalidate_raw_data()
 
 
 class Integer(Data):
@@ -395,6 +683,7 @@ class Integer(Data):
     In addition to the usual value and description access, integer indices
     are used for bit-level references.
     """
+    __slots__ = ()
     value = IntegerValue()
 
     def __getitem__(self, bit):
@@ -416,24 +705,30 @@ class Integer(Data):
 
 class SINT(Integer):
     """Base class for 8-bit signed integers."""
+    __slots__ = ()
     bits = 8
     ctype = ctypes.c_int8
+    typecode = 'b'
     value_min = -128
     value_max = 127
 
 
 class INT(Integer):
     """Base class for 16-bit signed integers."""
+    __slots__ = ()
     bits = 16
     ctype = ctypes.c_int16
+    typecode = 'h'
     value_min = -32768
     value_max = 32767
 
 
 class DINT(Integer):
     """Base class for 32-bit signed integers."""
+    __slots__ = ()
     bits = 32
     ctype = ctypes.c_int32
+    typecode = 'i'
     value_min = -2147483648
     value_max = 2147483647
 
@@ -473,6 +768,7 @@ class BitValue(object):
 
 class Bit(Data):
     """Provides access to individual bits within an integer."""
+    __slots__ = ('bit', 'mask')
     value = BitValue()
     description = Comment()
 
@@ -488,15 +784,17 @@ class Bit(Data):
 
 class BOOL(Data):
     """Tag access for BOOL data types."""
+    __slots__ = ()
     value = IntegerValue()
     value_min = 0
     value_max = 1
+    typecode = 'B'
 
 
 class RealValue(object):
     """Descriptor class for accessing REAL values."""
     def __get__(self, instance, owner=None):
-        return float(instance.element.getAttribute('Value'))
+        return float(instance.backend.get_attribute(instance.element, 'Value'))
 
     def __set__(self, instance, value):
         if not isinstance(value, float):
@@ -508,13 +806,20 @@ class RealValue(object):
         except (OverflowError, ValueError):
             raise ValueError('NaN and infinite values are not supported')
             
-        instance.element.setAttribute('Value', str(value))
-        instance.tag.clear_raw_data()
+        instance.backend.set_attribute(instance.element, 'Value', str(value))
+        instance.tag.invalidate_raw_data()
 
 
 class REAL(Data):
-    """Tag access for REAL data types."""
+    """Tag access for REAL data types.
+
+    Bulk array values are double precision, as REAL values are stored in
+    decimal, and converting them to single precision would alter their
+    text when written back.
+    """
+    __slots__ = ()
     value = RealValue()
+    typecode = 'd'
 
 
 class StructureValue(object):
@@ -531,7 +836,7 @@ class StructureValue(object):
             raise TypeError('Value must be a dictionary')
         for m in value.keys():
             struct[m].value = value[m]
-        struct.tag.clear_raw_data()
+        struct.tag.invalidate_raw_data()
 
 
 class StructureNames(object):
@@ -545,6 +850,7 @@ class StructureNames(object):
 
 class Structure(Data):
     """Accessor class for structured data types."""
+    __slots__ = ('members',)
     value = StructureValue()
     names = StructureNames()
 
@@ -555,7 +861,7 @@ class Structure(Data):
         # is just the enclosing array member; the XML element directly
         # holding the structure's data is the first child: a Structure
         # XML element.
-        if element.tagName == 'Element':
+        if self.backend.tag_name(element) == 'Element':
             self.element = self.get_child_element('Structure')
 
         self.members = ElementDict(self.element, key_attr='Name', types=base_data_types,
@@ -564,12 +870,32 @@ class Structure(Data):
 
     def __getitem__(self, member):
         """Indexing a structure yields an individual member."""
-        if not isinstance(member, str):
+        if not isinstance(member, (str, type(u''))):
             raise TypeError('Structure indices must be strings')
         return self.members[member]
 
+    def get_codec(self):
+        """Returns the :class:`.rawdata.Codec` of the structure's data type."""
+        data_type = self.backend.get_attribute(self.element, 'DataType')
+        layouts = rawdata.get_layouts(self.backend, self.element)
+        return layouts.get_codec(data_type, [])
+
+    def pack(self):
+        """Returns the structure's value as an image of controller memory.
+
+        See :mod:`.rawdata` for the layout rules.
+        """
+        return bytes(self.get_codec().encode(self.value))
+
+    def unpack(self, data):
+        """Sets the structure's value from an image of controller memory.
+
+        :param data: bytes, bytearray or memoryview of at least the data type's size.
+        """
+        self.value = self.get_codec().decode(data)
+
     @classmethod
-    def create_element(cls, scope, project, parent, datatype, value):
+    def create_element(cls, scope, project, parent, datatype, value, datatypes=None):
         """
         Create structure data element based on type and value
         :param scope: the scope to create the element within
@@ -577,78 +903,103 @@ class Structure(Data):
         :param parent: parent element to this element
         :param datatype: datatype of this structure
         :param value: dictionary of values to put in structure
+        :param datatypes: dict caching the members of data types by name, so each is looked up once (optional)
         """
-        if datatype not in project.datatypes:
-            print parent.tagName
-            print parent.getAttribute('Name')
-            raise ValueError("Datatype {} not found in datatypes".format(datatype))
-        else:
-            project_datatype = project.datatypes[datatype]
+        if datatypes is None:
+            datatypes = {}
+        datatype_members = cls.get_member_definitions(project, datatype,
+                                                      datatypes)
 
-        if not parent.tagName == 'StructureMember':
+        if not scope.backend.tag_name(parent) == 'StructureMember':
             structure = scope._create_append_element(parent, 'Structure', {'DataType' : datatype})
         else:
             structure = parent
 
-        datatype_members = project_datatype.members
-        for i in range(len(datatype_members)):
-            member = datatype_members[str(i)]
-            if member.hidden == 'true':
-                # Skip hidden members
-                continue
-
-            member_data_type = member.data_type
-            if member_data_type == 'BIT':
-                member_data_type = 'BOOL'
-
-            if int(member.dimension):
+        for name, member_data_type, dimension, radix in datatype_members:
+            if dimension:
                 #This member is an array
-                attributes = {'Name' : member.name,
+                attributes = {'Name' : name,
                               'DataType' : member_data_type,
-                              'Dimensions': member.dimension}
-                if member_data_type in base_data_types and member.radix:
-                    attributes['Radix'] = member.radix
+                              'Dimensions': str(dimension)}
+                if member_data_type in base_data_types and radix:
+                    attributes['Radix'] = radix
 
                 if member_data_type in base_data_types:
-                    default_value = [0] * int(member.dimension)
+                    default_value = [0] * dimension
                 else:
                     default_value = None
                 if value is not None:
-                    data = value.get(member.name, default_value)
+                    data = value.get(name, default_value)
                 else:
                     data = default_value
 
                 array_member = scope._create_append_element(structure, 'ArrayMember', attributes)
 
-                for j in range(int(member.dimension)):
+                for j in range(dimension):
                     if member_data_type in base_data_types:
                         #Base Data Type
-                        scope._create_append_element(array_member, 'Element', {'Index':'[{}]'.format(j), 'Value':data[j]})
+                        scope._create_append_element(array_member, 'Element', {'Index':'[{}]'.format(j), 'Value':str(data[j])})
                     else:
                         #Structure data type
                         array_element = scope._create_append_element(array_member, 'Element', {'Index':'[{}]'.format(j)})
-                        Structure.create_element(scope, project, array_element, member_data_type, data)
+                        Structure.create_element(scope, project, array_element, member_data_type,
+                                                 None if data is None else data[j], datatypes)
             else:
                 if value is None:
                     value = {}
                 # Not an array member
                 if member_data_type in base_data_types:
                     #Base Data Type
-                    attributes = {'Name' : member.name,
+                    attributes = {'Name' : name,
                                   'DataType' : member_data_type,
-                                  'Radix' : member.radix,
-                                  'Value' : value.get(member.name, 0)}
+                                  'Radix' : radix,
+                                  'Value' : str(value.get(name, 0))}
                     data_member = scope._create_append_element(structure, 'DataValueMember', attributes)
                 else:
                     #Structure data type
-                    attributes = {'Name' : member.name,
+                    attributes = {'Name' : name,
                                   'DataType' : member_data_type}
                     structure_member = scope._create_append_element(structure, 'StructureMember', attributes)
-                    Structure.create_element(scope, project, structure_member, member_data_type, value.get(member.name, None))
+                    Structure.create_element(scope, project, structure_member, member_data_type,
+                                             value.get(name, None), datatypes)
+
+    @classmethod
+    def get_member_definitions(cls, project, datatype, datatypes):
+        """
+        Looks up the visible members of a data type
+        :param datatypes: dict caching the result by data type name
+        :returns: list of (name, data type, dimension, radix) tuples; BIT members are listed as BOOL, and dimension is 0 for non-arrays
+        """
+        try:
+            return datatypes[datatype]
+        except KeyError:
+            pass
+
+        if project is None:
+            raise ValueError("Datatype {} requires a project".format(datatype))
+        if datatype not in project.datatypes:
+            raise ValueError("Datatype {} not found in datatypes".format(datatype))
+        members = project.datatypes[datatype].members
+
+        definitions = []
+        for i in range(len(members)):
+            member = members[str(i)]
+            if member.hidden == 'true':
+                # Skip hidden members
+                continue
+            member_data_type = member.data_type
+            if member_data_type == 'BIT':
+                member_data_type = 'BOOL'
+            definitions.append((member.name, member_data_type,
+                                int(member.dimension), member.radix))
+        datatypes[datatype] = definitions
+        return definitions
 
 class ArrayValue(object):
     """Descriptor class for accessing multiple values in an array."""
     def __get__(self, array, owner=None):
+        if array.holds_values():
+            return array.get_values().tolist()
         dim = len(array.dims) - len(array.address) - 1
         return [array[i].value for i in range(array.dims[dim])]
 
@@ -658,10 +1009,14 @@ class ArrayValue(object):
         if len(value) > array.shape[len(array.shape) - len(array.address) - 1]:
             raise IndexError('Source list is too large')
 
+        if array.holds_values():
+            array.set_values(slice(0, len(value)), value)
+            return
+
         for i in range(len(value)):
             array[i].value = value[i]
 
-        array.tag.clear_raw_data()
+        array.tag.invalidate_raw_data()
 
 
 class ArrayDescription(Comment):
@@ -692,6 +1047,7 @@ class ArrayShape(object):
 
 class Array(Data):
     """Access object for arrays of any data type."""
+    __slots__ = ('data_class', 'dims', 'address', 'members')
     value = ArrayValue()
     description = ArrayDescription()
     shape = ArrayShape()
@@ -700,19 +1056,46 @@ class Array(Data):
         Data.__init__(self, element, tag, parent)
         self.data_class = data_class
         self.dims = [int(d) for d in
-                     element.getAttribute('Dimensions').split(',')]
+                     self.backend.get_attribute(element, 'Dimensions').split(',')]
         self.dims.reverse()
         self.address = address
         self.members = ElementDict(element, key_attr='Index', types=data_class,
                                    member_args=[tag, self])
 
+    def get_codec(self):
+        """Returns the :class:`.rawdata.Codec` of the entire array."""
+        if self.address:
+            raise ValueError('Only entire arrays can be packed')
+        data_type = self.backend.get_attribute(self.element, 'DataType')
+        layouts = rawdata.get_layouts(self.backend, self.element)
+        return layouts.get_codec(data_type, list(reversed(self.dims)))
+
+    def pack(self):
+        """Returns the array's values as an image of controller memory.
+
+        See :mod:`.rawdata` for the layout rules.
+        """
+        return bytes(self.get_codec().encode(self.value))
+
+    def unpack(self, data):
+        """Sets the array's values from an image of controller memory.
+
+        :param data: bytes, bytearray or memoryview of at least the array's size.
+        """
+        self.value = self.get_codec().decode(data)
+
     def __getitem__(self, index):
         """Returns an access object for the given index.
 
         Multidimensional arrays will return new Array objects with the
         accumulated address until all dimensions are satisfied, which
         will then return the data access object for that item.
+
+        Slices return values rather than access objects; see
+        :meth:`get_values`.
         """
+        if isinstance(index, slice):
+            return self.get_values(index)
         if not isinstance(index, int):
             raise TypeError('Array indices must be integers')
 
@@ -742,6 +1125,100 @@ class Array(Data):
                                    new_address)
 
 
+    def __setitem__(self, index, values):
+        """Sets the values of a slice; see :meth:`set_values`."""
+        if not isinstance(index, slice):
+            raise TypeError('Only slices may be assigned; set the value of '
+                            'an individual element instead')
+        self.set_values(index, values)
+
+    def holds_values(self):
+        """Checks if the array's remaining dimension holds base data type
+        values, which can be accessed in bulk."""
+        return ((len(self.address) == len(self.dims) - 1)
+                and hasattr(self.data_class, 'typecode'))
+
+    def value_elements(self, index):
+        """Returns the XML elements of a slice of the remaining dimension."""
+        if not self.holds_values():
+            raise TypeError('Slices are only supported for the last '
+                            'dimension of base data type arrays')
+
+        # The address is accumulated least-significant first, and the
+        # sliced dimension is the least significant.
+        prefix = '[' + ''.join([str(i) + ',' for i in reversed(self.address)])
+        members = self.members.members
+        return [members[prefix + str(i) + ']']
+                for i in range(*index.indices(self.dims[0]))]
+
+    def get_values(self, index=slice(None)):
+        """Reads the values of a slice of elements at once.
+
+        Only base data type arrays, or the last dimension of
+        multidimensional ones, support bulk access.
+
+        :param index: Slice of the remaining dimension; defaults to all elements.
+        :returns: An array.array with the data type's typecode, which may also be used as a NumPy array without copying, e.g. via numpy.asarray().
+        """
+        get_attribute = self.backend.get_attribute
+        if self.data_class.typecode == 'd':
+            convert = float
+        else:
+            convert = int
+        return array.array(self.data_class.typecode,
+                           [convert(get_attribute(e, 'Value'))
+                            for e in self.value_elements(index)])
+
+    def set_values(self, index, values):
+        """Writes the values of a slice of elements at once.
+
+        All values are validated before any element is modified.
+
+        :param index: Slice of the remaining dimension.
+        :param values: Sequence of new values with the same length as the slice, e.g. a list, array.array or NumPy array.
+        """
+        elements = self.value_elements(index)
+        values = self.validate_values(values)
+        if len(values) != len(elements):
+            raise ValueError('Expected {0} values; got {1}'.format(
+                len(elements), len(values)))
+
+        set_attribute = self.backend.set_attribute
+        for element, value in zip(elements, values):
+            set_attribute(element, 'Value', str(value))
+        self.tag.invalidate_raw_data()
+
+    def validate_values(self, values):
+        """Converts a sequence of values to an array.array of the data type,
+        checking their types and range."""
+        data_class = self.data_class
+
+        # Both array.array and NumPy arrays convert to native Python values.
+        if hasattr(values, 'tolist'):
+            values = values.tolist()
+
+        if data_class.typecode == 'd':
+            for value_type in set(map(type, values)):
+                if not issubclass(value_type, float):
+                    raise TypeError('Value must be a float')
+            converted = array.array('d', values)
+
+            # Differences of non-finite values with themselves are NaN,
+            # and therefore true.
+            if any(map(operator.sub, converted, converted)):
+                raise ValueError('NaN and infinite values are not supported')
+            return converted
+
+        try:
+            converted = array.array(data_class.typecode, values)
+        except OverflowError:
+            raise ValueError('Value out of range')
+        if converted and ((min(converted) < data_class.value_min)
+                          or (max(converted) > data_class.value_max)):
+            raise ValueError('Value out of range')
+        return converted
+
+
 class ArrayMember(Array):
     """Access object for arrays which are structure members.
 
@@ -749,6 +1226,7 @@ class ArrayMember(Array):
     comments for subarrays is unnecessary as array members may only be
     one-dimensional.
     """
+    __slots__ = ()
     description = Comment()
 
     
@@ -0,0 +1,112 @@
+"""
+Tests for asynchronous project operations.
+
+When naming test cases the following format should be used.
+test_<Module>_<Class>_<Description>
+"""
+import unittest, os, shutil, threading, l5x
+
+try:
+    import asyncio
+    import concurrent.futures
+except ImportError:
+    asyncio = None
+
+SOURCE = './tests/__results__/aio_source.L5X'
+OUTPUT = './tests/__results__/aio_output.L5X'
+
+
+def read(filename):
+    with open(filename, 'rb') as f:
+        return f.read()
+
+
+@unittest.skipIf(asyncio is None, 'asyncio requires Python 3')
+class AsyncCase(unittest.TestCase):
+    backend = 'minidom'
+
+    def setUp(self):
+        shutil.copy('./tests/basetest.L5X', SOURCE)
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.executor = concurrent.futures.ThreadPoolExecutor(1)
+
+    def tearDown(self):
+        self.executor.shutdown(True)
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def run_blocked(self, start):
+        """Cancels an operation while its first progress report is blocked.
+
+        Returns the number of progress reports made.
+        """
+        reports = []
+        reported = threading.Event()
+        resume = threading.Event()
+
+        def progress(position):
+            reports.append(position)
+            reported.set()
+            resume.wait()
+
+        future = start(progress)
+        reported.wait()
+        future.cancel()
+        self.loop.run_until_complete(asyncio.sleep(0))
+        resume.set()
+        self.executor.shutdown(True)
+        return len(reports)
+
+    def test_aio_Project_open(self):
+        """Confirm projects are opened on an executor"""
+        reports = []
+        future = l5x.Project.open(SOURCE, executor=self.executor,
+                                  progress=reports.append,
+                                  backend=self.backend)
+        prj = self.loop.run_until_complete(future)
+        self.assertEqual(prj.controller.tags['dint1'].description,
+                         'Test DINT 1')
+        self.assertEqual(reports[-1], os.path.getsize(SOURCE))
+
+    def test_aio_Project_write_async(self):
+        """Confirm projects are written on an executor"""
+        prj = l5x.Project(SOURCE, backend=self.backend)
+        prj.controller.tags['dint1'].description = 'Async'
+        self.loop.run_until_complete(prj.write_async(OUTPUT, self.executor))
+        prj = l5x.Project(OUTPUT, backend=self.backend)
+        self.assertEqual(prj.controller.tags['dint1'].description, 'Async')
+
+    def test_aio_Project_run_async(self):
+        """Confirm queries are run on an executor"""
+        prj = l5x.Project(SOURCE, backend=self.backend)
+        future = prj.run_async(lambda p: p.controller.tags['dint1'].value,
+                               self.executor)
+        self.assertEqual(self.loop.run_until_complete(future), 0)
+
+    def test_aio_Project_open_cancel(self):
+        """Confirm parsing stops when an open is cancelled"""
+        reports = self.run_blocked(lambda progress: l5x.Project.open(
+            SOURCE, executor=self.executor, progress=progress,
+            backend=self.backend))
+        self.assertEqual(reports, 1)
+
+    def test_aio_Project_write_async_cancel(self):
+        """Confirm a cancelled write leaves the target unchanged"""
+        prj = l5x.Project(SOURCE, backend=self.backend)
+        prj.controller.tags['dint1'].description = 'Async'
+        original = read(SOURCE)
+        files = sorted(os.listdir(os.path.dirname(SOURCE)))
+        reports = self.run_blocked(lambda progress: prj.write_async(
+            SOURCE, self.executor, progress))
+        self.assertEqual(reports, 1)
+        self.assertEqual(read(SOURCE), original)
+        self.assertEqual(sorted(os.listdir(os.path.dirname(SOURCE))), files)
+
+
+class ETreeAsyncCase(AsyncCase):
+    backend = 'etree'
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Tests for bulk access to array tag values.
+
+When naming test cases the following format should be used.
+test_<Module>_<Class>_<Description>
+"""
+import unittest, array, l5x
+from l5x.tag import Tag
+
+
+class ArrayCase(unittest.TestCase):
+    backend = 'minidom'
+
+    def setUp(self):
+        self.prj = l5x.Project('./tests/basetest.L5X', backend=self.backend)
+        scope = self.prj.controller
+        Tag.create(scope, self.prj, 'Base', 'ints', 'INT',
+                   value=list(range(10)), dimensions='10')
+        Tag.create(scope, self.prj, 'Base', 'reals', 'REAL',
+                   value=[0.5] * 4, dimensions='4')
+        self.ints = scope.tags['ints']
+        self.reals = scope.tags['reals']
+
+    def create_matrix(self):
+        """Creates a 2x3 DINT tag; element [i,j] has the value 10 * i + j."""
+        b = self.prj.backend
+        doc = self.prj.doc
+        scope = self.prj.controller
+        tag = b.create_element(doc, 'Tag', {'Name': 'matrix',
+                                            'TagType': 'Base',
+                                            'DataType': 'DINT',
+                                            'Dimensions': '2 3'})
+        data = b.create_element(doc, 'Data', {'Format': 'Decorated'})
+        values = b.create_element(doc, 'Array', {'DataType': 'DINT',
+                                                  'Dimensions': '2,3'})
+        for i in range(2):
+            for j in range(3):
+                b.append_child(values, b.create_element(
+                    doc, 'Element', {'Index': '[{0},{1}]'.format(i, j),
+                                     'Value': str(10 * i + j)}))
+        b.append_child(data, values)
+        b.append_child(tag, data)
+        b.append_child(scope.tag_element, tag)
+        scope.tags.append('matrix', tag)
+        return scope.tags['matrix']
+
+    def test_tag_Array_get_slice(self):
+        """Confirm slices return typed arrays of values"""
+        values = self.ints.data[2:5]
+        self.assertEqual(values, array.array('h', [2, 3, 4]))
+        self.assertEqual(self.ints.data[::4].tolist(), [0, 4, 8])
+        self.assertEqual(self.reals.data.get_values().typecode, 'd')
+
+    def test_tag_Array_set_slice(self):
+        """Confirm slices are assigned from any sequence of values"""
+        self.ints.data[2:5] = [7, 8, 9]
+        self.ints.data[8:] = array.array('h', [-1, -2])
+        self.assertEqual(self.ints.value, [0, 1, 7, 8, 9, 5, 6, 7, -1, -2])
+        self.assertEqual(self.ints.data[2].value, 7)
+        self.reals.data[:] = [1.5, 2.5, 3.5, 0.1]
+        self.assertEqual(self.reals.value, [1.5, 2.5, 3.5, 0.1])
+
+    def test_tag_Array_set_slice_validation(self):
+        """Confirm invalid values are rejected before any are written"""
+        with self.assertRaises(ValueError):
+            self.ints.data[0:2] = [1, 40000]
+        with self.assertRaises(TypeError):
+            self.ints.data[0:2] = [1, 2.5]
+        with self.assertRaises(ValueError):
+            self.ints.data[0:2] = [1, 2, 3]
+        with self.assertRaises(ValueError):
+            self.reals.data[0:2] = [1.0, float('inf')]
+        with self.assertRaises(TypeError):
+            self.reals.data[0:2] = [1.0, 2]
+        self.assertEqual(self.ints.value, list(range(10)))
+        self.assertEqual(self.reals.value, [0.5] * 4)
+
+    def test_tag_Array_value_list(self):
+        """Confirm whole-array values are read and written in bulk"""
+        self.ints.value = [5, 6]
+        self.assertEqual(self.ints.value[:3], [5, 6, 2])
+        with self.assertRaises(ValueError):
+            self.ints.value = [0, -40000]
+        self.assertEqual(self.ints.value[:3], [5, 6, 2])
+
+    def test_tag_Array_multidimensional(self):
+        """Confirm slices apply to the last dimension of an element"""
+        matrix = self.create_matrix()
+        self.assertEqual(matrix.data[1][:].tolist(), [10, 11, 12])
+        matrix.data[1][1:] = [21, 22]
+        self.assertEqual(matrix.data[1][2].value, 22)
+        self.assertEqual(matrix.data[0][:].tolist(), [0, 1, 2])
+        with self.assertRaises(TypeError):
+            matrix.data[0:1]
+
+
+class ETreeArrayCase(ArrayCase):
+    backend = 'etree'
+
+
+if __name__ == "__main__":
+    unittest.main()
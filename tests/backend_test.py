@@ -0,0 +1,218 @@
+"""
+Tests to confirm the alternate XML backends behave identically to minidom
+
+When naming test cases the following format should be used.
+test_<Module>_<Class>_<Description>
+"""
+import unittest, l5x
+from xml.etree import ElementTree
+from l5x import backend, project
+from l5x.tests import basetest, fbdtest, program_test
+
+
+def write_read_etree(prj):
+    prj.write('./tests/__results__/etree_output.L5X')
+    return l5x.Project('./tests/__results__/etree_output.L5X', backend='etree')
+
+
+class ETreeBaseTest(basetest.BaseTest):
+    def setUp(self):
+        self.prj = l5x.Project('./tests/basetest.L5X', backend='etree')
+
+    def write_read_project(self):
+        return write_read_etree(self.prj)
+
+
+class ETreeProgramCase(program_test.ProgramCase):
+    def setUp(self):
+        self.prj = l5x.Project('./tests/basetest.L5X', backend='etree')
+
+    def write_read_project(self):
+        return write_read_etree(self.prj)
+
+
+class ETreeFBDCase(fbdtest.FBDCase):
+    def setUp(self):
+        self.prj = l5x.Project('./tests/basetest.L5X', backend='etree')
+
+
+class ETreeCase(unittest.TestCase):
+
+    def setUp(self):
+        self.prj = l5x.Project('./tests/basetest.L5X', backend='etree')
+
+    def test_backend_ETreeBackend_element_type(self):
+        """Confirm accessors hold ElementTree elements"""
+        self.assertTrue(isinstance(self.prj.element, backend.ETreeElement))
+        self.assertTrue(self.prj.backend is backend.get_backend('etree'))
+
+    def get_rung_comment(self, prj):
+        rung = prj.programs['MainProgram'].routines['TestLadderRoutine'].rungs['2']
+        return rung.backend.get_cdata(rung.get_child_element('Comment'))
+
+    def test_backend_ETreeBackend_cdata_round_trip(self):
+        """Confirm CDATA content is read and written back exactly"""
+        comment = self.get_rung_comment(self.prj)
+        self.assertTrue(comment.startswith('Comment with Unicode\n'))
+        self.assertTrue(comment.endswith('\\x2022\n'))
+
+        newprj = write_read_etree(self.prj)
+        self.assertEqual(self.get_rung_comment(newprj), comment)
+
+        minidom_prj = l5x.Project('./tests/__results__/etree_output.L5X')
+        self.assertEqual(self.get_rung_comment(minidom_prj), comment)
+
+    def test_backend_ETreeBackend_escaped_cdata(self):
+        """Confirm CDATA terminators within content survive a round trip"""
+        self.prj.controller.description = 'a]]>b'
+        newprj = write_read_etree(self.prj)
+        self.assertEqual(newprj.controller.description, 'a]]>b')
+
+    def test_backend_ETreeBackend_create_description(self):
+        """Confirm a new description is created in the first position"""
+        routine = self.prj.programs['MainProgram'].routines['MainRoutine']
+        routine.description = 'New Description'
+        self.assertEqual(routine.backend.tag_name(routine.child_elements[0]),
+                         'Description')
+        newprj = write_read_etree(self.prj)
+        routine = newprj.programs['MainProgram'].routines['MainRoutine']
+        self.assertEqual(routine.description, 'New Description')
+
+    def test_backend_ETreeBackend_raw_data(self):
+        """Confirm plain text content is preserved"""
+        tag = self.prj.controller.tags['dint1']
+        raw = [e for e in tag.child_elements
+               if e.tag == 'Data' and e.get('Format') is None][0]
+        self.assertEqual(raw.text, '00 00 00 00')
+
+    def test_backend_ETreeBackend_set_values(self):
+        """Confirm tag values can be modified"""
+        self.prj.controller.tags['dint1'].value = 42
+        self.prj.controller.major_revision = '19'
+        newprj = write_read_etree(self.prj)
+        self.assertEqual(newprj.controller.tags['dint1'].value, 42)
+        self.assertEqual(newprj.controller.major_revision, '19')
+        self.assertEqual(newprj.element.get('SoftwareRevision'), '19.01')
+
+    def test_backend_ETreeBackend_new_project(self):
+        """Confirm a new project can be created"""
+        prj = l5x.Project(backend='etree')
+        self.assertTrue('MainProgram' in prj.programs.names)
+        self.assertTrue('Local' in prj.modules.names)
+
+    def test_backend_ETreeBackend_default_project_output(self):
+        """Confirm the default project is written the same by both backends"""
+        output = []
+        for name in ('minidom', 'etree'):
+            # Build each project from scratch rather than from a template
+            # created by the other backend.
+            project._discard_template(project.DEFAULT_TEMPLATE)
+            path = './tests/__results__/default_{0}.L5X'.format(name)
+            l5x.Project(backend=name).write(path)
+            # Attribute order may differ between backends, so the
+            # elements are compared instead of the text.
+            output.append([(e.tag, sorted(e.items()), e.text)
+                           for e in ElementTree.parse(path).iter()])
+        self.assertEqual(output[0], output[1])
+
+    def test_backend_get_backend_unknown(self):
+        """Confirm unknown backend names are rejected"""
+        with self.assertRaises(ValueError):
+            l5x.Project('./tests/basetest.L5X', backend='unknown')
+
+
+class ChildIndexCase(unittest.TestCase):
+    backend = 'minidom'
+
+    def setUp(self):
+        self.prj = l5x.Project('./tests/basetest.L5X', backend=self.backend)
+        self.backend = self.prj.backend
+        self.tag = self.prj.controller.tags['dint1'].element
+
+    def names(self, name):
+        return [self.backend.get_attribute(e, 'Format')
+                for e in self.backend.children_named(self.tag, name)]
+
+    def test_backend_Backend_child_element(self):
+        """Confirm child lookups return the first child of each name"""
+        b = self.backend
+        data = b.child_element(self.tag, 'Data')
+        self.assertEqual(data, b.children(self.tag)[1])
+        self.assertEqual(self.names('Data'), ['', 'Decorated'])
+        self.assertEqual(b.child_element(self.tag, 'Missing'), None)
+        self.assertEqual(list(b.children_named(self.tag, 'Missing')), [])
+
+    def test_backend_Backend_child_index_insert(self):
+        """Confirm the child index reflects inserted children"""
+        b = self.backend
+        self.names('Data')
+        doc = self.prj.doc
+        first = b.create_element(doc, 'Data', {'Format': 'First'})
+        b.prepend_child(self.tag, first)
+        b.append_child(self.tag, b.create_element(doc, 'Data',
+                                                  {'Format': 'Last'}))
+        b.insert_after(self.tag, b.create_element(doc, 'Data',
+                                                  {'Format': 'After'}), first)
+        b.insert_before(self.tag, b.create_element(doc, 'Data',
+                                                   {'Format': 'Before'}),
+                        first)
+        self.assertEqual(self.names('Data'),
+                         ['Before', 'First', 'After', '', 'Decorated', 'Last'])
+
+    def test_backend_Backend_child_index_remove(self):
+        """Confirm the child index reflects removed children"""
+        tag = self.prj.controller.tags['dint1']
+        tag.description
+        tag.description = None
+        self.assertEqual(tag.description, None)
+        tag.clear_raw_data()
+        self.assertEqual(self.names('Data'), ['Decorated'])
+        tag.description = 'New'
+        self.assertEqual(tag.description, 'New')
+
+    def test_backend_Backend_child_index_move(self):
+        """Confirm the child index reflects children moved between parents"""
+        b = self.backend
+        other = self.prj.controller.tags['real1'].element
+        data = b.child_element(self.tag, 'Data')
+        b.child_element(other, 'Data')
+        b.append_child(other, data)
+        self.assertEqual(self.names('Data'), ['Decorated'])
+        self.assertEqual(b.children_named(other, 'Data')[-1], data)
+
+    def test_backend_Backend_reparent(self):
+        """Confirm inserting an attached child moves it from its old parent"""
+        b = self.backend
+        other = self.prj.controller.tags['real1'].element
+        first = b.children(other)[0]
+        count = len(b.children(other))
+        data = b.children_named(self.tag, 'Data')
+        b.prepend_child(other, data[0])
+        b.insert_before(other, data[1], first)
+        self.assertEqual(self.names('Data'), [])
+        moved = b.children(other)
+        self.assertEqual(len(moved), count + 2)
+        self.assertTrue(b.parent(moved[0]) is other)
+        b.insert_after(self.tag, moved[1], b.children(self.tag)[0])
+        b.append_children(self.tag, [moved[0]])
+        self.assertEqual(self.names('Data'), ['Decorated', ''])
+        self.assertEqual(len(b.children(other)), count)
+
+    def test_backend_Backend_document(self):
+        """Confirm the owning document is found for any element"""
+        b = self.backend
+        doc = self.prj.doc
+        self.assertTrue(b.document(doc) is doc)
+        self.assertTrue(b.document(self.tag) is doc)
+        data = b.children_named(self.tag, 'Data')[-1]
+        self.assertTrue(b.document(b.children(data)[0]) is doc)
+        self.assertTrue(b.document(b.create_element(doc, 'Data', {})) is doc)
+        self.assertTrue(self.prj.controller.tags['dint1'].doc is doc)
+
+
+class ETreeChildIndexCase(ChildIndexCase):
+    backend = 'etree'
+
+
+if __name__ == "__main__":
+    unittest.main()
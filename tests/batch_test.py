@@ -0,0 +1,127 @@
+"""
+Tests for batch processing of projects.
+
+When naming test cases the following format should be used.
+test_<Module>_<Class>_<Description>
+"""
+import unittest, io, os, pickle, shutil, sys, l5x
+from l5x import batch
+
+RESULTS = './tests/__results__/'
+INPUT_DIR = RESULTS + 'batch_input'
+OUTPUT_DIR = RESULTS + 'batch_output'
+
+
+def set_description(prj):
+    prj.controller.tags['dint1'].description = 'Batch'
+    return prj.controller.tags['dint1'].value
+
+
+def return_unpicklable(prj):
+    if prj.controller.tags['dint1'].description == 'Unpicklable':
+        return lambda: None
+    return 1
+
+
+class BatchCase(unittest.TestCase):
+    def setUp(self):
+        for d in (INPUT_DIR, OUTPUT_DIR):
+            if os.path.isdir(d):
+                shutil.rmtree(d)
+        os.makedirs(INPUT_DIR)
+        self.inputs = []
+        for i in range(3):
+            filename = os.path.join(INPUT_DIR, 'prj{0}.L5X'.format(i))
+            shutil.copy('./tests/basetest.L5X', filename)
+            self.inputs.append(filename)
+
+    def test_batch_run_batch_pool(self):
+        """Confirm every file is transformed and written by the pool"""
+        reported = []
+        results = batch.run_batch(self.inputs, set_description,
+                                  output_dir=OUTPUT_DIR, processes=2,
+                                  max_tasks_per_child=1,
+                                  progress=reported.append)
+        self.assertEqual([r.filename for r in results], self.inputs)
+        self.assertEqual(len(reported), 3)
+        for result in results:
+            self.assertTrue(result.ok)
+            self.assertEqual(result.value, 0)
+            self.assertTrue(result.load_time > 0)
+            prj = l5x.Project(result.output)
+            self.assertEqual(prj.controller.tags['dint1'].description,
+                             'Batch')
+        self.assertEqual(l5x.Project(self.inputs[0]).controller.tags['dint1'].description,
+                         'Test DINT 1')
+
+    def test_batch_run_batch_error(self):
+        """Confirm a failing file is reported without stopping the batch"""
+        with open(self.inputs[1], 'wb') as f:
+            f.write(b'<NotL5X/>')
+        results = batch.run_batch(self.inputs, set_description,
+                                  output_dir=OUTPUT_DIR, processes=1)
+        self.assertEqual([r.ok for r in results], [True, False, True])
+        self.assertTrue('InvalidFile' in results[1].error)
+        self.assertEqual(results[1].output, None)
+        self.assertFalse(os.path.exists(os.path.join(OUTPUT_DIR, 'prj1.L5X')))
+
+    def test_batch_run_batch_unpicklable_value(self):
+        """Confirm an unpicklable transform value fails only its file"""
+        prj = l5x.Project(self.inputs[1])
+        prj.controller.tags['dint1'].description = 'Unpicklable'
+        prj.write(self.inputs[1])
+        results = batch.run_batch(self.inputs, return_unpicklable,
+                                  processes=2, write=False)
+        self.assertEqual([r.ok for r in results], [True, False, True])
+        self.assertEqual([r.value for r in results], [1, None, 1])
+        self.assertEqual(results[1].filename, self.inputs[1])
+
+    def test_batch_run_batch_output_collision(self):
+        """Confirm inputs sharing a name are rejected before processing"""
+        other = os.path.join(INPUT_DIR, 'other')
+        os.makedirs(other)
+        shutil.copy(self.inputs[0], other)
+        with self.assertRaises(ValueError):
+            batch.run_batch(self.inputs + [os.path.join(other, 'prj0.L5X')],
+                            set_description, output_dir=OUTPUT_DIR,
+                            processes=1)
+        self.assertFalse(os.path.exists(OUTPUT_DIR))
+        results = batch.run_batch([self.inputs[0],
+                                   os.path.join(other, 'prj0.L5X')],
+                                  set_description, processes=1)
+        self.assertTrue(all(r.ok for r in results))
+
+    def test_batch_run_batch_no_write(self):
+        """Confirm nothing is written if writing is disabled"""
+        results = batch.run_batch(self.inputs, set_description, processes=1,
+                                  write=False, backend='etree')
+        self.assertTrue(all(r.ok and r.output is None for r in results))
+        prj = l5x.Project(self.inputs[0])
+        self.assertEqual(prj.controller.tags['dint1'].description,
+                         'Test DINT 1')
+
+    def test_batch_run_batch_unpicklable(self):
+        """Confirm an unpicklable transform is rejected"""
+        with self.assertRaises((pickle.PicklingError, AttributeError,
+                                TypeError)):
+            batch.run_batch(self.inputs, lambda prj: None)
+
+    def test_batch_main(self):
+        """Confirm the command line interface processes files in place"""
+        stdout = sys.stdout
+        sys.stdout = io.BytesIO() if sys.version_info[0] < 3 else io.StringIO()
+        try:
+            status = batch.main([__name__ + ':set_description', '-j', '1',
+                                 '--backend', 'etree', '--track-changes']
+                                + self.inputs)
+            output = sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+        self.assertEqual(status, 0)
+        self.assertTrue('3 files, 0 failed' in output)
+        prj = l5x.Project(self.inputs[2])
+        self.assertEqual(prj.controller.tags['dint1'].description, 'Batch')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Tests for the persistent parsed-project cache.
+
+When naming test cases the following format should be used.
+test_<Module>_<Class>_<Description>
+"""
+import unittest, marshal, os, shutil, l5x
+from l5x.cache import ProjectCache, SNAPSHOT_SUFFIX
+
+CACHE_DIR = './tests/__results__/cache'
+SOURCE = './tests/__results__/cache_source.L5X'
+
+
+def read(filename):
+    with open(filename, 'rb') as f:
+        return f.read()
+
+
+class CacheCase(unittest.TestCase):
+    backend = 'minidom'
+
+    def setUp(self):
+        if os.path.isdir(CACHE_DIR):
+            shutil.rmtree(CACHE_DIR)
+        self.cache = ProjectCache(CACHE_DIR)
+        shutil.copy('./tests/basetest.L5X', SOURCE)
+
+    def open(self):
+        return l5x.Project(SOURCE, backend=self.backend, cache=self.cache)
+
+    def snapshots(self):
+        return [n for n in os.listdir(CACHE_DIR) if n.endswith(SNAPSHOT_SUFFIX)]
+
+    def test_cache_ProjectCache_store(self):
+        """Confirm opening a project stores a snapshot"""
+        self.assertEqual(self.cache.load(SOURCE, self.backend), None)
+        self.open()
+        self.assertEqual(len(self.snapshots()), 1)
+        self.assertNotEqual(self.cache.load(SOURCE, self.backend), None)
+
+    def test_cache_ProjectCache_restored_content(self):
+        """Confirm a restored project matches the parsed project"""
+        self.open()
+        prj = self.open()
+        self.assertEqual(prj.controller.tags['dint1'].description,
+                         'Test DINT 1')
+        rung = prj.programs['MainProgram'].routines['TestLadderRoutine'].rungs['2']
+        comment = rung.backend.get_cdata(rung.get_child_element('Comment'))
+        self.assertTrue(comment.startswith('Comment with Unicode\n'))
+
+        prj.write('./tests/__results__/cache_restored.L5X')
+        l5x.Project(SOURCE, backend=self.backend).write(
+            './tests/__results__/cache_parsed.L5X')
+        self.assertEqual(read('./tests/__results__/cache_restored.L5X'),
+                         read('./tests/__results__/cache_parsed.L5X'))
+
+    def test_cache_ProjectCache_modified_file(self):
+        """Confirm a modified file is not matched with a stale snapshot"""
+        prj = self.open()
+        prj.controller.tags['dint1'].value = 42
+        prj.write(SOURCE)
+        os.utime(SOURCE, (0, 0))
+
+        self.assertEqual(self.open().controller.tags['dint1'].value, 42)
+        self.assertEqual(len(self.snapshots()), 2)
+
+    def test_cache_ProjectCache_evict(self):
+        """Confirm snapshots are evicted to stay within the size limit"""
+        self.open()
+        size = os.path.getsize(os.path.join(CACHE_DIR, self.snapshots()[0]))
+        self.cache.max_bytes = size
+        os.utime(os.path.join(CACHE_DIR, self.snapshots()[0]), (0, 0))
+
+        l5x.Project(SOURCE, backend=self.backend, cache=self.cache,
+                    skip_sections=['Modules'])
+        snapshots = self.snapshots()
+        self.assertEqual(len(snapshots), 1)
+        self.assertEqual(self.cache.load(SOURCE, self.backend), None)
+
+    def test_cache_ProjectCache_damaged_snapshot(self):
+        """Confirm damaged snapshots are discarded and the file parsed"""
+        self.open()
+        path = os.path.join(CACHE_DIR, self.snapshots()[0])
+        data = read(path)
+        damaged = [data[:len(data) // 2],
+                   marshal.dumps(('Tag', (), ('text', ('x', 1)))),
+                   marshal.dumps(('Other', (), ()))]
+        for content in damaged:
+            with open(path, 'wb') as f:
+                f.write(content)
+            self.assertEqual(self.cache.load(SOURCE, self.backend), None)
+            self.assertFalse(os.path.exists(path))
+
+            prj = self.open()
+            self.assertEqual(prj.controller.tags['dint1'].description,
+                             'Test DINT 1')
+            self.assertEqual(read(path), data)
+
+    def test_cache_ProjectCache_clear(self):
+        """Confirm clearing the cache removes all entries"""
+        self.open()
+        self.cache.clear()
+        self.assertEqual(os.listdir(CACHE_DIR), [])
+
+
+class ETreeCacheCase(CacheCase):
+    backend = 'etree'
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+Tests for reading and writing compressed projects.
+
+When naming test cases the following format should be used.
+test_<Module>_<Class>_<Description>
+"""
+import unittest, io, gzip, shutil, l5x
+from l5x import compression
+from l5x.errors import InvalidFile
+from l5x.stream import (iter_records, TagRecord)
+
+SOURCE = './tests/basetest.L5X'
+RESULTS = './tests/__results__/'
+
+
+def read(filename):
+    with open(filename, 'rb') as f:
+        return f.read()
+
+
+def compress(name, data):
+    f = io.BytesIO()
+    writer = compression.CompressingWriter(f, compression.get_codec(name))
+    writer.write(data)
+    writer.finish()
+    return f.getvalue()
+
+
+def available():
+    return [c.name for c in compression.codecs.values()
+            if c.decompressor is not None]
+
+
+class CompressionCase(unittest.TestCase):
+    backend = 'minidom'
+
+    def setUp(self):
+        self.original = read(SOURCE)
+
+    def test_compression_open_source_path(self):
+        """Confirm compressed files are detected and read by content"""
+        for name in available():
+            # Named without a compression extension.
+            filename = RESULTS + 'compressed_' + name + '.L5X'
+            with open(filename, 'wb') as f:
+                f.write(compress(name, self.original))
+            prj = l5x.Project(filename, backend=self.backend)
+            self.assertEqual(prj.controller.tags['dint1'].description,
+                             'Test DINT 1')
+
+    def test_compression_open_source_file_object(self):
+        """Confirm compressed file objects are read"""
+        buf = io.BytesIO(compress('gzip', self.original))
+        prj = l5x.Project(buf, backend=self.backend)
+        self.assertFalse(buf.closed)
+        self.assertEqual(prj.controller.tags['dint1'].description,
+                         'Test DINT 1')
+
+    def test_compression_DecompressingReader_concatenated(self):
+        """Confirm concatenated compressed streams are read as one"""
+        half = len(self.original) // 2
+        for name in available():
+            data = (compress(name, self.original[:half])
+                    + compress(name, self.original[half:]))
+            reader = compression.DecompressingReader(
+                io.BytesIO(data), compression.get_codec(name))
+            self.assertEqual(reader.read(), self.original)
+
+    def test_compression_DecompressingReader_truncated(self):
+        """Confirm corrupt compressed data raises an exception"""
+        data = compress('gzip', self.original)
+        with self.assertRaises(InvalidFile):
+            l5x.Project(io.BytesIO(data[:-100]), backend=self.backend)
+        with self.assertRaises(InvalidFile):
+            l5x.Project(io.BytesIO(data[:20] + b'\x00' * 100 + data[120:]),
+                        backend=self.backend)
+
+    def test_compression_open_target_extension(self):
+        """Confirm output is compressed according to the file extension"""
+        prj = l5x.Project(SOURCE, backend=self.backend)
+        prj.write(RESULTS + 'compressed_plain.L5X')
+        plain = read(RESULTS + 'compressed_plain.L5X')
+
+        filename = RESULTS + 'compressed_output.L5X.gz'
+        prj.write(filename)
+        with gzip.open(filename, 'rb') as f:
+            self.assertEqual(f.read(), plain)
+        self.assertTrue(len(read(filename)) < len(plain))
+
+    def test_compression_open_target_format(self):
+        """Confirm file objects are compressed in a given format"""
+        prj = l5x.Project(SOURCE, backend=self.backend)
+        plain = io.BytesIO()
+        prj.write(plain)
+        for name in available():
+            buf = io.BytesIO()
+            prj.write(buf, compression=name)
+            self.assertFalse(buf.closed)
+            reader = compression.DecompressingReader(
+                io.BytesIO(buf.getvalue()), compression.get_codec(name))
+            self.assertEqual(reader.read(), plain.getvalue())
+
+    def test_compression_get_codec_unknown(self):
+        """Confirm an unknown format is rejected"""
+        prj = l5x.Project(SOURCE, backend=self.backend)
+        with self.assertRaises(ValueError):
+            prj.write(io.BytesIO(), compression='rar')
+
+    def test_compression_open_source_stream(self):
+        """Confirm records are streamed from compressed exports"""
+        buf = io.BytesIO(compress('gzip', self.original))
+        names = [r.name for r in iter_records(buf, [TagRecord])]
+        self.assertEqual(names,
+                         [r.name for r in iter_records(SOURCE, [TagRecord])])
+
+    def test_compression_SourceMap_compressed(self):
+        """Confirm change tracking is rejected for compressed files"""
+        filename = RESULTS + 'compressed_tracked.L5X.gz'
+        with open(filename, 'wb') as f:
+            f.write(compress('gzip', self.original))
+        with self.assertRaises(ValueError):
+            l5x.Project(filename, backend=self.backend, track_changes=True)
+
+    def test_compression_write_spliced(self):
+        """Confirm spliced output may be compressed"""
+        filename = RESULTS + 'compressed_splice_source.L5X'
+        shutil.copy(SOURCE, filename)
+        prj = l5x.Project(filename, backend=self.backend, track_changes=True)
+        prj.write(filename + '.gz')
+        with gzip.open(filename + '.gz', 'rb') as f:
+            self.assertEqual(f.read(), self.original)
+
+
+class ETreeCompressionCase(CompressionCase):
+    backend = 'etree'
+
+
+if __name__ == "__main__":
+    unittest.main()
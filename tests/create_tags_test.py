@@ -0,0 +1,101 @@
+"""
+Tests for creating tags in bulk.
+
+When naming test cases the following format should be used.
+test_<Module>_<Class>_<Description>
+"""
+import unittest, l5x
+from l5x.tag import Tag
+
+# Members of the Pair data type, as (name, data type, dimension) tuples.
+PAIR = [('A', 'DINT', '0'), ('B', 'INT', '2')]
+
+
+class CreateTagsCase(unittest.TestCase):
+    backend = 'minidom'
+
+    def setUp(self):
+        self.prj = l5x.Project('./tests/basetest.L5X', backend=self.backend)
+        self.scope = self.prj.controller
+        b = self.prj.backend
+        doc = self.prj.doc
+        datatypes = self.scope.get_child_element('DataTypes')
+        datatype = b.create_element(doc, 'DataType', {'Name': 'Pair',
+                                                      'Family': 'NoFamily',
+                                                      'Class': 'User'})
+        members = b.create_element(doc, 'Members')
+        for name, data_type, dimension in PAIR:
+            b.append_child(members, b.create_element(doc, 'Member', {
+                'Name': name, 'DataType': data_type, 'Dimension': dimension,
+                'Radix': 'Decimal', 'Hidden': 'false'}))
+        b.append_child(datatype, members)
+        b.append_child(datatypes, datatype)
+        self.prj.datatypes.append('Pair', datatype)
+
+    def test_tag_Scope_create_tags(self):
+        """Confirm tags are created as by Tag.create"""
+        Tag.create(self.scope, self.prj, 'Base', 'single', 'DINT', 1, 'One')
+        self.scope.create_tags([
+            {'tagname': 'bulk', 'datatype': 'DINT', 'value': 1,
+             'description': 'One'},
+            {'tagname': 'ints', 'datatype': 'INT', 'value': [1, 2, 3],
+             'dimensions': '3'},
+            {'tagtype': 'Alias', 'tagname': 'alias2', 'alias_for': 'dint1'}])
+
+        b = self.prj.backend
+        single = self.scope.tags['single']
+        bulk = self.scope.tags['bulk']
+        self.assertEqual(sorted(b.attributes(bulk.element)),
+                         sorted([('Name', 'bulk')] +
+                                [a for a in b.attributes(single.element)
+                                 if a[0] != 'Name']))
+        self.assertEqual(bulk.description, 'One')
+        self.assertEqual(bulk.value, 1)
+        self.assertEqual(self.scope.tags['INTS'].value, [1, 2, 3])
+        self.assertEqual(self.scope.tags['alias2'].alias_for, 'dint1')
+
+        names = [b.get_attribute(e, 'Name')
+                 for e in b.children(self.scope.tag_element)]
+        self.assertEqual(names[-4:], ['single', 'bulk', 'ints', 'alias2'])
+
+    def test_tag_Scope_create_tags_structures(self):
+        """Confirm structure tags and arrays of structures are created"""
+        rows = [{'tagname': 'pair%d' % i, 'datatype': 'Pair',
+                 'value': {'A': i, 'B': [i, 2 * i]}} for i in range(3)]
+        rows.append({'tagname': 'pairs', 'datatype': 'Pair',
+                     'dimensions': '2', 'value': [{'A': 5}, {'A': 6}]})
+        self.scope.create_tags(rows, self.prj)
+        tags = self.scope.tags
+        self.assertEqual(tags['pair2'].value, {'A': 2, 'B': [2, 4]})
+        self.assertEqual(tags['pairs'][1]['A'].value, 6)
+        self.assertEqual(tags['pairs'][0]['B'].value, [0, 0])
+
+    def test_tag_Scope_create_tags_invalid(self):
+        """Confirm no tags are created if any row is invalid"""
+        count = len(self.scope.tags)
+        rows = [{'tagname': 'new1', 'datatype': 'DINT', 'value': 0},
+                {'tagname': 'DINT1', 'datatype': 'DINT', 'value': 0}]
+        self.assertRaises(ValueError, self.scope.create_tags, rows)
+        rows = [{'tagname': 'new1', 'datatype': 'DINT', 'value': 0},
+                {'tagname': 'NEW1', 'datatype': 'DINT', 'value': 0}]
+        self.assertRaises(ValueError, self.scope.create_tags, rows)
+        rows = [{'tagname': 'pair', 'datatype': 'Pair', 'value': {}}]
+        self.assertRaises(ValueError, self.scope.create_tags, rows)
+        self.assertEqual(len(self.scope.tags), count)
+        self.assertFalse('new1' in self.scope.tags)
+
+    def test_tag_Program_create_tags(self):
+        """Confirm tags are created within a program"""
+        program = self.prj.programs['MainProgram']
+        program.create_tags([{'tagname': 'local', 'datatype': 'REAL',
+                              'value': 1.5}])
+        self.assertEqual(program.tags['local'].value, 1.5)
+        self.assertFalse('local' in self.scope.tags)
+
+
+class ETreeCreateTagsCase(CreateTagsCase):
+    backend = 'etree'
+
+
+if __name__ == "__main__":
+    unittest.main()
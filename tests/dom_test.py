@@ -0,0 +1,171 @@
+"""
+Tests for the generic element access objects.
+
+When naming test cases the following format should be used.
+test_<Module>_<Class>_<Description>
+"""
+import unittest, gc, l5x
+from l5x.dom import ElementDict
+
+
+class ElementDictCase(unittest.TestCase):
+    backend = 'minidom'
+
+    def setUp(self):
+        self.prj = l5x.Project('./tests/basetest.L5X', backend=self.backend)
+        self.tags = self.prj.controller.tags
+
+    def test_dom_ElementDict_accessor_identity(self):
+        """Confirm repeated lookups return the same accessor"""
+        tag = self.tags['dint1']
+        self.assertTrue(self.tags['dint1'] is tag)
+        program = self.prj.programs['MainProgram']
+        self.assertTrue(self.prj.programs['MainProgram'] is program)
+        self.assertTrue(self.prj.programs['MainProgram'].tags is program.tags)
+
+    def test_dom_ElementDict_accessor_released(self):
+        """Confirm unreferenced accessors are not retained"""
+        element = self.tags['dint1'].element
+        gc.collect()
+        self.assertEqual(self.tags.accessors[element](), None)
+        self.assertEqual(self.tags['dint1'].data_type, 'DINT')
+
+    def test_dom_ElementDict_delitem_invalidates(self):
+        """Confirm deleted members are removed from the accessor cache"""
+        tag = self.tags['dint1']
+        del self.tags['dint1']
+        self.assertFalse(tag.element in self.tags.accessors)
+        with self.assertRaises(KeyError):
+            self.tags['dint1']
+
+    def test_dom_ElementDict_append_invalidates(self):
+        """Confirm replaced members yield a new accessor"""
+        old = self.tags['dint1']
+        self.tags.append('dint1', self.tags.members['real1'])
+        new = self.tags['dint1']
+        self.assertFalse(new is old)
+        self.assertEqual(new.data_type, 'REAL')
+
+    def test_dom_ElementDict_member_type(self):
+        """Confirm member classes are resolved from a single class or mapping"""
+        self.assertTrue(self.tags.member_type is l5x.tag.Tag)
+        routines = self.prj.programs['MainProgram'].routines
+        self.assertEqual(routines.member_type, None)
+        self.assertTrue(isinstance(routines['TestLadderRoutine'],
+                                   l5x.program.RLLRoutine))
+
+    def test_dom_ElementDict_constructor_type_error(self):
+        """Confirm a TypeError raised by a member class is not masked"""
+        class Failing(object):
+            def __init__(self, element):
+                raise TypeError('failed')
+
+        members = ElementDict(self.tags.element, key_attr='Name',
+                              types=Failing)
+        with self.assertRaises(TypeError):
+            members['dint1']
+
+    def test_dom_ElementDict_lazy_index(self):
+        """Confirm members are counted without being indexed"""
+        self.assertEqual(len(self.tags), 3)
+        self.assertFalse('members' in self.tags.__dict__)
+        self.assertTrue('dint1' in self.tags)
+        self.assertTrue('members' in self.tags.__dict__)
+        self.assertFalse('missing' in self.tags)
+
+    def test_dom_ElementDict_len_modified(self):
+        """Confirm the length reflects deleted and appended members"""
+        len(self.tags)
+        element = self.tags.members['dint1']
+        del self.tags['dint1']
+        self.assertEqual(len(self.tags), 2)
+        self.tags.append('dint1', element)
+        self.assertEqual(len(self.tags), 3)
+
+    def test_dom_ElementDict_views(self):
+        """Confirm keys, values and items views of the members"""
+        self.assertEqual(sorted(self.tags.keys()),
+                         ['boolean1', 'dint1', 'real1'])
+        self.assertEqual(len(self.tags.values()), 3)
+        values = dict((tag.data_type, tag) for tag in self.tags.values())
+        self.assertEqual(sorted(values), ['BOOL', 'DINT', 'REAL'])
+        items = dict(self.tags.items())
+        self.assertTrue(items['dint1'] is values['DINT'])
+        self.assertTrue(('dint1', values['DINT']) in self.tags.items())
+
+    def add_tag(self, name):
+        b = self.prj.backend
+        element = b.create_element(self.prj.doc, 'Tag', {'Name': name})
+        b.append_child(self.tags.element, element)
+        return element
+
+    def test_dom_ElementDict_ignore_case(self):
+        """Confirm names are found regardless of case"""
+        tag = self.tags['DINT1']
+        self.assertTrue(self.tags['dint1'] is tag)
+        self.assertTrue('Real1' in self.tags)
+        self.assertTrue('MAINPROGRAM' in self.prj.programs)
+        del self.tags['Boolean1']
+        self.assertFalse('boolean1' in self.tags)
+        self.assertEqual(len(self.tags), 2)
+
+    def test_dom_ElementDict_case_sensitive(self):
+        """Confirm keys are matched exactly unless ignoring case"""
+        members = ElementDict(self.tags.element, key_attr='Name',
+                              types=l5x.tag.Tag)
+        self.assertFalse('DINT1' in members)
+        with self.assertRaises(KeyError):
+            members['DINT1']
+
+    def test_dom_ElementDict_ignore_case_exact_first(self):
+        """Confirm a key of the exact case is preferred"""
+        self.add_tag('DINT1')
+        tags = ElementDict(self.tags.element, key_attr='Name',
+                           types=l5x.tag.Tag, ignore_case=True)
+        self.assertEqual(tags['DINT1'].data_type, None)
+        self.assertEqual(tags['dint1'].data_type, 'DINT')
+
+    def test_dom_ElementDict_ignore_case_append(self):
+        """Confirm appended members are found regardless of case"""
+        self.assertFalse('newtag' in self.tags)
+        self.tags.append('NewTag', self.add_tag('NewTag'))
+        self.assertTrue('newtag' in self.tags)
+
+    def test_dom_ElementDict_extend(self):
+        """Confirm members are appended in bulk and found regardless of case"""
+        old = self.tags['dint1']
+        self.assertFalse('newtag' in self.tags)
+        self.tags.extend([('NewTag', self.add_tag('NewTag')),
+                          ('dint1', self.tags.members['real1'])])
+        self.assertTrue('newtag' in self.tags)
+        self.assertFalse(self.tags['dint1'] is old)
+        self.assertEqual(self.tags['dint1'].data_type, 'REAL')
+
+    def test_dom_ElementDict_duplicates(self):
+        """Confirm names conflicting regardless of case are reported"""
+        prj = l5x.Project('./tests/basetest.L5X', backend=self.backend)
+        self.assertEqual(prj.controller.tags.duplicates(), [])
+        self.assertEqual(prj.duplicate_names(), [])
+        self.add_tag('DINT1')
+        self.add_tag('Real1')
+        self.add_tag('real1')
+        self.assertEqual(self.tags.duplicates(),
+                         [['dint1', 'DINT1'], ['real1', 'Real1', 'real1']])
+        self.assertEqual(self.prj.duplicate_names(),
+                         [('controller tags', ['dint1', 'DINT1']),
+                          ('controller tags', ['real1', 'Real1', 'real1'])])
+
+    def test_dom_ElementAccess_slots(self):
+        """Confirm data accessors do not carry an instance dictionary"""
+        data = self.tags['dint1'].data
+        for accessor in [data, data[0], self.tags['real1'].data]:
+            self.assertFalse(hasattr(accessor, '__dict__'))
+        self.assertTrue(hasattr(self.tags['dint1'], '__dict__'))
+
+
+class ETreeElementDictCase(ElementDictCase):
+    backend = 'etree'
+
+
+if __name__ == "__main__":
+    unittest.main()
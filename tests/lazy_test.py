@@ -0,0 +1,89 @@
+"""
+Tests for on-demand section loading and skipped sections.
+
+When naming test cases the following format should be used.
+test_<Module>_<Class>_<Description>
+"""
+import unittest, l5x
+from l5x.errors import PartialProjectError
+
+
+class LazyCase(unittest.TestCase):
+
+    def setUp(self):
+        self.prj = l5x.Project('./tests/basetest.L5X', lazy=True)
+
+    def test_project_Project_lazy_sections(self):
+        """Confirm sections are indexed on first access only"""
+        for name in ['datatypes', 'addons', 'programs', 'modules']:
+            self.assertFalse(name in self.prj.__dict__)
+        programs = self.prj.programs
+        self.assertTrue('programs' in self.prj.__dict__)
+        self.assertTrue(self.prj.programs is programs)
+        self.assertFalse('members' in programs.__dict__)
+        self.assertTrue('MainProgram' in programs.names)
+
+    def test_project_Project_eager_sections(self):
+        """Confirm sections are indexed on open by default"""
+        prj = l5x.Project('./tests/basetest.L5X')
+        for name in ['datatypes', 'addons', 'programs', 'modules']:
+            self.assertTrue(name in prj.__dict__)
+            self.assertTrue('members' in prj.__dict__[name].__dict__)
+
+    def test_program_Program_lazy_tags(self):
+        """Confirm program tags and routines are indexed on first access"""
+        program = self.prj.programs['MainProgram']
+        self.assertFalse('tags' in program.__dict__)
+        self.assertFalse('routines' in program.__dict__)
+        self.assertEqual(list(program.tags.names), ['boolean2'])
+        self.assertTrue(isinstance(program.routines['TestLadderRoutine'],
+                                   l5x.program.RLLRoutine))
+
+    def test_tag_Scope_lazy_tags(self):
+        """Confirm controller tags are indexed on first access"""
+        self.assertFalse('tags' in self.prj.controller.__dict__)
+        self.assertEqual(self.prj.controller.tags['dint1'].value, 0)
+
+    def test_tag_Tag_lazy_data(self):
+        """Confirm tag data accessors are created on first use"""
+        tag = self.prj.controller.tags['dint1']
+        self.assertEqual(tag.description, 'Test DINT 1')
+        self.assertFalse('data' in tag.__dict__)
+        self.assertEqual(tag.value, 0)
+        self.assertTrue(isinstance(tag.__dict__['data'], l5x.tag.DINT))
+        self.assertTrue(tag.data is tag.__dict__['data'])
+
+
+class SkipSectionsCase(unittest.TestCase):
+    backend = 'minidom'
+
+    def setUp(self):
+        self.prj = l5x.Project('./tests/basetest.L5X', backend=self.backend,
+                               skip_sections=['Modules', 'Trends'])
+
+    def test_project_Project_skipped_section_empty(self):
+        """Confirm skipped sections are present but empty"""
+        self.assertEqual(len(self.prj.modules.names), 0)
+        self.assertEqual(self.prj.skipped_sections,
+                         frozenset(['Modules', 'Trends']))
+
+    def test_project_Project_other_sections_intact(self):
+        """Confirm sections which are not skipped are unaffected"""
+        self.assertEqual(sorted(self.prj.controller.tags.names),
+                         ['boolean1', 'dint1', 'real1'])
+        self.assertEqual(self.prj.controller.description, 'Base test project to be used with l5x python package')
+        program = self.prj.programs['MainProgram']
+        self.assertEqual(program.tags['boolean2'].description, 'Test Boolean 2')
+
+    def test_project_Project_skipped_write(self):
+        """Confirm projects with skipped sections cannot be written"""
+        with self.assertRaises(PartialProjectError):
+            self.prj.write('./tests/__results__/skipped_output.L5X')
+
+
+class ETreeSkipSectionsCase(SkipSectionsCase):
+    backend = 'etree'
+
+
+if __name__ == "__main__":
+    unittest.main()
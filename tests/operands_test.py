@@ -0,0 +1,246 @@
+"""
+Tests for flat operand tables.
+
+When naming test cases the following format should be used.
+test_<Module>_<Class>_<Description>
+"""
+import unittest, io, csv, sys, l5x
+from l5x import operands
+from l5x.operands import OperandRecord
+
+RESULTS = './tests/__results__/'
+
+# Decorated data of a structure tag and an array of structures tag, as
+# (name, attributes, children) tuples.
+MOTOR = ('Structure', {'DataType': 'MotorUDT'}, [
+    ('DataValueMember', {'Name': 'Speed', 'DataType': 'REAL',
+                         'Radix': 'Float', 'Value': '1.5'}, []),
+    ('DataValueMember', {'Name': 'Running', 'DataType': 'BOOL',
+                         'Radix': 'Decimal', 'Value': '1'}, []),
+    ('ArrayMember', {'Name': 'Faults', 'DataType': 'INT', 'Dimensions': '2',
+                     'Radix': 'Decimal'}, [
+        ('Element', {'Index': '[0]', 'Value': '3'}, []),
+        ('Element', {'Index': '[1]', 'Value': '4'}, [])]),
+    ('StructureMember', {'Name': 'Timer', 'DataType': 'TIMER'}, [
+        ('DataValueMember', {'Name': 'PRE', 'DataType': 'DINT',
+                             'Radix': 'Decimal', 'Value': '1000'}, [])])])
+
+PAIRS = ('Array', {'DataType': 'Pair', 'Dimensions': '2'}, [
+    ('Element', {'Index': '[%d]' % i}, [
+        ('Structure', {'DataType': 'Pair'}, [
+            ('DataValueMember', {'Name': 'A', 'DataType': 'DINT',
+                                 'Radix': 'Hex', 'Value': str(i)}, [])])])
+    for i in range(2)])
+
+GRID = ('Array', {'DataType': 'DINT', 'Dimensions': '2,3', 'Radix': 'Decimal'},
+        [('Element', {'Index': '[%d,%d]' % (i, j), 'Value': str(i * 3 + j)},
+          []) for i in range(2) for j in range(3)])
+
+
+class OperandsCase(unittest.TestCase):
+    backend = 'minidom'
+
+    def setUp(self):
+        self.prj = l5x.Project('./tests/basetest.L5X', backend=self.backend)
+        self.scope = self.prj.controller
+        self.add_tag('Motor', 'MotorUDT', MOTOR, {'.SPEED': 'Speed setpoint'})
+        self.add_tag('Pairs', 'Pair', PAIRS, {'[1].A': 'Second A'})
+
+    def build(self, parent, spec):
+        b = self.prj.backend
+        name, attributes, children = spec
+        element = b.create_element(self.prj.doc, name, attributes)
+        b.append_child(parent, element)
+        for child in children:
+            self.build(element, child)
+        return element
+
+    def add_tag(self, name, data_type, data, comments):
+        tag = self.build(self.scope.tag_element, (
+            'Tag', {'Name': name, 'TagType': 'Base', 'DataType': data_type},
+            [('Comments', {}, [('Comment', {'Operand': k}, [])
+                               for k in comments]),
+             ('Data', {'Format': 'Decorated'}, [data])]))
+        b = self.prj.backend
+        for element in b.children(b.child_element(tag, 'Comments')):
+            b.set_cdata(element, comments[b.get_attribute(element,
+                                                          'Operand')])
+        self.scope.tags.append(name, tag)
+
+    def test_operands_iter_operands_scope(self):
+        """Confirm every atomic value of a scope is listed in order"""
+        records = list(self.scope.operands())
+        self.assertEqual(records[:3], [
+            ('boolean1', 'BOOL', 'Decimal', 0, 'Test Boolean 1'),
+            ('dint1', 'DINT', 'Decimal', 0, 'Test DINT 1'),
+            ('real1', 'REAL', 'Float', 0.0, 'Test Real 1')])
+        self.assertEqual(records[3:], [
+            ('Motor.Speed', 'REAL', 'Float', 1.5, 'Speed setpoint'),
+            ('Motor.Running', 'BOOL', 'Decimal', 1, None),
+            ('Motor.Faults[0]', 'INT', 'Decimal', 3, None),
+            ('Motor.Faults[1]', 'INT', 'Decimal', 4, None),
+            ('Motor.Timer.PRE', 'DINT', 'Decimal', 1000, None),
+            ('Pairs[0].A', 'DINT', 'Hex', 0, None),
+            ('Pairs[1].A', 'DINT', 'Hex', 1, 'Second A')])
+        self.assertTrue(isinstance(records[0], OperandRecord))
+
+    def test_operands_iter_operands_matches_accessors(self):
+        """Confirm values and comments agree with the data accessors"""
+        self.scope.tags['Motor']['Timer']['PRE'].description = 'Preset'
+        self.scope.tags['Motor']['Timer']['PRE'].value = 7
+        records = dict((r.operand, r) for r in self.scope.operands())
+        self.assertEqual(records['Motor.Timer.PRE'].value, 7)
+        self.assertEqual(records['Motor.Timer.PRE'].description, 'Preset')
+        self.assertEqual(records['Pairs[1].A'].value,
+                         self.scope.tags['Pairs'][1]['A'].value)
+
+    def test_operands_iter_operands_bits(self):
+        """Confirm integer bits are listed on request"""
+        self.scope.tags['dint1'].value = 5
+        self.scope.tags['dint1'][2].description = 'Bit two'
+        records = [r for r in self.scope.operands(bits=True)
+                   if r.operand.startswith('dint1')]
+        self.assertEqual(len(records), 33)
+        self.assertEqual(records[1], ('dint1.0', 'BOOL', None, 1, None))
+        self.assertEqual(records[3], ('dint1.2', 'BOOL', None, 1, 'Bit two'))
+        self.assertEqual(records[2].value, 0)
+
+    def test_operands_iter_operands_program(self):
+        """Confirm program tags are listed"""
+        program = self.prj.programs['MainProgram']
+        self.assertEqual(list(program.operands()),
+                         [('boolean2', 'BOOL', 'Decimal', 0,
+                           'Test Boolean 2')])
+
+    def test_operands_write_csv(self):
+        """Confirm operands are written as CSV with a header row"""
+        filename = RESULTS + 'operands_' + self.backend + '.csv'
+        self.scope.write_operands(filename)
+        if sys.version_info[0] < 3:
+            f = open(filename, 'rb')
+        else:
+            f = io.open(filename, newline='', encoding='utf-8')
+        with f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], list(OperandRecord._fields))
+        self.assertEqual(rows[4], ['Motor.Speed', 'REAL', 'Float', '1.5',
+                                   'Speed setpoint'])
+        self.assertEqual(len(rows), 11)
+
+
+    def test_operands_parse_operand(self):
+        """Confirm operands are split into a shape and parameters"""
+        self.assertEqual(operands.parse_operand('Conveyor[4].Drive.Status.12'),
+                         ('Conveyor', (1, 'Drive', 'Status', None), [4, 12]))
+        self.assertEqual(operands.parse_operand('Grid[1, 2]'),
+                         ('Grid', (2,), [1, 2]))
+        self.assertEqual(operands.parse_operand('Axis2.Pos3[0].7'),
+                         ('Axis2', ('Pos3', 1, None), [0, 7]))
+        for operand in ['', '1abc', 'a..b', 'a[1', 'a[]', 'a.b c', 'a[b]',
+                        'a#', 'a.#']:
+            with self.assertRaises(ValueError):
+                operands.parse_operand(operand)
+
+    def test_operands_resolve(self):
+        """Confirm operands resolve to the same data as the accessors"""
+        tags = self.scope.tags
+        self.assertEqual(self.scope.resolve('motor.timer.pre').value, 1000)
+        self.assertTrue(self.scope.resolve('Motor.Faults[1]')
+                        is tags['Motor']['Faults'][1])
+        self.assertEqual(self.scope.resolve('Pairs[1].A').value, 1)
+        self.assertEqual(self.scope.resolve('Pairs[0].a').value, 0)
+        self.scope.resolve('dint1.3').value = 1
+        self.assertEqual(tags['dint1'].value, 8)
+        self.assertTrue(self.scope.resolve('real1') is tags['real1'].data)
+        program = self.prj.programs['MainProgram']
+        self.assertEqual(program.resolve('boolean2').value, 0)
+
+    def test_operands_resolve_multidimensional(self):
+        """Confirm subscripts address multidimensional array elements"""
+        tag = self.build(self.scope.tag_element, (
+            'Tag', {'Name': 'Grid', 'TagType': 'Base', 'DataType': 'DINT',
+                    'Dimensions': '2 3'},
+            [('Data', {'Format': 'Decorated'}, [GRID])]))
+        self.scope.tags.append('Grid', tag)
+        self.assertEqual(self.scope.resolve('Grid[1,2]').value, 5)
+        self.assertEqual(self.scope.resolve('Grid[0,1]').value,
+                         self.scope.tags['Grid'][0][1].value)
+        with self.assertRaises(IndexError):
+            self.scope.resolve('Grid[2,0]')
+        with self.assertRaises(IndexError):
+            self.scope.resolve('Grid[1]')
+
+    def test_operands_resolve_compiled_once(self):
+        """Confirm paths are compiled once per data type and shape"""
+        self.scope.resolve('Pairs[0].A')
+        paths = operands._paths[self.prj.doc]
+        count = len(paths)
+        self.scope.resolve('Pairs[1].A')
+        self.scope.resolve('PAIRS[1].A')
+        self.assertEqual(len(paths), count)
+        self.scope.resolve('Pairs[1].a')
+        self.assertEqual(len(paths), count + 1)
+
+    def test_operands_resolve_errors(self):
+        """Confirm invalid operands are rejected"""
+        with self.assertRaises(KeyError):
+            self.scope.resolve('Missing')
+        with self.assertRaises(KeyError):
+            self.scope.resolve('Motor.Missing')
+        with self.assertRaises(TypeError):
+            self.scope.resolve('Motor.Speed.Other')
+        with self.assertRaises(TypeError):
+            self.scope.resolve('Motor.Faults.1')
+        with self.assertRaises(IndexError):
+            self.scope.resolve('Motor.Faults[2]')
+        with self.assertRaises(IndexError):
+            self.scope.resolve('dint1.32')
+
+    def test_tag_Tag_get_comments(self):
+        """Confirm all member descriptions of a tag are listed"""
+        self.assertEqual(self.scope.tags['Motor'].get_comments(),
+                         {'.SPEED': 'Speed setpoint'})
+        self.assertEqual(self.scope.tags['dint1'].get_comments(), {})
+
+    def test_tag_Tag_set_comments(self):
+        """Confirm descriptions are created, replaced and removed in bulk"""
+        tag = self.scope.tags['Pairs']
+        tag.set_comments({'[0].a': 'First A', '[1].A': 'Changed',
+                          '[1]': None})
+        self.assertEqual(tag.get_comments(), {'[0].A': 'First A',
+                                              '[1].A': 'Changed'})
+        self.assertEqual(tag[0]['A'].description, 'First A')
+        tag.set_comments({'[0].A': None})
+        self.assertEqual(tag[0]['A'].description, None)
+        self.assertEqual(tag[1]['A'].description, 'Changed')
+
+    def test_tag_Tag_set_comments_creates_comments(self):
+        """Confirm a Comments element is created ahead of the data"""
+        tag = self.scope.tags['dint1']
+        tag.set_comments({})
+        self.assertEqual(tag.get_comments(), {})
+        tag.set_comments({'.5': 'Bit five'})
+        self.assertEqual(tag[5].description, 'Bit five')
+        b = self.prj.backend
+        names = [b.tag_name(e) for e in b.children(tag.element)]
+        self.assertTrue(names.index('Comments') < names.index('Data'))
+
+    def test_tag_Comment_index(self):
+        """Confirm the comment index follows descriptions set individually"""
+        tag = self.scope.tags['Motor']
+        tag['Running'].description = 'Running'
+        self.assertEqual(tag['Running'].description, 'Running')
+        self.assertEqual(tag.get_comments()['.RUNNING'], 'Running')
+        tag['Speed'].description = None
+        self.assertEqual(tag['Speed'].description, None)
+        tag.set_comments({'.speed': 'Again'})
+        self.assertEqual(tag['Speed'].description, 'Again')
+        self.assertEqual(len(tag.get_comments()), 2)
+
+
+class ETreeOperandsCase(OperandsCase):
+    backend = 'etree'
+
+
+if __name__ == "__main__":
+    unittest.main()
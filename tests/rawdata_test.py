@@ -0,0 +1,298 @@
+"""
+Tests for decoding raw tag data.
+
+When naming test cases the following format should be used.
+test_<Module>_<Class>_<Description>
+"""
+import unittest, io, l5x
+from l5x import rawdata, tag
+
+
+RAW_L5X = b"""<?xml version="1.0" encoding="UTF-8"?>
+<RSLogix5000Content SchemaRevision="1.0">
+<Controller Name="rawtest">
+<DataTypes>
+<DataType Name="Motor" Family="NoFamily" Class="User">
+<Members>
+<Member Name="ZZZZZZZZZZMotor0" DataType="SINT" Dimension="0" Radix="Decimal" Hidden="true"/>
+<Member Name="Run" DataType="BIT" Dimension="0" Radix="Decimal" Hidden="false" Target="ZZZZZZZZZZMotor0" BitNumber="0"/>
+<Member Name="Fault" DataType="BIT" Dimension="0" Radix="Decimal" Hidden="false" Target="ZZZZZZZZZZMotor0" BitNumber="1"/>
+<Member Name="Speed" DataType="INT" Dimension="0" Radix="Decimal" Hidden="false"/>
+<Member Name="Setpoint" DataType="REAL" Dimension="0" Radix="Float" Hidden="false"/>
+<Member Name="Counts" DataType="DINT" Dimension="2" Radix="Decimal" Hidden="false"/>
+<Member Name="Flags" DataType="BOOL" Dimension="32" Radix="Decimal" Hidden="false"/>
+<Member Name="Code" DataType="SINT" Dimension="3" Radix="Decimal" Hidden="false"/>
+</Members>
+</DataType>
+</DataTypes>
+<Tags>
+<Tag Name="Motor1" TagType="Base" DataType="Motor">
+<Data>03 00 2C 01 00 00 C0 3F 01 00 00 00 FE FF FF FF
+05 00 00 80 41 42 43 00</Data>
+</Tag>
+<Tag Name="Motors" TagType="Base" DataType="Motor" Dimensions="2">
+<Data>00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00
+02 00 07 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00</Data>
+</Tag>
+<Tag Name="Timer1" TagType="Base" DataType="TIMER">
+<Data>00 00 00 A0 E8 03 00 00 FA 00 00 00</Data>
+</Tag>
+<Tag Name="Matrix" TagType="Base" DataType="INT" Dimensions="2 3">
+<Data>01 00 02 00 03 00 04 00 05 00 06 00</Data>
+</Tag>
+<Tag Name="Bits" TagType="Base" DataType="BOOL" Dimensions="40">
+<Data>01 00 00 80 02 00 00 00</Data>
+</Tag>
+<Tag Name="Short" TagType="Base" DataType="DINT">
+<Data>01 00</Data>
+</Tag>
+<Tag Name="Module" TagType="Base" DataType="AB:1756_DI:I:0">
+<Data>00 00 00 00</Data>
+</Tag>
+<Tag Name="Level" TagType="Base" DataType="REAL" Radix="Float">
+<Data>00 00 20 C1</Data>
+<Data Format="Decorated">
+<DataValue DataType="REAL" Radix="Float" Value="3.5"/>
+</Data>
+</Tag>
+<Tag Name="Motor2" TagType="Base" DataType="Motor">
+<Data Format="Decorated">
+<Structure DataType="Motor">
+<DataValueMember Name="Run" DataType="BOOL" Value="1"/>
+<DataValueMember Name="Fault" DataType="BOOL" Value="1"/>
+<DataValueMember Name="Speed" DataType="INT" Radix="Decimal" Value="300"/>
+<DataValueMember Name="Setpoint" DataType="REAL" Radix="Float" Value="1.5"/>
+<ArrayMember Name="Counts" DataType="DINT" Dimensions="2" Radix="Decimal">
+<Element Index="[0]" Value="1"/>
+<Element Index="[1]" Value="-2"/>
+</ArrayMember>
+<ArrayMember Name="Flags" DataType="BOOL" Dimensions="32" Radix="Decimal">
+FLAGS</ArrayMember>
+<ArrayMember Name="Code" DataType="SINT" Dimensions="3" Radix="Decimal">
+<Element Index="[0]" Value="65"/>
+<Element Index="[1]" Value="66"/>
+<Element Index="[2]" Value="67"/>
+</ArrayMember>
+</Structure>
+</Data>
+</Tag>
+<Tag Name="Table" TagType="Base" DataType="INT" Dimensions="2 3" Radix="Decimal">
+<Data Format="Decorated">
+<Array DataType="INT" Dimensions="2,3" Radix="Decimal">
+<Element Index="[0,0]" Value="1"/>
+<Element Index="[0,1]" Value="2"/>
+<Element Index="[0,2]" Value="3"/>
+<Element Index="[1,0]" Value="4"/>
+<Element Index="[1,1]" Value="5"/>
+<Element Index="[1,2]" Value="6"/>
+</Array>
+</Data>
+</Tag>
+<Tag Name="Other" TagType="Base" DataType="Missing">
+<Data>00 00 00 00</Data>
+<Data Format="Decorated">
+<Structure DataType="Missing">
+<DataValueMember Name="A" DataType="DINT" Radix="Decimal" Value="0"/>
+</Structure>
+</Data>
+</Tag>
+</Tags>
+</Controller>
+</RSLogix5000Content>
+""".replace(b'FLAGS', ''.join(
+    ['<Element Index="[{0}]" Value="{1}"/>\n'.format(i, int(i in (0, 2, 31)))
+     for i in range(32)]).encode('ascii'))
+
+MOTOR1_DATA = bytearray.fromhex('03 00 2C 01 00 00 C0 3F 01 00 00 00 FE FF FF FF'
+                                '05 00 00 80 41 42 43 00')
+
+
+class RawDataCase(unittest.TestCase):
+    backend = 'minidom'
+
+    def setUp(self):
+        self.prj = l5x.Project(io.BytesIO(RAW_L5X), backend=self.backend,
+                               lazy=True)
+        self.tags = self.prj.controller.tags
+
+    def test_rawdata_decode_structure(self):
+        """Confirm members are decoded at their aligned offsets"""
+        self.assertEqual(self.tags['Motor1'].raw_value,
+                         {'Run': 1, 'Fault': 1, 'Speed': 300, 'Setpoint': 1.5,
+                          'Counts': [1, -2],
+                          'Flags': [1, 0, 1] + [0] * 28 + [1],
+                          'Code': [0x41, 0x42, 0x43]})
+
+    def test_rawdata_decode_structure_array(self):
+        """Confirm arrays of structures are decoded per element"""
+        motors = self.tags['Motors'].raw_value
+        self.assertEqual(len(motors), 2)
+        self.assertEqual(motors[0]['Speed'], 0)
+        self.assertEqual(motors[1]['Fault'], 1)
+        self.assertEqual(motors[1]['Run'], 0)
+        self.assertEqual(motors[1]['Speed'], 7)
+
+    def test_rawdata_decode_builtin(self):
+        """Confirm built-in structures are decoded without a definition"""
+        self.assertEqual(self.tags['Timer1'].raw_value,
+                         {'EN': 1, 'TT': 0, 'DN': 1, 'PRE': 1000, 'ACC': 250})
+
+    def test_rawdata_decode_arrays(self):
+        """Confirm multidimensional and BOOL arrays are decoded"""
+        self.assertEqual(self.tags['Matrix'].raw_value,
+                         [[1, 2, 3], [4, 5, 6]])
+        bits = self.tags['Bits'].raw_value
+        self.assertEqual(len(bits), 40)
+        self.assertEqual([i for i, b in enumerate(bits) if b], [0, 31, 33])
+
+    def test_rawdata_decode_errors(self):
+        """Confirm short data and unknown data types are rejected"""
+        with self.assertRaises(l5x.errors.InvalidFile):
+            self.tags['Short'].raw_value
+        with self.assertRaises(ValueError):
+            self.tags['Module'].raw_value
+
+    def test_tag_Tag_value_from_raw_data(self):
+        """Confirm tags without decorated data are read from raw data"""
+        self.assertEqual(self.tags['Motor1'].data, None)
+        self.assertEqual(self.tags['Motor1'].value['Speed'], 300)
+        self.assertEqual(self.tags['Level'].value, 3.5)
+        self.assertEqual(self.tags['Level'].raw_value, -10.0)
+        with self.assertRaises(AttributeError):
+            self.tags['Level'].raw_value = 0
+
+    def test_rawdata_Layouts_shared(self):
+        """Confirm layouts are computed once per project and data type"""
+        backend = self.prj.backend
+        layouts = rawdata.get_layouts(backend, self.tags['Motors'].element)
+        self.assertTrue(rawdata.get_layouts(backend, self.tags.element)
+                        is layouts)
+        self.assertEqual(self.tags['Motors'].raw_value[1]['Speed'], 7)
+        layout = layouts.get_layout('MOTOR')
+        self.assertEqual(layout.size, 24)
+        self.assertTrue(layouts.get_layout('Motor') is layout)
+        self.assertTrue(layouts.get_codec('Motor', [2]) is
+                        layouts.get_codec('MOTOR', [2]))
+
+    def test_rawdata_encode_round_trip(self):
+        """Confirm decoded values are encoded into the same bytes"""
+        backend = self.prj.backend
+        for name in ['Motor1', 'Motors', 'Timer1', 'Matrix', 'Bits']:
+            element = self.tags[name].element
+            data = rawdata.get_raw_data(backend, element)
+            value = rawdata.decode(backend, element)
+            self.assertEqual(rawdata.encode(backend, element, value), data)
+
+    def test_rawdata_encode_bits(self):
+        """Confirm bit members are merged into their host member"""
+        backend = self.prj.backend
+        element = self.tags['Motor1'].element
+        value = self.tags['Motor1'].raw_value
+        value['Run'] = 0
+        value['Flags'][31] = 0
+        data = rawdata.encode(backend, element, value)
+        self.assertEqual(rawdata.format_raw_data(data[:20]),
+                         '02 00 2C 01 00 00 C0 3F 01 00 00 00 FE FF FF FF '
+                         '05 00 00 00')
+        with self.assertRaises(ValueError):
+            rawdata.encode(backend, self.tags['Matrix'].element, [[1, 2]])
+
+    def write_read_project(self):
+        f = io.BytesIO()
+        self.prj.write(f)
+        return l5x.Project(io.BytesIO(f.getvalue()), backend=self.backend,
+                           lazy=True)
+
+    def test_tag_Tag_update_raw_data(self):
+        """Confirm raw data is encoded from set values when written"""
+        level = self.tags['Level']
+        level.value = 2.0
+        level.value = -2.0
+        self.assertTrue(level.element in tag._modified_tags[self.prj.doc])
+
+        newprj = self.write_read_project()
+        self.assertFalse(self.prj.doc in tag._modified_tags)
+        self.assertEqual(level.raw_value, -2.0)
+        self.assertEqual(newprj.controller.tags['Level'].raw_value, -2.0)
+        self.assertEqual(newprj.controller.tags['Level'].value, -2.0)
+
+    def test_tag_Tag_raw_value_modified(self):
+        """Confirm raw values read after setting values are encoded first"""
+        level = self.tags['Level']
+        level.value = -2.0
+        self.assertEqual(level.raw_value, -2.0)
+        self.assertFalse(level.element in tag._modified_tags[self.prj.doc])
+        level.value = 4.0
+        self.assertEqual(level.raw_value, 4.0)
+
+        self.tags['Other']['A'].value = 5
+        self.assertEqual(self.tags['Other'].raw_value, None)
+
+    def test_tag_Tag_update_raw_data_unsupported(self):
+        """Confirm raw data which cannot be encoded is removed"""
+        self.tags['Other']['A'].value = 5
+        newprj = self.write_read_project()
+        other = newprj.controller.tags['Other']
+        self.assertEqual(other.raw_value, None)
+        self.assertEqual(other.value, {'A': 5})
+
+
+    def test_datatypes_DataType_layout(self):
+        """Confirm member offsets and bit locations of a data type"""
+        layout = self.prj.datatypes['Motor'].get_layout()
+        self.assertTrue(self.prj.datatypes['MOTOR'].get_layout() is layout)
+        self.assertEqual(layout.size, 24)
+        members = dict((m.name, m) for m in layout.members)
+        self.assertEqual([(n, members[n].offset) for n in
+                          ['Speed', 'Setpoint', 'Counts', 'Flags', 'Code']],
+                         [('Speed', 2), ('Setpoint', 4), ('Counts', 8),
+                          ('Flags', 16), ('Code', 20)])
+        self.assertEqual(members['Fault'].offset, 0)
+        self.assertEqual(members['Fault'].bit, 1)
+        self.assertTrue(members['ZZZZZZZZZZMotor0'].hidden)
+        self.assertEqual(members['Counts'].layout.stride, 4)
+        member = self.prj.datatypes['Motor'].members['1']
+        self.assertEqual((member.target, member.bit_number),
+                         ('ZZZZZZZZZZMotor0', '0'))
+
+    def test_rawdata_Codec_memoryview(self):
+        """Confirm images are decoded from memory views at an offset"""
+        codec = self.prj.datatypes['Motor'].get_codec([2])
+        self.assertEqual(codec.size, 48)
+        image = memoryview(bytes(bytearray(4) + MOTOR1_DATA * 2))
+        value = codec.decode(image, 4)
+        self.assertEqual(value[1]['Counts'], [1, -2])
+        self.assertEqual(codec.encode(value), MOTOR1_DATA * 2)
+        with self.assertRaises(ValueError):
+            codec.decode(image, 8)
+
+    def test_tag_Structure_pack(self):
+        """Confirm structures are converted to and from memory images"""
+        motor = self.tags['Motor2'].data
+        self.assertEqual(motor.pack(), bytes(MOTOR1_DATA))
+        image = bytearray(MOTOR1_DATA)
+        image[0] = 0
+        image[2] = 0x2D
+        motor.unpack(memoryview(image))
+        self.assertEqual(motor['Speed'].value, 301)
+        self.assertEqual(motor['Run'].value, 0)
+        self.assertEqual(motor.pack(), bytes(image))
+
+    def test_tag_Array_pack(self):
+        """Confirm arrays are converted to and from memory images"""
+        table = self.tags['Table'].data
+        self.assertEqual(table.pack(),
+                         bytes(bytearray.fromhex('01 00 02 00 03 00 '
+                                                 '04 00 05 00 06 00')))
+        table.unpack(bytearray.fromhex('06 00 05 00 04 00 03 00 02 00 01 00'))
+        self.assertEqual(table.value, [[6, 5, 4], [3, 2, 1]])
+        with self.assertRaises(ValueError):
+            table[0].pack()
+
+
+class ETreeRawDataCase(RawDataCase):
+    backend = 'etree'
+
+
+if __name__ == "__main__":
+    unittest.main()
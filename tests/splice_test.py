@@ -0,0 +1,119 @@
+"""
+Tests for splice writing of projects opened with change tracking.
+
+When naming test cases the following format should be used.
+test_<Module>_<Class>_<Description>
+"""
+import unittest, io, shutil, l5x
+
+SOURCE = './tests/__results__/splice_source.L5X'
+OUTPUT = './tests/__results__/splice_output.L5X'
+
+
+def read(filename):
+    with open(filename, 'rb') as f:
+        return f.read()
+
+
+class SpliceCase(unittest.TestCase):
+    backend = 'minidom'
+
+    def setUp(self):
+        shutil.copy('./tests/basetest.L5X', SOURCE)
+        self.original = read(SOURCE)
+        self.prj = l5x.Project(SOURCE, backend=self.backend,
+                               track_changes=True)
+
+    def changed_lines(self, output):
+        old = self.original.splitlines()
+        new = output.splitlines()
+        return ([l for l in old if l not in new], [l for l in new if l not in old])
+
+    def test_splice_write_spliced_unmodified(self):
+        """Confirm an unmodified project is written byte for byte"""
+        self.prj.write(OUTPUT)
+        self.assertEqual(read(OUTPUT), self.original)
+
+    def test_splice_write_spliced_attribute(self):
+        """Confirm only the modified element differs from the original"""
+        self.prj.programs['MainProgram'].disabled = 'true'
+        self.prj.write(OUTPUT)
+        removed, added = self.changed_lines(read(OUTPUT))
+        self.assertEqual(len(removed), 1)
+        self.assertEqual(len(added), 1)
+        self.assertTrue(added[0].startswith(b'<Program '))
+        self.assertTrue(b' Disabled="true"' in added[0])
+        prj = l5x.Project(OUTPUT, backend=self.backend)
+        self.assertEqual(prj.programs['MainProgram'].disabled, 'true')
+
+    def test_splice_write_spliced_description(self):
+        """Confirm new and modified descriptions are written"""
+        self.prj.controller.tags['real1'].description = 'New Real'
+        routine = self.prj.programs['MainProgram'].routines['MainRoutine']
+        routine.description = 'New Routine'
+        self.prj.write(OUTPUT)
+
+        removed, added = self.changed_lines(read(OUTPUT))
+        self.assertEqual(removed, [b'<![CDATA[Test Real 1]]>'])
+        self.assertTrue(b'<![CDATA[New Routine]]>' in added)
+        self.assertTrue(read(OUTPUT).count(b'\r\n') > 100)
+
+        prj = l5x.Project(OUTPUT, backend=self.backend)
+        self.assertEqual(prj.controller.tags['real1'].description, 'New Real')
+        routine = prj.programs['MainProgram'].routines['MainRoutine']
+        self.assertEqual(routine.description, 'New Routine')
+
+    def test_splice_write_spliced_removed_element(self):
+        """Confirm removed elements are omitted"""
+        self.prj.controller.tags['boolean1'].description = None
+        self.prj.write(OUTPUT)
+        removed, added = self.changed_lines(read(OUTPUT))
+        self.assertEqual(removed, [b'<![CDATA[Test Boolean 1]]>'])
+        prj = l5x.Project(OUTPUT, backend=self.backend)
+        self.assertEqual(prj.controller.tags['boolean1'].description, None)
+
+    def test_splice_write_spliced_file_object(self):
+        """Confirm spliced output can be written to a file object"""
+        self.prj.controller.tags['dint1'].value = 42
+        buf = io.BytesIO()
+        self.prj.write(buf)
+        self.prj.write(OUTPUT)
+        self.assertEqual(buf.getvalue(), read(OUTPUT))
+
+    def test_splice_write_spliced_in_place(self):
+        """Confirm the original file can be overwritten repeatedly"""
+        self.prj.controller.tags['dint1'].value = 42
+        self.prj.write(SOURCE)
+        self.prj.controller.tags['dint1'].value = 43
+        self.prj.write(SOURCE)
+        prj = l5x.Project(SOURCE, backend=self.backend)
+        self.assertEqual(prj.controller.tags['dint1'].value, 43)
+
+    def test_splice_SourceMap_stale_source(self):
+        """Confirm a full write is made if the original file changed"""
+        self.prj.controller.tags['dint1'].value = 42
+        with open(SOURCE, 'ab') as f:
+            f.write(b'\r\n')
+        self.prj.write(OUTPUT)
+        prj = l5x.Project(OUTPUT, backend=self.backend)
+        self.assertEqual(prj.controller.tags['dint1'].value, 42)
+
+    def test_splice_track_file_object(self):
+        """Confirm change tracking is rejected for file objects"""
+        with open(SOURCE, 'rb') as f:
+            with self.assertRaises(ValueError):
+                l5x.Project(f, track_changes=True)
+
+    def test_splice_track_skip_sections(self):
+        """Confirm change tracking is rejected with skipped sections"""
+        with self.assertRaises(ValueError):
+            l5x.Project(SOURCE, backend=self.backend, track_changes=True,
+                        skip_sections=['Modules'])
+
+
+class ETreeSpliceCase(SpliceCase):
+    backend = 'etree'
+
+
+if __name__ == "__main__":
+    unittest.main()
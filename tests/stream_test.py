@@ -0,0 +1,160 @@
+"""
+Tests for the streaming read-only reader.
+
+When naming test cases the following format should be used.
+test_<Module>_<Description>
+"""
+import unittest, io
+from l5x import stream
+from l5x.errors import InvalidFile
+
+DATATYPE_L5X = b"""<?xml version="1.0" encoding="UTF-8"?>
+<RSLogix5000Content SchemaRevision="1.0">
+<Controller Name="streamtest">
+<DataTypes>
+<DataType Name="UDT1" Family="NoFamily" Class="User">
+<Description>
+<![CDATA[Test UDT]]>
+</Description>
+<Members>
+<Member Name="ZZZZZZZZZZUDT10" DataType="SINT" Dimension="0" Radix="Decimal" Hidden="true"/>
+<Member Name="flag" DataType="BIT" Dimension="0" Radix="Decimal" Hidden="false" Target="ZZZZZZZZZZUDT10"/>
+<Member Name="count" DataType="DINT" Dimension="4" Radix="Decimal" Hidden="false"/>
+</Members>
+</DataType>
+</DataTypes>
+</Controller>
+</RSLogix5000Content>
+"""
+
+AOI_L5X = b"""<?xml version="1.0" encoding="UTF-8"?>
+<RSLogix5000Content SchemaRevision="1.0">
+<Controller Name="streamtest">
+<AddOnInstructionDefinitions>
+<AddOnInstructionDefinition Name="AOI1">
+<Routines>
+<Routine Name="Logic" Type="RLL">
+<RLLContent>
+<Rung Number="0" Type="N">
+<Text>
+<![CDATA[NOP();]]>
+</Text>
+</Rung>
+</RLLContent>
+</Routine>
+</Routines>
+</AddOnInstructionDefinition>
+</AddOnInstructionDefinitions>
+<Programs>
+<Program Name="Main">
+<Routines>
+<Routine Name="Ladder" Type="RLL">
+<RLLContent>
+<Rung Number="0" Type="N">
+<Text>
+<![CDATA[AOI1(x);]]>
+</Text>
+</Rung>
+</RLLContent>
+</Routine>
+</Routines>
+</Program>
+</Programs>
+</Controller>
+</RSLogix5000Content>
+"""
+
+class StreamCase(unittest.TestCase):
+
+    def setUp(self):
+        self.records = list(stream.iter_records('./tests/basetest.L5X'))
+
+    def test_stream_controller_tags(self):
+        """Confirm controller tags are read with their descriptions"""
+        tags = [r for r in self.records
+                if isinstance(r, stream.TagRecord) and r.program is None]
+        self.assertEqual([t.name for t in tags], ['boolean1', 'dint1', 'real1'])
+        self.assertEqual(tags[0].description, 'Test Boolean 1')
+        self.assertEqual(tags[0].data_type, 'BOOL')
+        self.assertEqual(tags[2].value, '0.0')
+
+    def test_stream_program_tags(self):
+        """Confirm program tags carry the name of their program"""
+        tags = [r for r in self.records
+                if isinstance(r, stream.TagRecord) and r.program is not None]
+        self.assertEqual(len(tags), 1)
+        self.assertEqual(tags[0].program, 'MainProgram')
+        self.assertEqual(tags[0].name, 'boolean2')
+        self.assertEqual(tags[0].description, 'Test Boolean 2')
+
+    def test_stream_document_order(self):
+        """Confirm routine headers precede their rungs"""
+        routine = None
+        for r in self.records:
+            if isinstance(r, stream.RoutineRecord):
+                routine = r.name
+            elif isinstance(r, stream.RungRecord):
+                self.assertEqual(r.routine, routine)
+
+    def test_stream_rungs(self):
+        """Confirm rung text and comments are read exactly"""
+        rungs = [r for r in self.records if isinstance(r, stream.RungRecord)
+                 and r.routine == 'TestLadderRoutine']
+        self.assertEqual(len(rungs), 3)
+        self.assertEqual(rungs[0].text, 'XIC(boolean1)OTE(boolean2);')
+        self.assertEqual(rungs[0].comment, None)
+        self.assertTrue(rungs[2].comment.startswith('Comment with Unicode\n'))
+
+    def test_stream_routine_description(self):
+        """Confirm routine descriptions are read before content"""
+        routines = dict((r.name, r) for r in self.records
+                        if isinstance(r, stream.RoutineRecord))
+        self.assertEqual(routines['TestFunctionBlockRoutine'].description,
+                         'Test Function Block Routine')
+        self.assertEqual(routines['MainRoutine'].description, None)
+        self.assertEqual(routines['TestStructuredTextRoutine'].type, 'ST')
+
+    def test_stream_modules(self):
+        """Confirm modules are read"""
+        modules = [r for r in self.records if isinstance(r, stream.ModuleRecord)]
+        self.assertEqual(len(modules), 1)
+        self.assertEqual(modules[0].catalog_number, '1756-L75')
+
+    def test_stream_record_filter(self):
+        """Confirm only requested record types are produced"""
+        records = list(stream.iter_records('./tests/basetest.L5X',
+                                           [stream.RungRecord]))
+        self.assertEqual(len(records), 7)
+        for r in records:
+            self.assertTrue(isinstance(r, stream.RungRecord))
+
+    def test_stream_data_types(self):
+        """Confirm data types are read with their members"""
+        records = list(stream.iter_records(io.BytesIO(DATATYPE_L5X)))
+        self.assertEqual(len(records), 1)
+        udt = records[0]
+        self.assertEqual(udt.name, 'UDT1')
+        self.assertEqual(udt.description, 'Test UDT')
+        self.assertEqual([m.name for m in udt.members],
+                         ['ZZZZZZZZZZUDT10', 'flag', 'count'])
+        self.assertEqual(udt.members[1].target, 'ZZZZZZZZZZUDT10')
+        self.assertEqual(udt.members[2].dimension, '4')
+
+    def test_stream_add_on_instruction_rungs(self):
+        """Confirm rungs of add-on instruction routines are not listed"""
+        records = list(stream.iter_records(io.BytesIO(AOI_L5X)))
+        self.assertEqual([type(r) for r in records],
+                         [stream.RoutineRecord, stream.RungRecord])
+        self.assertEqual(records[1], ('Main', 'Ladder', '0', 'N',
+                                      'AOI1(x);', None))
+
+    def test_stream_invalid_file(self):
+        """Confirm non-L5X content is rejected"""
+        with self.assertRaises(InvalidFile):
+            list(stream.iter_records(io.BytesIO(b'<Other/>')))
+        with self.assertRaises(InvalidFile):
+            list(stream.iter_records(io.BytesIO(b'<RSLogix5000Content>')))
+
+
+if __name__ == "__main__":
+    unittest.main()
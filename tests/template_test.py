@@ -0,0 +1,77 @@
+"""
+Tests for creating new projects from templates.
+
+When naming test cases the following format should be used.
+test_<Module>_<Class>_<Description>
+"""
+import unittest, io, l5x
+from l5x import project
+
+
+def write(prj):
+    buf = io.BytesIO()
+    prj.write(buf)
+    return buf.getvalue()
+
+
+class TemplateCase(unittest.TestCase):
+    backend = 'minidom'
+
+    def tearDown(self):
+        project._discard_template('site')
+
+    def test_project_Project_default_template(self):
+        """Confirm new projects are independent copies of the default content"""
+        first = l5x.Project(backend=self.backend)
+        second = l5x.Project(backend=self.backend)
+        self.assertEqual(write(first), write(second))
+        self.assertEqual(list(first.programs.names), ['MainProgram'])
+        self.assertEqual(list(first.modules.names), ['Local'])
+
+        first.programs['MainProgram'].disabled = 'true'
+        self.assertEqual(second.programs['MainProgram'].disabled, 'false')
+        self.assertEqual(l5x.Project(backend=self.backend)
+                         .programs['MainProgram'].disabled, 'false')
+
+    def test_project_register_template_project(self):
+        """Confirm a registered project is copied as it was when registered"""
+        prj = l5x.Project('./tests/basetest.L5X', backend=self.backend)
+        l5x.register_template('site', prj)
+        prj.controller.tags['dint1'].description = 'Changed'
+
+        new = l5x.Project(backend=self.backend, template='site')
+        self.assertEqual(new.controller.tags['dint1'].description,
+                         'Test DINT 1')
+        self.assertEqual(sorted(new.programs.names),
+                         sorted(prj.programs.names))
+
+    def test_project_register_template_file(self):
+        """Confirm an export can be registered as a template"""
+        l5x.register_template('site', './tests/basetest.L5X', self.backend)
+        new = l5x.Project(backend=self.backend, template='site')
+        parsed = l5x.Project('./tests/basetest.L5X', backend=self.backend)
+        self.assertEqual(write(new), write(parsed))
+
+    def test_project_register_template_other_backend(self):
+        """Confirm a template registered through another backend is copied"""
+        other = 'etree' if self.backend == 'minidom' else 'minidom'
+        l5x.register_template('site', './tests/basetest.L5X', other)
+        new = l5x.Project(backend=self.backend, template='site')
+        self.assertEqual(new.controller.tags['dint1'].description,
+                         'Test DINT 1')
+        new.controller.tags['dint1'].description = 'Changed'
+        copy = l5x.Project(io.BytesIO(write(new)), backend=self.backend)
+        self.assertEqual(copy.controller.tags['dint1'].description, 'Changed')
+
+    def test_project_Project_unknown_template(self):
+        """Confirm an unregistered template name is rejected"""
+        with self.assertRaises(ValueError):
+            l5x.Project(backend=self.backend, template='site')
+
+
+class ETreeTemplateCase(TemplateCase):
+    backend = 'etree'
+
+
+if __name__ == "__main__":
+    unittest.main()
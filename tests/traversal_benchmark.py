@@ -0,0 +1,117 @@
+"""
+Benchmark of a full traversal of a large tag.
+
+Builds a structure array tag whose elements nest structures several
+levels deep, then visits every structure member, array element and
+integer bit of it through the data accessors, reading each atomic value.
+The time per accessor created is reported, which is where the cost of
+locating each accessor's document shows. Run from the repository root
+with the package importable as l5x:
+
+    python tests/traversal_benchmark.py --backend etree --elements 2000
+"""
+import argparse, gc, time, l5x
+from l5x.tag import Array, Integer, Structure
+
+
+def build(parent, prj, name, attributes, children=()):
+    """Creates an element and its children; children are built by callables."""
+    b = prj.backend
+    element = b.create_element(prj.doc, name, attributes)
+    b.append_child(parent, element)
+    for child in children:
+        child(element)
+    return element
+
+
+def add_tag(prj, elements):
+    """Adds a Cell[elements] tag; each Cell holds Id, Level and A.B.C,
+    where C holds a DINT[4] and a BOOL."""
+    def value(name, data_type, value):
+        return lambda parent: build(parent, prj, 'DataValueMember', {
+            'Name': name, 'DataType': data_type, 'Radix': 'Decimal',
+            'Value': value})
+
+    def counts(parent):
+        build(parent, prj, 'ArrayMember', {
+            'Name': 'Counts', 'DataType': 'DINT', 'Dimensions': '4',
+            'Radix': 'Decimal'},
+            [(lambda parent, i=i: build(parent, prj, 'Element', {
+                'Index': '[{0}]'.format(i), 'Value': str(i)}))
+             for i in range(4)])
+
+    def nested(names, children):
+        if not names:
+            return children
+        return [lambda parent: build(parent, prj, 'StructureMember', {
+            'Name': names[0], 'DataType': 'Nest' + names[0]},
+            nested(names[1:], children))]
+
+    def cell(parent, i):
+        build(parent, prj, 'Element', {'Index': '[{0}]'.format(i)}, [
+            lambda parent: build(parent, prj, 'Structure', {'DataType': 'Cell'},
+                [value('Id', 'DINT', str(i)), value('Level', 'REAL', '1.5')]
+                + nested(['A', 'B', 'C'],
+                         [counts, value('Flag', 'BOOL', '1')]))])
+
+    tags = prj.controller.get_child_element('Tags')
+    tag = build(tags, prj, 'Tag', {'Name': 'Cells', 'TagType': 'Base',
+                                   'DataType': 'Cell',
+                                   'Dimensions': str(elements)}, [
+        lambda parent: build(parent, prj, 'Data', {'Format': 'Decorated'}, [
+            lambda parent: build(parent, prj, 'Array', {
+                'DataType': 'Cell', 'Dimensions': str(elements)},
+                [(lambda parent, i=i: cell(parent, i))
+                 for i in range(elements)])])])
+    prj.controller.tags.append('Cells', tag)
+
+
+def walk(data):
+    """Visits every member of an accessor; returns the number visited."""
+    count = 1
+    if isinstance(data, Structure):
+        for name in data.names:
+            count += walk(data[str(name)])
+    elif isinstance(data, Array):
+        for i in range(data.shape[-1]):
+            count += walk(data[i])
+    else:
+        data.value
+        if isinstance(data, Integer):
+            for bit in range(len(data)):
+                count += 1
+                data[bit].value
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--backend', default='minidom')
+    parser.add_argument('--elements', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    prj = l5x.Project('./tests/basetest.L5X', backend=args.backend)
+    add_tag(prj, args.elements)
+
+    best = None
+    for i in range(args.repeat):
+        # A new Tag accessor is used for every pass, so no accessor
+        # cached by a previous pass is reused.
+        tag = l5x.tag.Tag(prj.controller.tags['Cells'].element)
+
+        # As with timeit, collection passes are excluded from the timing.
+        gc.disable()
+        start = time.time()
+        count = walk(tag.data)
+        elapsed = time.time() - start
+        gc.enable()
+        if (best is None) or (elapsed < best):
+            best = elapsed
+
+    print('{0}: {1} accessors in {2:.3f}s, {3:.2f} us each'.format(
+        args.backend, count, best, best / count * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Tests for buffered project output.
+
+When naming test cases the following format should be used.
+test_<Module>_<Class>_<Description>
+"""
+import unittest, io, l5x
+from l5x import writer
+
+
+class WriterCase(unittest.TestCase):
+    backend = 'minidom'
+
+    def setUp(self):
+        self.prj = l5x.Project('./tests/basetest.L5X', backend=self.backend)
+
+    def write_file(self):
+        filename = './tests/__results__/writer_output.L5X'
+        self.prj.write(filename)
+        with open(filename, 'rb') as f:
+            return f.read()
+
+    def test_writer_write_document_file_object(self):
+        """Confirm output to a file object matches output to a file"""
+        buf = io.BytesIO()
+        self.prj.write(buf)
+        self.assertFalse(buf.closed)
+        self.assertEqual(buf.getvalue(), self.write_file())
+
+    def test_writer_write_document_progress(self):
+        """Confirm progress is reported for each block written"""
+        reports = []
+        buf = io.BytesIO()
+        writer.write_document(self.prj.backend, self.prj.doc, buf,
+                              reports.append, chunk_size=1024)
+        self.assertTrue(len(reports) > 1)
+        self.assertEqual(reports, sorted(reports))
+        self.assertEqual(reports[-1], len(buf.getvalue()))
+        self.assertEqual(buf.getvalue(), self.write_file())
+
+    def test_writer_ChunkedWriter_text_stream(self):
+        """Confirm text streams receive unencoded output"""
+        buf = io.StringIO()
+        self.prj.write(buf)
+        self.assertEqual(buf.getvalue().encode('utf-8'), self.write_file())
+
+    def test_writer_ChunkedWriter_encoding(self):
+        """Confirm non-ASCII content is written as UTF-8"""
+        rung = self.prj.programs['MainProgram'].routines['TestLadderRoutine'].rungs['2']
+        comment = rung.backend.get_cdata(rung.get_child_element('Comment'))
+        buf = io.BytesIO()
+        self.prj.write(buf)
+        self.assertTrue(comment.encode('utf-8') in buf.getvalue())
+
+
+class ETreeWriterCase(WriterCase):
+    backend = 'etree'
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Buffered output of serialized documents.
+
+Backends serialize a document through many small write() calls, roughly
+one per markup fragment. Passing each of those through an encoding file
+layer individually makes writing a large project cost far more than the
+I/O itself. ChunkedWriter collects the fragments and encodes and writes
+them in large blocks to any binary file-like object.
+"""
+
+from .compression import (codec_for_filename, open_target)
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+
+
+# Number of characters accumulated before a block is encoded and written.
+CHUNK_SIZE = 1 << 20
+
+try:
+    replace_file = os.replace
+except AttributeError:
+    # Python 2 lacks os.replace(); rename() replaces existing files on
+    # POSIX systems only.
+    def replace_file(src, dst):
+        """Renames a file, replacing any existing destination file."""
+        if os.name == 'nt' and os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
+@contextlib.contextmanager
+def atomic_output(target, buffering=CHUNK_SIZE):
+    """Opens a binary file which replaces another once completely written.
+
+    Output goes to a temporary file in the target's directory, so a write
+    that fails or is cancelled part way never leaves a truncated target
+    behind. The permissions of an existing target are kept.
+
+    :param target: Path of the file to replace or create.
+    :param buffering: Buffer size of the temporary file.
+    :returns: A context manager yielding the temporary file.
+    """
+    directory = os.path.dirname(os.path.abspath(target))
+    fd, temp = tempfile.mkstemp(dir=directory)
+    try:
+        with io.open(fd, 'wb', buffering=buffering) as f:
+            yield f
+        if os.path.exists(target):
+            shutil.copymode(target, temp)
+        else:
+            # Temporary files are private; apply the permissions a newly
+            # created file would have received.
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp, 0o666 & ~umask)
+    except BaseException:
+        os.remove(temp)
+        raise
+    replace_file(temp, target)
+
+
+class ChunkedWriter(object):
+    """Text file-like object writing encoded blocks to a binary stream.
+
+    :param f: Binary file-like object receiving the output. Text streams,
+              e.g. io.StringIO, are also accepted and receive unencoded
+              blocks.
+    :param progress: Optional callable invoked with the total number of
+                     bytes, or characters for text streams, written so far
+                     each time a block is written.
+    :param chunk_size: Number of characters per block.
+    :param encoding: Output encoding.
+    """
+    def __init__(self, f, progress=None, chunk_size=CHUNK_SIZE,
+                 encoding='utf-8'):
+        self.f = f
+        self.progress = progress
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        self.encode = not isinstance(f, io.TextIOBase)
+        self.written = 0
+        self.pending = []
+        self.pending_size = 0
+
+    def write(self, text):
+        self.pending.append(text)
+        self.pending_size += len(text)
+        if self.pending_size >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Writes all pending text to the underlying stream."""
+        if not self.pending:
+            return
+        block = u''.join(self.pending)
+        self.pending = []
+        self.pending_size = 0
+
+        if self.encode:
+            block = block.encode(self.encoding)
+        self.f.write(block)
+        self.written += len(block)
+        if self.progress is not None:
+            self.progress(self.written)
+
+
+def write_document(backend, doc, target, progress=None,
+                   chunk_size=CHUNK_SIZE, compression=None):
+    """Serializes a document to a file name or file-like object.
+
+    Files opened by name are written through a buffer of chunk_size
+    bytes, and replaced only once the output is complete; see
+    :func:`atomic_output`. File-like objects are written to directly, and
+    flushed but not closed afterwards.
+
+    :param backend: Backend owning the document.
+    :param doc: Document to serialize.
+    :param target: Path of the output file or file-like object.
+    :param progress: Optional progress callback; see :class:`ChunkedWriter`.
+                     Uncompressed bytes are counted.
+    :param chunk_size: Number of characters per write to the target.
+    :param compression: Optional output compression format; see
+                        :func:`.compression.open_target`.
+    """
+    if hasattr(target, 'write'):
+        with open_target(target, compression) as f:
+            _write(backend, doc, f, progress, chunk_size)
+        if hasattr(target, 'flush'):
+            target.flush()
+        return
+
+    if compression is None:
+        compression = getattr(codec_for_filename(target), 'name', None)
+    with atomic_output(target, chunk_size) as raw:
+        with open_target(raw, compression) as f:
+            _write(backend, doc, f, progress, chunk_size)
+
+
+def _write(backend, doc, f, progress, chunk_size):
+    writer = ChunkedWriter(f, progress, chunk_size)
+    backend.write(doc, writer)
+    writer.flush()